@@ -0,0 +1,75 @@
+import argparse
+import asyncio
+import os
+
+from benchmarks.runner import load_baseline
+from benchmarks.runner import new_report
+from benchmarks.runner import print_result
+from benchmarks.runner import save_report
+
+DEFAULT_ROWS = 10_000
+DEFAULT_ITERATIONS = 200
+DEFAULT_WARMUP = 5
+DEFAULT_SEED = 42
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Benchmarks of the core CRUD stack.")
+    parser.add_argument(
+        "--database-url",
+        default=os.environ.get("BENCHMARK_DATABASE_URL"),
+        help="Database to run against, its dummy table is dropped and seeded again.",
+    )
+    parser.add_argument("--rows", type=int, default=DEFAULT_ROWS, help="Rows of the synthetic dataset.")
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS, help="Timed calls per benchmark.")
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP, help="Untimed calls before each benchmark.")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="Seed of the synthetic dataset.")
+    parser.add_argument("--suites", nargs="+", default=None, help="Suites to run, all of them by default.")
+    parser.add_argument("--output", default=None, help="Path of the JSON report.")
+    parser.add_argument("--baseline", default=None, help="JSON report of a previous run to compare with.")
+    return parser.parse_args()
+
+
+async def run(args: argparse.Namespace) -> None:
+    # Imported here so the settings module of the API suite sees the database url.
+    from benchmarks.fixtures import create_connection
+    from benchmarks.fixtures import create_data_source
+    from benchmarks.fixtures import create_repository
+    from benchmarks.fixtures import reset_table
+    from benchmarks.fixtures import seed
+    from benchmarks.suites import SUITES
+    from benchmarks.suites import BenchmarkContext
+
+    suite_names = args.suites or list(SUITES)
+    unknown = set(suite_names) - set(SUITES)
+    if unknown:
+        raise SystemExit(f"Unknown suites: {', '.join(sorted(unknown))}. Available: {', '.join(SUITES)}.")
+
+    connection = create_connection(args.database_url)
+    repository = create_repository(data_source=create_data_source(connection))
+    await reset_table(connection)
+    await seed(repository, rows=args.rows, seed=args.seed)
+
+    context = BenchmarkContext(repository, rows=args.rows, iterations=args.iterations, warmup=args.warmup)
+    report = new_report(database=connection.engine.dialect.name, rows=args.rows, iterations=args.iterations)
+    baseline = load_baseline(args.baseline)
+    for suite_name in suite_names:
+        for result in await SUITES[suite_name](context):
+            print_result(result, baseline.get((result.suite, result.name)))
+            report.results.append(result)
+
+    if args.output:
+        save_report(report, args.output)
+        print(f"Report saved to {args.output}")
+
+
+def main() -> None:
+    args = parse_args()
+    if not args.database_url:
+        raise SystemExit("Missing database url, use --database-url or BENCHMARK_DATABASE_URL.")
+    os.environ["BENCHMARK_DATABASE_URL"] = args.database_url
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+from typing import Annotated
+
+import inject
+from fastapi import APIRouter
+from fastapi import Depends
+from fastapi import HTTPException
+from fastapi import status
+
+from benchmarks.fixtures import Dummy
+from benchmarks.fixtures import DummyFilter
+from benchmarks.fixtures import IDummyRepository
+from core.api.rest_api import get_pagination_parameters
+from core.api.serializers import ApiInput
+from core.api.serializers import ApiMapper
+from core.api.serializers import ApiOutput
+from core.api.serializers import BasePageOutput
+from core.api.serializers import PageMapper
+from core.infrastructure.setup_app import BootApp
+from core.use_cases.core_use_cases import BaseCreateMixinService
+from core.use_cases.core_use_cases import BaseListPaginationMixinService
+from core.use_cases.core_use_cases import BaseRetrieveMixinService
+
+
+class DummyInput(ApiInput):
+    name_object: str | None = None
+    phone: str | None = None
+    object_count: int | None = None
+
+
+class DummyOutput(ApiOutput):
+    entity_id: str
+    name_object: str | None = None
+    phone: str | None = None
+    object_count: int | None = None
+
+
+class DummyMapper(ApiMapper):
+    async def to_api(self, entity: Dummy) -> DummyOutput:
+        return DummyOutput.model_validate(entity, from_attributes=True)
+
+    async def to_entity(self, payload: DummyInput) -> Dummy:
+        return Dummy(**payload.model_dump())
+
+
+class DummyPaginationListService(BaseListPaginationMixinService):
+    repo_instance = inject.attr(IDummyRepository)
+
+
+class DummyRetrieveService(BaseRetrieveMixinService):
+    repo_instance = inject.attr(IDummyRepository)
+
+
+class DummyCreateService(BaseCreateMixinService):
+    repo_instance = inject.attr(IDummyRepository)
+
+
+class BenchmarkBootApp(BootApp):
+    SETTINGS_MODULE = "benchmarks.settings"
+
+
+router = APIRouter(prefix="/dummies")
+
+
+@router.get("")
+async def list_dummies(
+    pagination: Annotated[tuple[int, int], Depends(get_pagination_parameters)],
+) -> BasePageOutput[DummyOutput]:
+    filter_schema = DummyFilter(pagination=pagination, ordering=["name_object"])
+    page_result = await DummyPaginationListService().run(filter_schema=filter_schema)
+    return await PageMapper(entity_mapper=DummyMapper()).to_api(page_result=page_result)
+
+
+@router.get("/{entity_id}")
+async def retrieve_dummy(entity_id: str) -> DummyOutput:
+    entity = await DummyRetrieveService().run(entity_id=entity_id)
+    if entity is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Dummy not found.")
+    return await DummyMapper().to_api(entity=entity)
+
+
+@router.post("", status_code=status.HTTP_201_CREATED)
+async def create_dummy(payload: DummyInput) -> DummyOutput:
+    mapper = DummyMapper()
+    entity = await DummyCreateService().run(entity=await mapper.to_entity(payload=payload))
+    return await mapper.to_api(entity=entity)
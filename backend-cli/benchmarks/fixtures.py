@@ -0,0 +1,104 @@
+import random
+
+from sqlalchemy.engine import make_url
+from sqlalchemy_filterset import Filter
+from sqlalchemy_filterset import LimitOffsetFilter
+from sqlalchemy_filterset import OrderingField
+from sqlalchemy_filterset import OrderingFilter
+
+from core.domain.filters import BaseSchemaFilter
+from core.domain.models import BaseChangeRequest
+from core.domain.models import BaseEntity
+from core.domain.repositories import DataSources
+from core.domain.repositories import ISourceRepository
+from core.infrastructure.orm.database import AsyncDbConnection
+from core.infrastructure.orm.database import DbConnection
+from core.infrastructure.orm.repositories import DB_CONNECTION_NAME
+from core.infrastructure.orm.repositories import BaseFilterSet
+from core.infrastructure.orm.repositories import create_generic_source_repository
+from db_declarative.sqalchemy.infrastructure.orm.tables import DummyTable
+
+NAME_BUCKETS = 100
+SEED_CHUNK_SIZE = 1000
+ASYNC_DRIVERS = {"asyncpg", "aiosqlite", "psycopg_async"}
+
+
+class Dummy(BaseEntity):
+    name_object: str | None = None
+    phone: str | None = None
+    object_count: int | None = None
+
+
+class DummyChange(BaseChangeRequest):
+    name_object: str | None = None
+    object_count: int | None = None
+
+
+class DummyFilter(BaseSchemaFilter):
+    entity_id: str | None = None
+    name_object: str | None = None
+
+
+class DummyFilterSet(BaseFilterSet):
+    entity_id = Filter(DummyTable.entity_id)
+    name_object = Filter(DummyTable.name_object)
+    ordering = OrderingFilter(
+        name_object=OrderingField(DummyTable.name_object),
+        object_count=OrderingField(DummyTable.object_count),
+    )
+    pagination = LimitOffsetFilter()
+
+
+class IDummyRepository(ISourceRepository):
+    pass
+
+
+def is_async_url(database_url: str) -> bool:
+    return make_url(database_url).get_driver_name() in ASYNC_DRIVERS
+
+
+def create_connection(database_url: str, **engine_kwargs):
+    connection_class = AsyncDbConnection if is_async_url(database_url) else DbConnection
+    return connection_class(database_url, **engine_kwargs)
+
+
+def create_data_source(connection) -> DataSources:
+    return DataSources({DB_CONNECTION_NAME: connection})
+
+
+def create_repository(data_source: DataSources):
+    return create_generic_source_repository(
+        data_source=data_source,
+        domain_class=Dummy,
+        table_class=DummyTable,
+        filterset_class=DummyFilterSet,
+    )
+
+
+def build_entities(amount: int, seed: int, prefix: str = "row") -> list[Dummy]:
+    generator = random.Random(seed)
+    return [
+        Dummy(
+            name_object=f"name-{index % NAME_BUCKETS}",
+            phone=f"{prefix}-{seed}-{index}",
+            object_count=generator.randint(0, 1_000_000),
+        )
+        for index in range(amount)
+    ]
+
+
+async def reset_table(connection) -> None:
+    if isinstance(connection, AsyncDbConnection):
+        async with connection.engine.begin() as db_connection:
+            await db_connection.run_sync(DummyTable.metadata.drop_all)
+            await db_connection.run_sync(DummyTable.metadata.create_all)
+        return
+
+    DummyTable.metadata.drop_all(connection.engine)
+    DummyTable.metadata.create_all(connection.engine)
+
+
+async def seed(repository, rows: int, seed: int) -> None:
+    entities = build_entities(rows, seed=seed)
+    for start in range(0, rows, SEED_CHUNK_SIZE):
+        await repository.create_many(entities[start:start + SEED_CHUNK_SIZE])
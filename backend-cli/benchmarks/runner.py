@@ -0,0 +1,110 @@
+import json
+import math
+import platform
+import time
+from datetime import datetime
+from datetime import timezone
+from typing import Awaitable
+from typing import Callable
+
+import sqlalchemy
+from pydantic import BaseModel
+
+
+class BenchmarkResult(BaseModel):
+    suite: str
+    name: str
+    iterations: int
+    total_seconds: float
+    ops_per_second: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    min_ms: float
+    max_ms: float
+
+
+class BenchmarkReport(BaseModel):
+    started_at: str
+    python: str
+    sqlalchemy: str
+    database: str
+    rows: int
+    iterations: int
+    results: list[BenchmarkResult] = []
+
+
+def percentile(sorted_values: list[float], rank: float) -> float:
+    """Nearest rank percentile of already sorted values."""
+    index = max(0, math.ceil(rank / 100 * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+def summarize(suite: str, name: str, latencies: list[float]) -> BenchmarkResult:
+    values = sorted(latencies)
+    total = sum(values)
+    return BenchmarkResult(
+        suite=suite,
+        name=name,
+        iterations=len(values),
+        total_seconds=total,
+        ops_per_second=len(values) / total if total else 0.0,
+        p50_ms=percentile(values, 50) * 1000,
+        p95_ms=percentile(values, 95) * 1000,
+        p99_ms=percentile(values, 99) * 1000,
+        min_ms=values[0] * 1000,
+        max_ms=values[-1] * 1000,
+    )
+
+
+async def measure(
+    suite: str,
+    name: str,
+    operation: Callable[[int], Awaitable],
+    iterations: int,
+    warmup: int = 5,
+) -> BenchmarkResult:
+    """Time `operation(iteration)` one call at a time, after `warmup` untimed calls."""
+    for iteration in range(warmup):
+        await operation(iteration)
+
+    latencies = []
+    for iteration in range(iterations):
+        started_at = time.perf_counter()
+        await operation(warmup + iteration)
+        latencies.append(time.perf_counter() - started_at)
+    return summarize(suite, name, latencies)
+
+
+def new_report(database: str, rows: int, iterations: int) -> BenchmarkReport:
+    return BenchmarkReport(
+        started_at=datetime.now(timezone.utc).isoformat(),
+        python=platform.python_version(),
+        sqlalchemy=sqlalchemy.__version__,
+        database=database,
+        rows=rows,
+        iterations=iterations,
+    )
+
+
+def print_result(result: BenchmarkResult, baseline: BenchmarkResult | None = None) -> None:
+    line = (
+        f"{result.suite:<12} {result.name:<36} {result.ops_per_second:>10.1f} ops/s"
+        f"  p50 {result.p50_ms:8.3f}ms  p95 {result.p95_ms:8.3f}ms  p99 {result.p99_ms:8.3f}ms"
+    )
+    if baseline is not None and baseline.p50_ms:
+        line += f"  p50 x{result.p50_ms / baseline.p50_ms:.2f} vs baseline"
+    print(line)
+
+
+def load_baseline(path: str | None) -> dict[tuple[str, str], BenchmarkResult]:
+    if not path:
+        return {}
+    with open(path) as baseline_file:
+        report = BenchmarkReport.model_validate(json.load(baseline_file))
+    return {(result.suite, result.name): result for result in report.results}
+
+
+def save_report(report: BenchmarkReport, path: str) -> None:
+    with open(path, "w") as output_file:
+        output_file.write(report.model_dump_json(indent=2))
@@ -0,0 +1,19 @@
+import os
+
+from benchmarks.fixtures import IDummyRepository
+from benchmarks.fixtures import create_connection
+from benchmarks.fixtures import create_repository
+from core.infrastructure.orm.repositories import DB_CONNECTION_NAME
+
+BENCHMARK_DATABASE_URL_ENV_NAME = "BENCHMARK_DATABASE_URL"
+
+SOURCES = {
+    DB_CONNECTION_NAME: {
+        "class": create_connection,
+        "args": [os.environ.get(BENCHMARK_DATABASE_URL_ENV_NAME, "")],
+    },
+}
+
+DEPENDENCIES = {
+    IDummyRepository: {"factory": create_repository},
+}
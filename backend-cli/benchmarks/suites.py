@@ -0,0 +1,215 @@
+import json
+import uuid
+from urllib.parse import urlencode
+
+from fastapi import FastAPI
+
+from benchmarks.app import BenchmarkBootApp
+from benchmarks.app import router
+from benchmarks.fixtures import NAME_BUCKETS
+from benchmarks.fixtures import Dummy
+from benchmarks.fixtures import DummyChange
+from benchmarks.fixtures import DummyFilter
+from benchmarks.fixtures import build_entities
+from benchmarks.runner import BenchmarkResult
+from benchmarks.runner import measure
+from core.infrastructure.orm.mappers import BaseSourceMapper
+from core.infrastructure.orm.mappers import create_generic_source_mapper
+from core.infrastructure.setup_app import create_app
+from core.use_cases.core_use_cases import BaseListPaginationMixinService
+from db_declarative.sqalchemy.infrastructure.orm.tables import DummyTable
+
+PAGE_SIZE = 50
+MAPPER_BATCH_SIZE = 500
+
+
+class BenchmarkContext:
+    """Everything a suite needs: the seeded repository, its size and the timing settings."""
+
+    def __init__(self, repository, rows: int, iterations: int, warmup: int) -> None:
+        self.repository = repository
+        self.rows = rows
+        self.iterations = iterations
+        self.warmup = warmup
+
+    async def measure(self, suite: str, name: str, operation) -> BenchmarkResult:
+        return await measure(suite, name, operation, iterations=self.iterations, warmup=self.warmup)
+
+    @property
+    def deep_offset(self) -> int:
+        return max(0, self.rows - PAGE_SIZE)
+
+
+async def repository_suite(context: BenchmarkContext) -> list[BenchmarkResult]:
+    repository = context.repository
+    created_ids = []
+
+    async def find(iteration: int):
+        return await repository.find(DummyFilter(name_object=f"name-{iteration % NAME_BUCKETS}"))
+
+    async def count(iteration: int):
+        return await repository.count(DummyFilter(name_object=f"name-{iteration % NAME_BUCKETS}"))
+
+    async def create(iteration: int):
+        entity = await repository.create(Dummy(name_object="bench-create", phone=f"bench-create-{iteration}"))
+        created_ids.append(entity.entity_id)
+
+    async def update_many(iteration: int):
+        change_request = DummyChange(object_count=iteration)
+        return await repository.update_many(DummyFilter(name_object=f"name-{iteration % NAME_BUCKETS}"), change_request)
+
+    async def delete(iteration: int):
+        # One created row per call, so deletes never run out of rows while the suite timings stay comparable.
+        entity_id = created_ids.pop()
+        return await repository.delete(DummyFilter(entity_id=entity_id))
+
+    return [
+        await context.measure("repository", "find", find),
+        await context.measure("repository", "count", count),
+        await context.measure("repository", "create", create),
+        await context.measure("repository", "update_many", update_many),
+        await context.measure("repository", "delete", delete),
+    ]
+
+
+class PageService(BaseListPaginationMixinService):
+    def __init__(self, repository, with_total: bool = True, keyset_pagination: bool = False) -> None:
+        self.repo_instance = repository
+        self.with_total = with_total
+        self.keyset_pagination = keyset_pagination
+
+
+async def pagination_suite(context: BenchmarkContext) -> list[BenchmarkResult]:
+    repository = context.repository
+    ordering = ["name_object"]
+
+    def page_operation(offset: int, with_total: bool):
+        service = PageService(repository, with_total=with_total)
+
+        async def operation(iteration: int):
+            return await service.run(DummyFilter(ordering=ordering, pagination=(PAGE_SIZE, offset)))
+
+        return operation
+
+    # The token of the batch right before the deep page, so the keyset run reads the same rows as the offset one.
+    keyset_service = PageService(repository, keyset_pagination=True)
+    deep_token = None
+    if context.deep_offset:
+        previous = await keyset_service.run(DummyFilter(ordering=ordering, pagination=(context.deep_offset, 0)))
+        deep_token = previous.next_token
+
+    async def keyset_deep(iteration: int):
+        return await keyset_service.run(
+            DummyFilter(ordering=ordering, pagination=(PAGE_SIZE, 0), batch_token=deep_token)
+        )
+
+    return [
+        await context.measure("pagination", "offset_shallow_total", page_operation(0, True)),
+        await context.measure("pagination", "offset_shallow_has_next", page_operation(0, False)),
+        await context.measure("pagination", "offset_deep_total", page_operation(context.deep_offset, True)),
+        await context.measure("pagination", "offset_deep_has_next", page_operation(context.deep_offset, False)),
+        await context.measure("pagination", "keyset_deep", keyset_deep),
+    ]
+
+
+async def mapper_suite(context: BenchmarkContext) -> list[BenchmarkResult]:
+    entities = build_entities(MAPPER_BATCH_SIZE, seed=context.rows, prefix="mapper")
+    rows = [{**entity.model_dump(), "entity_id": uuid.uuid4()} for entity in entities]
+    tables = [DummyTable(**row) for row in rows]
+
+    projected = create_generic_source_mapper(table_class=DummyTable, domain_class=Dummy)
+    trusted = create_generic_source_mapper(table_class=DummyTable, domain_class=Dummy, trusted=True)
+    orm = BaseSourceMapper()
+    orm.domain_class, orm.table_class = Dummy, DummyTable
+
+    async def projected_to_entities(iteration: int):
+        return await projected.to_entities(rows)
+
+    async def trusted_to_entities(iteration: int):
+        return await trusted.to_entities(rows)
+
+    async def orm_to_entities(iteration: int):
+        return await orm.to_entities(tables)
+
+    async def to_rows(iteration: int):
+        return [await projected.to_row(entity) for entity in entities]
+
+    name = f"x{MAPPER_BATCH_SIZE}"
+    return [
+        await context.measure("mapper", f"projected_to_entities_{name}", projected_to_entities),
+        await context.measure("mapper", f"trusted_to_entities_{name}", trusted_to_entities),
+        await context.measure("mapper", f"orm_to_entities_{name}", orm_to_entities),
+        await context.measure("mapper", f"to_row_{name}", to_rows),
+    ]
+
+
+async def call_asgi(app: FastAPI, method: str, path: str, query: dict | None = None, body=None) -> tuple[int, bytes]:
+    """Run one request through the ASGI app in process, without sockets."""
+    payload = json.dumps(body).encode() if body is not None else b""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": urlencode(query or {}).encode(),
+        "headers": [(b"host", b"benchmark"), (b"content-type", b"application/json")],
+        "client": ("127.0.0.1", 0),
+        "server": ("benchmark", 80),
+    }
+    messages = [{"type": "http.request", "body": payload, "more_body": False}]
+    response = {"status": None, "body": b""}
+
+    async def receive():
+        return messages.pop(0) if messages else {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+
+    await app(scope, receive, send)
+    return response["status"], response["body"]
+
+
+async def api_suite(context: BenchmarkContext) -> list[BenchmarkResult]:
+    app = create_app(router, boot_app_class=BenchmarkBootApp)
+    first_page = await context.repository.find(DummyFilter(pagination=(PAGE_SIZE, 0)))
+    entity_ids = [entity.entity_id for entity in first_page]
+    deep_page = context.deep_offset // PAGE_SIZE + 1
+
+    async def request(method: str, path: str, query: dict | None = None, body=None):
+        status_code, content = await call_asgi(app, method, path, query=query, body=body)
+        if status_code >= 400:
+            raise RuntimeError(f"{method} {path} failed with {status_code}: {content[:200]!r}")
+
+    async def list_shallow(iteration: int):
+        await request("GET", "/api/v1/dummies", {"page": 1, "size": PAGE_SIZE})
+
+    async def list_deep(iteration: int):
+        await request("GET", "/api/v1/dummies", {"page": deep_page, "size": PAGE_SIZE})
+
+    async def retrieve(iteration: int):
+        await request("GET", f"/api/v1/dummies/{entity_ids[iteration % len(entity_ids)]}")
+
+    async def create(iteration: int):
+        await request("POST", "/api/v1/dummies", body={"name_object": "bench-api", "phone": f"bench-api-{iteration}"})
+
+    return [
+        await context.measure("api", "list_shallow", list_shallow),
+        await context.measure("api", "list_deep", list_deep),
+        await context.measure("api", "retrieve", retrieve),
+        await context.measure("api", "create", create),
+    ]
+
+
+SUITES = {
+    "repository": repository_suite,
+    "pagination": pagination_suite,
+    "mapper": mapper_suite,
+    "api": api_suite,
+}
@@ -0,0 +1,23 @@
+import inject
+from fastapi import APIRouter
+
+from core.domain.repositories import DataSources
+from core.infrastructure.dependencies import DependencyProviders
+
+debug_router = APIRouter(prefix="/debug", tags=["debug"])
+
+
+@debug_router.get("/pool")
+async def get_pool_stats() -> dict:
+    data_source = inject.instance(DataSources)
+    return {
+        name: source.pool_stats()
+        for name, source in data_source.sources.items()
+        if callable(getattr(source, "pool_stats", None))
+    }
+
+
+@debug_router.get("/dependencies")
+async def get_dependency_stats() -> dict:
+    providers = inject.instance(DependencyProviders)
+    return {"dependencies": providers.stats(), "unused": providers.unused()}
@@ -0,0 +1,30 @@
+import inject
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from core.domain.repositories import DataSources
+from core.use_cases.instrumentation import get_service_metrics
+
+PROMETHEUS_MEDIA_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+metrics_router = APIRouter(tags=["metrics"])
+
+
+def get_pools() -> dict:
+    pools = {}
+    for name, source in inject.instance(DataSources).sources.items():
+        if not callable(getattr(source, "pool_stats", None)):
+            continue
+        stats = source.pool_stats()
+        if "pool_class" in stats:
+            pools[name] = stats
+        else:
+            # Replica sets report one pool per replica.
+            pools.update({f"{name}.{index}": replica_stats for index, replica_stats in stats.items()})
+    return pools
+
+
+@metrics_router.get("/metrics", response_class=PlainTextResponse)
+async def get_metrics() -> PlainTextResponse:
+    content = get_service_metrics().render(pools=get_pools())
+    return PlainTextResponse(content, media_type=PROMETHEUS_MEDIA_TYPE)
@@ -0,0 +1,131 @@
+import logging
+
+from core.infrastructure.orm.profiler import QueryProfiler
+from core.infrastructure.orm.replicas import primary_pin_scope
+from core.infrastructure.orm.unit_of_work import UnitOfWork
+from core.use_cases.conditional import ConditionalRequest
+from core.use_cases.conditional import current_conditional_request
+from core.use_cases.loaders import request_loaders
+
+logger = logging.getLogger(__name__)
+
+
+class UnitOfWorkMiddleware:
+    """Run every HTTP request inside a `UnitOfWork`.
+
+    The transaction is committed right before the response starts, so a client never gets a success that wasn't
+    persisted, and error responses roll it back.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        unit_of_work = UnitOfWork()
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                await unit_of_work.close(commit=message["status"] < 400)
+            await send(message)
+
+        async with unit_of_work:
+            await self.app(scope, receive, send_wrapper)
+
+
+class LoaderMiddleware:
+    """Give every HTTP request its own entity loaders, so lookups are batched and cached per request."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = request_loaders.set({})
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_loaders.reset(token)
+
+
+class PrimaryPinMiddleware:
+    """Give every HTTP request its own primary pin, reads only skip the replicas after the request wrote."""
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with primary_pin_scope():
+            await self.app(scope, receive, send)
+
+
+class QueryProfilerMiddleware:
+    """Profile the SQL of every HTTP request against the query budget of `profiler`.
+
+    The budget is checked right before the response starts, so with `fail_on_budget` the request fails with a 500
+    instead of sending a response that can't be taken back. Queries run after that point are only logged.
+    """
+
+    def __init__(self, app, profiler: QueryProfiler) -> None:
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start":
+                query_profile.start_response()
+            await send(message)
+
+        with self.profiler.profile() as query_profile:
+            await self.app(scope, receive, send_wrapper)
+        logger.debug(f"{scope['method']} {scope['path']}: {query_profile.summary()}")
+
+
+class ConditionalGetMiddleware:
+    """Hand the validators of GET requests to the conditional services and add the computed ones to the response.
+
+    Services with `conditional` set raise `NotModifiedException` before loading any row when the client copy is
+    still current, which the exception handlers turn into a 304.
+    """
+
+    methods = {"GET", "HEAD"}
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] not in self.methods:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        if_none_match, if_modified_since = headers.get(b"if-none-match"), headers.get(b"if-modified-since")
+        conditional = ConditionalRequest(
+            if_none_match=if_none_match.decode("latin-1") if if_none_match else None,
+            if_modified_since=if_modified_since.decode("latin-1") if if_modified_since else None,
+        )
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start" and message["status"] in (200, 304):
+                message = {**message, "headers": [*message.get("headers", []), *conditional.headers()]}
+            await send(message)
+
+        token = current_conditional_request.set(conditional)
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_conditional_request.reset(token)
@@ -0,0 +1,29 @@
+from typing import Any
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
+from pydantic_core import to_jsonable_python
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+
+
+class ApiJSONResponse(JSONResponse):
+    """JSON response rendered straight to bytes, with NaN and infinities as null.
+
+    FastAPI hands over the content of routes already encoded as plain data, which goes through orjson when it is
+    installed, falling back to pydantic for what orjson can't encode, e.g. integers over 64 bits. Routes returning
+    `ApiJSONResponse(output)` themselves skip that encoding, pydantic outputs are then serialized by their compiled
+    serializer without an intermediate dict.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if orjson is not None and not isinstance(content, BaseModel):
+            try:
+                return orjson.dumps(content, default=to_jsonable_python, option=orjson.OPT_NON_STR_KEYS)
+            except orjson.JSONEncodeError:
+                pass
+        return to_json(content, inf_nan_mode="null")
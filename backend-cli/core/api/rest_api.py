@@ -1,9 +1,15 @@
 from typing import Annotated
+from typing import AsyncIterator
 from fastapi import Query
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from pydantic_core import to_json
 
+from core.api.serializers import ApiMapper
 
 
 DEFAULT_PAGE_SIZE = 10
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
 
 async def get_pagination_parameters(
@@ -26,3 +32,37 @@ async def get_pagination_parameters(
 ) -> tuple[int, int]:
     offset = size * (page - 1)
     return size, offset
+
+
+async def get_batch_pagination_parameters(
+    batch_token: Annotated[
+        str | None,
+        Query(
+            title="Batch token",
+            description="Token returned by the previous batch. Omit it to get the first batch.",
+        ),
+    ] = None,
+    size: Annotated[
+        int,
+        Query(
+            title="Amount of records per batch.",
+            description="Amount of elements per batch.",
+            examples=[50],
+        ),
+    ] = DEFAULT_PAGE_SIZE,
+) -> tuple[int, str | None]:
+    return size, batch_token
+
+
+def ndjson_streaming_response(items: AsyncIterator[BaseModel], mapper: ApiMapper | None = None) -> StreamingResponse:
+    async def content():
+        try:
+            async for entity in items:
+                output = await mapper.to_api(entity=entity) if mapper else entity
+                yield to_json(output) + b"\n"
+        finally:
+            # Release the database cursor right away when the client disconnects.
+            if hasattr(items, "aclose"):
+                await items.aclose()
+
+    return StreamingResponse(content(), media_type=NDJSON_MEDIA_TYPE)
@@ -6,6 +6,7 @@ import logging
 from fastapi.exceptions import RequestValidationError
 from fastapi import HTTPException
 
+from core.domain.exceptions import OverloadedException
 from core.domain.exceptions import ValidationException
 from core.domain.models import BaseEntity, PageResult
 
@@ -24,7 +25,9 @@ class ApiOutput(BaseModel):
 
 class BasePageOutput(ApiOutput, Generic[ModelOutput]):
     items: List[ModelOutput]
-    total: int = 0
+    total: int | None = 0
+    has_next: bool | None = None
+    next_token: str | None = None
 
 
 class ApiMapper(BaseModel):
@@ -32,6 +35,10 @@ class ApiMapper(BaseModel):
         """Map an Entity to a Presenter"""
         raise NotImplementedError()
 
+    async def to_api_many(self, entities: list[BaseEntity]) -> list[ApiOutput]:
+        """Map a list of Entities, override it when the whole list can be mapped at once."""
+        return [await self.to_api(entity=entity) for entity in entities]
+
     async def to_entity(self, *args, **kwargs) -> BaseEntity:
         """Map a Payload to an Entity"""
         raise NotImplementedError()
@@ -41,9 +48,12 @@ class PageMapper(ApiMapper):
     entity_mapper: ApiMapper
 
     async def to_api(self, page_result: PageResult) -> BasePageOutput:
-        return BasePageOutput(
+        # Items are already outputs, there is nothing left to validate.
+        return BasePageOutput.model_construct(
             total=page_result.total,
-            items=[await self.entity_mapper.to_api(entity=entity) for entity in page_result.items],
+            has_next=page_result.has_next,
+            next_token=page_result.next_token,
+            items=await self.entity_mapper.to_api_many(page_result.items),
         )
 
 class ValidationItemOutput(ApiOutput):
@@ -58,11 +68,11 @@ class ValidationOutput(ApiOutput):
 
 class ValidationMapper(ApiMapper):
     async def to_api(self, exception: ValidationException) -> ValidationOutput:
-        items = []
-        for fail_rule in exception.fail_rules:
-            items.append(ValidationItemOutput(key=fail_rule.key, message=fail_rule.message))
+        return ValidationOutput(message=str(exception), fails=await self.to_api_items(exception.fail_rules))
 
-        return ValidationOutput(message=str(exception), fails=items)
+    async def to_api_items(self, fail_rules: list) -> List[ValidationItemOutput]:
+        """Works for failed rules and for the `RowFail` items of batch rules, keyed as `{row}.{key}`."""
+        return [ValidationItemOutput(key=fail_rule.key, message=fail_rule.message) for fail_rule in fail_rules]
 
     async def to_api_from_request_validation_error(self, exception: RequestValidationError) -> ValidationOutput:
         exception_message = "The request contains some invalid values."
@@ -89,6 +99,9 @@ class ValidationMapper(ApiMapper):
         exception_message = "Unauthorized"
         return ValidationOutput(message=exception_message, fails=[])
 
+    async def to_api_from_overloaded_error(self, exception: OverloadedException) -> ValidationOutput:
+        return ValidationOutput(message=str(exception), fails=[])
+
     async def to_api_from_http_error(self, error: HTTPException) -> ValidationOutput:
         exception_message = error.detail
         return ValidationOutput(message=exception_message, fails=[])
@@ -16,3 +16,13 @@ class ValidationException(BaseException):
 
 class DuplicateException(BaseException):
     pass
+
+
+class OverloadedException(BaseException):
+    def __init__(self, message: str, retry_after: float | None = None):
+        self.retry_after = retry_after
+        super().__init__(message)
+
+
+class NotModifiedException(BaseException):
+    pass
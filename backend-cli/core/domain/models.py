@@ -33,6 +33,26 @@ class BaseEntity(BaseModel):
 class PageResult(BaseModel, Generic[ResultModel]):
     items: List[ResultModel] = []
     total: int | None = None
+    has_next: bool | None = None
+    next_token: str | None = None
+
+
+class BulkConflict(BaseModel):
+    index: int
+    message: str
+
+
+class BulkResult(BaseModel, Generic[ResultModel]):
+    items: List[ResultModel] = []
+    conflicts: List[BulkConflict] = []
+
+
+class DataVersion(BaseModel):
+    """Validator of a set of rows, `digest` changes whenever a row is added, removed or updated."""
+
+    last_modified: datetime | None = None
+    count: int = 0
+    digest: str | None = None  # Sum of the hashes of the ids and row versions, `last_modified` misses late commits.
 
 
 class BaseChangeRequest(BaseModel):
@@ -1,21 +1,116 @@
+import threading
 from abc import abstractmethod
 from abc import ABC
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+from typing import AsyncContextManager
+from typing import AsyncIterator
+from typing import Awaitable
+from typing import Callable
 
+from core.domain.exceptions import DuplicateException
 from core.domain.filters import BaseSchemaFilter
 from core.domain.models import BaseEntity
 from core.domain.models import BaseChangeRequest
+from core.domain.models import BulkConflict
+from core.domain.models import BulkResult
+from core.domain.models import DataVersion
+from core.domain.models import PageResult
 
 
 class DataSources:
+    """Named sources of the app, either built up front with `add` or on their first `get` with `add_factory`.
+
+    `sources` only holds the sources built so far, a factory can declare the class of its source so it can be known
+    without building it.
+    """
+
     def __init__(self, sources: dict | None = None):
         self.sources = sources.copy() if sources else {}
+        self.factories: dict[str, Callable[[], Any]] = {}
+        self.source_classes: dict[str, type] = {}
+        self.watchers: list[Callable[[str, Any], None]] = []
+        self.lock = threading.RLock()
 
     def add(self, name: str, source_instance):
         self.sources[name] = source_instance
+        for watcher in self.watchers:
+            watcher(name, source_instance)
+
+    def add_factory(self, name: str, factory: Callable[[], Any], source_class: type | None = None):
+        self.factories[name] = factory
+        if source_class is not None:
+            self.source_classes[name] = source_class
 
     def get(self, name):
+        if name in self.sources or name not in self.factories:
+            return self.sources[name]
+
+        with self.lock:
+            if name not in self.sources:
+                self.add(name, self.factories[name]())
         return self.sources[name]
 
+    def get_class(self, name) -> type:
+        """Class of the source, only built when its factory didn't declare one."""
+        if name not in self.sources and name in self.source_classes:
+            return self.source_classes[name]
+        return type(self.get(name))
+
+    def build_all(self):
+        for name in list(self.factories):
+            self.get(name)
+
+    def __contains__(self, name) -> bool:
+        return name in self.sources or name in self.factories
+
+    def watch(self, watcher: Callable[[str, Any], None]):
+        """Call `watcher(name, source)` for every source, the ones built so far and the ones built later."""
+        self.watchers.append(watcher)
+        for name, source_instance in list(self.sources.items()):
+            watcher(name, source_instance)
+
+
+class IUnitOfWork(ABC):
+    active: bool
+
+    @abstractmethod
+    def nested(self) -> AsyncContextManager:
+        """Scope of a nested service, rolled back on its own when it fails."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def on_commit(self, callback: Callable[[], Awaitable]) -> None:
+        """Await `callback` once the transaction is committed, it is dropped if it rolls back."""
+        raise NotImplementedError()
+
+
+current_unit_of_work: ContextVar[IUnitOfWork | None] = ContextVar("current_unit_of_work", default=None)
+
+# Errors logged and swallowed by repositories, only collected inside `track_errors`.
+swallowed_errors: ContextVar[list | None] = ContextVar("swallowed_errors", default=None)
+
+
+def record_error(error: Exception) -> None:
+    errors = swallowed_errors.get()
+    if errors is not None:
+        errors.append(error)
+
+
+@contextmanager
+def track_errors():
+    """Collect the errors repositories swallow in the block, their empty results aren't real answers."""
+    outer = swallowed_errors.get()
+    errors = []
+    token = swallowed_errors.set(errors)
+    try:
+        yield errors
+    finally:
+        swallowed_errors.reset(token)
+        if outer is not None:
+            outer.extend(errors)
+
 
 class IBaseRepository(ABC):
     def __init__(self, data_source: DataSources | None = None):
@@ -23,19 +118,75 @@ class IBaseRepository(ABC):
 
 
 class ISourceRepository(IBaseRepository):
+    """Source of one kind of entity.
+
+    Only the basic operations are abstract. The rest fall back on them, or raise `NotImplementedError` when they
+    can't be built on them, so repositories written before them keep working and override what they can do better.
+    """
 
     @abstractmethod
     async def find(self, filter_schema: BaseSchemaFilter) -> list[BaseEntity]:
         raise NotImplementedError()
 
+    async def stream(self, filter_schema: BaseSchemaFilter, chunk_size: int | None = None) -> AsyncIterator[BaseEntity]:
+        for entity in await self.find(filter_schema=filter_schema):
+            yield entity
+
+    async def find_by_ids(self, entity_ids: list[str]) -> list[BaseEntity]:
+        raise NotImplementedError()
+
+    async def existing_values(self, field: str, values: list[Any]) -> dict[str, list[str]]:
+        """Ids of the entities holding each of `values` in `field`, keyed by the value as string."""
+        raise NotImplementedError()
+
+    async def find_batch(self, filter_schema: BaseSchemaFilter) -> PageResult[BaseEntity]:
+        raise NotImplementedError()
+
+    async def find_page(self, filter_schema: BaseSchemaFilter, with_total: bool = True) -> PageResult[BaseEntity]:
+        limit, offset = filter_schema.pagination or (None, 0)
+        if not with_total:
+            # One extra row tells whether there is a next page.
+            extended = filter_schema.model_copy(update={"pagination": (limit + 1, offset)}) if limit else filter_schema
+            items = await self.find(filter_schema=extended)
+            return PageResult(items=items[:limit], has_next=limit is not None and len(items) > limit)
+
+        items = await self.find(filter_schema=filter_schema)
+        total = await self.count(filter_schema=filter_schema.model_copy(update={"pagination": None}))
+        return PageResult(items=items, total=total, has_next=offset + len(items) < total)
+
     @abstractmethod
     async def create(self, entity: BaseEntity) -> BaseEntity:
         raise NotImplementedError()
 
+    async def create_many(self, entities: list[BaseEntity], chunk_size: int | None = None) -> BulkResult[BaseEntity]:
+        items, conflicts = [], []
+        for index, entity in enumerate(entities):
+            try:
+                items.append(await self.create(entity=entity))
+            except DuplicateException as error:
+                conflicts.append(BulkConflict(index=index, message=str(error)))
+        return BulkResult(items=items, conflicts=conflicts)
+
+    async def upsert_many(
+        self,
+        entities: list[BaseEntity],
+        conflict_fields: list[str] | None = None,
+        update_fields: list[str] | None = None,
+        chunk_size: int | None = None,
+    ) -> BulkResult[BaseEntity]:
+        raise NotImplementedError()
+
     @abstractmethod
     async def count(self, filter_schema: BaseSchemaFilter) -> int:
         raise NotImplementedError()
 
+    async def get_version(self, filter_schema: BaseSchemaFilter) -> DataVersion | None:
+        """Validator of the filtered rows, pagination and ordering aside. None when the source has none."""
+        return None
+
+    async def get_version_by_ids(self, entity_ids: list[str]) -> DataVersion | None:
+        return None
+
     @abstractmethod
     async def update_one(self, entity: BaseEntity, change_request: BaseChangeRequest) -> BaseEntity:
         raise NotImplementedError()
@@ -44,6 +195,16 @@ class ISourceRepository(IBaseRepository):
     async def update_many(self, filter_schema: BaseSchemaFilter, change_request: BaseChangeRequest) -> int:
         raise NotImplementedError()
 
+    async def update_many_returning(
+        self, filter_schema: BaseSchemaFilter, change_request: BaseChangeRequest, ids_only: bool = False
+    ) -> list[BaseEntity] | list[str]:
+        raise NotImplementedError()
+
     @abstractmethod
     async def delete(self, filter_schema: BaseSchemaFilter) -> int:
         raise NotImplementedError()
+
+    async def delete_returning(
+        self, filter_schema: BaseSchemaFilter, ids_only: bool = False
+    ) -> list[BaseEntity] | list[str]:
+        raise NotImplementedError()
@@ -1,8 +1,21 @@
 import re
 from abc import abstractmethod
+from functools import lru_cache
+from typing import Any
 from typing import Optional
 
 from pydantic import BaseModel
+from pydantic import PrivateAttr
+from pydantic import SkipValidation
+
+COMPILED_PATTERNS_CACHE_SIZE = 512
+EMAIL_PATTERN = r"([-!#-'*+/-9=?A-Z^-~]+(\.[-!#-'*+/-9=?A-Z^-~]+)*|\"([]!#-[^-~ \t]|(\\[\t -~]))+\")@([-!#-'*+/-9=?A-Z^-~]+(\.[-!#-'*+/-9=?A-Z^-~]+)*|\[[\t -Z^-~]*])"  # noqa
+
+
+@lru_cache(maxsize=COMPILED_PATTERNS_CACHE_SIZE)
+def compile_pattern(pattern: str) -> re.Pattern:
+    """Process wide cache of compiled patterns, `re` keeps only a small one of its own."""
+    return re.compile(pattern)
 
 
 class BaseRule(BaseModel):
@@ -14,6 +27,11 @@ class BaseRule(BaseModel):
     async def execute(self) -> bool:
         raise NotImplementedError()
 
+    @classmethod
+    async def prefetch(cls, rules: list["BaseRule"]) -> None:
+        """Load what all the `rules` of a validation run need at once, before any of them runs."""
+        pass
+
     @property
     def key(self) -> str:
         return self.rule_key
@@ -31,14 +49,117 @@ class RegexRule(BaseRule):
         if self.value is None:
             return True
 
-        # compiling the pattern for alphanumeric string
-        pat = re.compile(self.pattern)
-
         # Checks whether the whole string matches the re.pattern or not
-        return re.fullmatch(pat, self.value)
+        return compile_pattern(self.pattern).fullmatch(self.value) is not None
 
 
 class EmailRule(RegexRule):
     value: Optional[str] = None
-    pattern: str = r"([-!#-'*+/-9=?A-Z^-~]+(\.[-!#-'*+/-9=?A-Z^-~]+)*|\"([]!#-[^-~ \t]|(\\[\t -~]))+\")@([-!#-'*+/-9=?A-Z^-~]+(\.[-!#-'*+/-9=?A-Z^-~]+)*|\[[\t -Z^-~]*])"  # noqa
+    pattern: str = EMAIL_PATTERN
+    rule_message: str = "Invalid email"
+
+
+class UniqueRule(BaseRule):
+    """Fails when `value` is already stored in `field` by another entity than `exclude_id`.
+
+    `repository` is the `ISourceRepository` of the table. Rules of the same repository and field in a validation run
+    are checked with a single query.
+    """
+
+    value: Any = None
+    field: str
+    repository: SkipValidation[Any]
+    exclude_id: Optional[str] = None
+    rule_message: str = "Already exists."
+    _existing: dict | None = PrivateAttr(default=None)
+
+    async def execute(self) -> bool:
+        if self.value is None:
+            return True
+
+        if self._existing is None:
+            await self.prefetch([self])
+        return all(entity_id == self.exclude_id for entity_id in self._existing.get(str(self.value), []))
+
+    @classmethod
+    async def prefetch(cls, rules: list["UniqueRule"]) -> None:
+        groups = {}
+        for rule in rules:
+            if rule.value is not None:
+                groups.setdefault((id(rule.repository), rule.field), []).append(rule)
+
+        for group in groups.values():
+            values = list({rule.value for rule in group})
+            existing = await group[0].repository.existing_values(field=group[0].field, values=values)
+            for rule in group:
+                rule._existing = existing
+
+
+class RowFail(BaseModel):
+    """Failure of one row in a batch rule, it exposes `key` and `message` like a failed `BaseRule`."""
+
+    row: int
+    rule_key: str
+    rule_message: str
+
+    @property
+    def key(self) -> str:
+        return f"{self.row}.{self.rule_key}"
+
+    @property
+    def message(self) -> str:
+        return self.rule_message
+
+
+class BaseBatchRule(BaseModel):
+    """Rule checked over a whole column of values at once, one per row."""
+
+    rule_key: str = "general"
+    rule_message: str = "Fail validation."
+    values: SkipValidation[list[Any]] = []  # Not validated item by item, it may hold a whole import.
+
+    @abstractmethod
+    async def execute(self) -> list[int]:
+        """Return the indexes of the failed values."""
+        raise NotImplementedError()
+
+    def to_fails(self, rows: list[int]) -> list[RowFail]:
+        # Rows come from our own enumeration, so the fails are built without validation.
+        return [
+            RowFail.model_construct(row=row, rule_key=self.rule_key, rule_message=self.rule_message) for row in rows
+        ]
+
+
+class BatchRegexRule(BaseBatchRule):
+    pattern: str
+
+    async def execute(self) -> list[int]:
+        fullmatch = compile_pattern(self.pattern).fullmatch
+        return [row for row, value in enumerate(self.values) if value is not None and fullmatch(value) is None]
+
+
+class BatchUniqueRule(BaseBatchRule):
+    """Fails the rows whose value is already stored in `field`, see `UniqueRule`, or taken by an earlier row."""
+
+    field: str
+    repository: SkipValidation[Any]
+    rule_message: str = "Already exists."
+
+    async def execute(self) -> list[int]:
+        values = list({value for value in self.values if value is not None})
+        existing = await self.repository.existing_values(field=self.field, values=values) if values else {}
+
+        rows, seen = [], set()
+        for row, value in enumerate(self.values):
+            if value is None:
+                continue
+            key = str(value)
+            if key in existing or key in seen:
+                rows.append(row)
+            seen.add(key)
+        return rows
+
+
+class BatchEmailRule(BatchRegexRule):
+    pattern: str = EMAIL_PATTERN
     rule_message: str = "Invalid email"
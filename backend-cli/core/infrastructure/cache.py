@@ -0,0 +1,343 @@
+import hashlib
+import json
+import logging
+import time
+from abc import ABC
+from abc import abstractmethod
+from collections import OrderedDict
+from typing import Any
+from typing import AsyncIterator
+from weakref import WeakSet
+
+from pydantic import TypeAdapter
+from pydantic import ValidationError
+
+from core.domain.filters import BaseSchemaFilter
+from core.domain.models import BaseChangeRequest
+from core.domain.models import BaseEntity
+from core.domain.models import BulkResult
+from core.domain.models import DataVersion
+from core.domain.models import PageResult
+from core.domain.repositories import DataSources
+from core.domain.repositories import ISourceRepository
+from core.domain.repositories import current_unit_of_work
+from core.domain.repositories import track_errors
+from core.infrastructure.orm.repositories import create_generic_source_repository
+
+logger = logging.getLogger(__name__)
+
+CACHE_SOURCE_NAME = "cache"
+DEFAULT_CACHE_TTL = 60
+DEFAULT_CACHE_MAX_ENTRIES = 10_000
+DEFAULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+
+
+class ICacheBackend(ABC):
+    @abstractmethod
+    async def get(self, namespace: str, key: str) -> bytes | None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def set(self, namespace: str, key: str, value: bytes, ttl: float | None = None) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    async def invalidate(self, namespace: str) -> None:
+        raise NotImplementedError()
+
+
+class InMemoryCacheBackend(ICacheBackend):
+    """Process local LRU cache with TTL eviction, bounded by entries and by stored bytes."""
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_CACHE_MAX_BYTES,
+        default_ttl: float | None = DEFAULT_CACHE_TTL,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.entries: OrderedDict[tuple[str, int, str], tuple[float | None, bytes]] = OrderedDict()
+        self.versions: dict[str, int] = {}
+        self.size = 0
+
+    async def get(self, namespace: str, key: str) -> bytes | None:
+        entry_key = self.build_key(namespace, key)
+        entry = self.entries.get(entry_key)
+        if entry is None:
+            return None
+
+        expires_at, value = entry
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.pop(entry_key)
+            return None
+
+        self.entries.move_to_end(entry_key)
+        return value
+
+    async def set(self, namespace: str, key: str, value: bytes, ttl: float | None = None) -> None:
+        if len(value) > self.max_bytes:
+            return
+
+        ttl = ttl if ttl is not None else self.default_ttl
+        entry_key = self.build_key(namespace, key)
+        self.pop(entry_key)
+        self.entries[entry_key] = (time.monotonic() + ttl if ttl else None, value)
+        self.size += len(value)
+
+        while len(self.entries) > self.max_entries or self.size > self.max_bytes:
+            self.pop(next(iter(self.entries)))
+
+    async def invalidate(self, namespace: str) -> None:
+        # Like `SharedCacheBackend`, entries of older versions are never read again and age out of the LRU.
+        self.versions[namespace] = self.versions.get(namespace, 0) + 1
+
+    def build_key(self, namespace: str, key: str) -> tuple[str, int, str]:
+        return namespace, self.versions.get(namespace, 0), key
+
+    def pop(self, entry_key: tuple[str, int, str]) -> None:
+        entry = self.entries.pop(entry_key, None)
+        if entry is not None:
+            self.size -= len(entry[1])
+
+
+class SharedCacheBackend(ICacheBackend):
+    """Cache shared between processes on top of an async key value client.
+
+    The client needs the `get`, `set(key, value, ex=seconds)` and `incr` coroutines of `redis.asyncio.Redis`.
+    Invalidation bumps a namespace version that is part of every key, so stale entries are never read again and
+    expire by TTL on the server.
+    """
+
+    def __init__(self, client, prefix: str = "avang", default_ttl: float | None = DEFAULT_CACHE_TTL) -> None:
+        self.client = client
+        self.prefix = prefix
+        self.default_ttl = default_ttl
+
+    @classmethod
+    def from_url(cls, url: str, **kwargs) -> "SharedCacheBackend":
+        try:
+            from redis import asyncio as redis_asyncio
+        except ImportError:
+            logger.error("Install `redis` to use a shared cache backend from an url.")
+            raise
+        return cls(client=redis_asyncio.from_url(url), **kwargs)
+
+    async def get(self, namespace: str, key: str) -> bytes | None:
+        return await self.client.get(await self.build_key(namespace, key))
+
+    async def set(self, namespace: str, key: str, value: bytes, ttl: float | None = None) -> None:
+        ttl = ttl if ttl is not None else self.default_ttl
+        await self.client.set(await self.build_key(namespace, key), value, ex=int(ttl) if ttl else None)
+
+    async def invalidate(self, namespace: str) -> None:
+        await self.client.incr(self.version_key(namespace))
+
+    async def build_key(self, namespace: str, key: str) -> str:
+        version = await self.client.get(self.version_key(namespace))
+        return f"{self.prefix}:{namespace}:{int(version or 0)}:{key}"
+
+    def version_key(self, namespace: str) -> str:
+        return f"{self.prefix}:{namespace}:version"
+
+
+class LocalCacheClient:
+    """In process stand in for the `SharedCacheBackend` client, meant for tests and local runs."""
+
+    def __init__(self) -> None:
+        self.values: dict[str, tuple[float | None, Any]] = {}
+
+    async def get(self, key: str):
+        expires_at, value = self.values.get(key, (None, None))
+        if expires_at is not None and expires_at <= time.monotonic():
+            self.values.pop(key, None)
+            return None
+        return value
+
+    async def set(self, key: str, value, ex: int | None = None) -> None:
+        self.values[key] = (time.monotonic() + ex if ex else None, value)
+
+    async def incr(self, key: str) -> int:
+        value = int(await self.get(key) or 0) + 1
+        self.values[key] = (None, value)
+        return value
+
+
+class CachedSourceRepository(ISourceRepository):
+    """Read-through cache around any `ISourceRepository`.
+
+    `find`, `count`, `find_page` and `find_batch` results are cached by table and normalized filters. Every write
+    invalidates the whole table namespace, again once its unit of work commits. `stream` is never cached, nor are
+    reads made inside a unit of work or whose error the repository swallowed. Results are stored as JSON and
+    validated back into the domain class, so a shared backend never holds anything executable.
+    """
+
+    def __init__(
+        self,
+        repository: ISourceRepository,
+        cache: ICacheBackend,
+        namespace: str | None = None,
+        ttl: float | None = None,
+    ):
+        super().__init__(data_source=repository.data_source)
+        self.repository = repository
+        self.cache = cache
+        self.ttl = ttl
+        self.namespace = namespace or repository.table_class.__tablename__
+        self.written: WeakSet = WeakSet()  # Units of work that wrote to the table.
+        domain_class = repository.domain_class
+        self.entities_adapter = TypeAdapter(list[domain_class])
+        self.page_adapter = TypeAdapter(PageResult[domain_class])
+        self.count_adapter = TypeAdapter(int)
+
+    def __getattr__(self, name: str):
+        if name == "repository":
+            raise AttributeError(name)
+        return getattr(self.repository, name)
+
+    @staticmethod
+    def build_key(operation: str, filter_schema: BaseSchemaFilter, **options) -> str:
+        payload = json.dumps([operation, filter_schema.filters_as_dict, options], sort_keys=True, default=str)
+        return hashlib.sha1(payload.encode()).hexdigest()
+
+    async def cached(self, key: str, adapter: TypeAdapter, loader):
+        unit_of_work = current_unit_of_work.get()
+        in_transaction = unit_of_work is not None and unit_of_work.active
+        # A unit of work that wrote to the table has to read its own uncommitted rows.
+        if not (in_transaction and unit_of_work in self.written):
+            value = await self.cache.get(self.namespace, key)
+            if value is not None:
+                try:
+                    return adapter.validate_json(value)
+                except ValidationError as error:
+                    # Written by an older shape of the domain class, it is loaded again below.
+                    logger.warning(f"Discarded cache entry of {self.namespace}: {error}")
+
+        with track_errors() as errors:
+            result = await loader()
+        # The empty result of a failed query would hide the rows until the entry expires, and a read in an open
+        # transaction could be rolled back or miss rows it doesn't see yet.
+        if not errors and not in_transaction:
+            await self.cache.set(self.namespace, key, adapter.dump_json(result), ttl=self.ttl)
+        return result
+
+    async def invalidate(self) -> None:
+        await self.cache.invalidate(self.namespace)
+        unit_of_work = current_unit_of_work.get()
+        if unit_of_work is not None and unit_of_work.active and unit_of_work not in self.written:
+            # Until the transaction commits, other requests can still cache the old rows.
+            self.written.add(unit_of_work)
+            unit_of_work.on_commit(self.invalidate_committed)
+
+    async def invalidate_committed(self) -> None:
+        await self.cache.invalidate(self.namespace)
+
+    async def find(self, filter_schema: BaseSchemaFilter) -> list[BaseEntity]:
+        key = self.build_key("find", filter_schema)
+        return await self.cached(key, self.entities_adapter, lambda: self.repository.find(filter_schema=filter_schema))
+
+    def stream(self, filter_schema: BaseSchemaFilter, chunk_size: int | None = None) -> AsyncIterator[BaseEntity]:
+        return self.repository.stream(filter_schema=filter_schema, chunk_size=chunk_size)
+
+    async def find_by_ids(self, entity_ids: list[str]) -> list[BaseEntity]:
+        return await self.repository.find_by_ids(entity_ids=entity_ids)
+
+    async def existing_values(self, field: str, values: list[Any]) -> dict[str, list[str]]:
+        return await self.repository.existing_values(field=field, values=values)
+
+    async def get_version(self, filter_schema: BaseSchemaFilter) -> DataVersion | None:
+        return await self.repository.get_version(filter_schema=filter_schema)
+
+    async def get_version_by_ids(self, entity_ids: list[str]) -> DataVersion | None:
+        return await self.repository.get_version_by_ids(entity_ids=entity_ids)
+
+    async def find_batch(self, filter_schema: BaseSchemaFilter) -> PageResult[BaseEntity]:
+        key = self.build_key("find_batch", filter_schema)
+        return await self.cached(
+            key, self.page_adapter, lambda: self.repository.find_batch(filter_schema=filter_schema)
+        )
+
+    async def find_page(self, filter_schema: BaseSchemaFilter, with_total: bool = True) -> PageResult[BaseEntity]:
+        key = self.build_key("find_page", filter_schema, with_total=with_total)
+        return await self.cached(
+            key,
+            self.page_adapter,
+            lambda: self.repository.find_page(filter_schema=filter_schema, with_total=with_total),
+        )
+
+    async def count(self, filter_schema: BaseSchemaFilter) -> int:
+        key = self.build_key("count", filter_schema)
+        return await self.cached(key, self.count_adapter, lambda: self.repository.count(filter_schema=filter_schema))
+
+    async def create(self, entity: BaseEntity) -> BaseEntity:
+        try:
+            return await self.repository.create(entity=entity)
+        finally:
+            await self.invalidate()
+
+    async def create_many(self, entities: list[BaseEntity], chunk_size: int | None = None) -> BulkResult[BaseEntity]:
+        try:
+            return await self.repository.create_many(entities=entities, chunk_size=chunk_size)
+        finally:
+            await self.invalidate()
+
+    async def upsert_many(
+        self,
+        entities: list[BaseEntity],
+        conflict_fields: list[str] | None = None,
+        update_fields: list[str] | None = None,
+        chunk_size: int | None = None,
+    ) -> BulkResult[BaseEntity]:
+        try:
+            return await self.repository.upsert_many(
+                entities=entities, conflict_fields=conflict_fields, update_fields=update_fields, chunk_size=chunk_size
+            )
+        finally:
+            await self.invalidate()
+
+    async def update_one(self, entity: BaseEntity, change_request: BaseChangeRequest) -> BaseEntity:
+        try:
+            return await self.repository.update_one(entity=entity, change_request=change_request)
+        finally:
+            await self.invalidate()
+
+    async def update_many(self, filter_schema: BaseSchemaFilter, change_request: BaseChangeRequest) -> int:
+        try:
+            return await self.repository.update_many(filter_schema=filter_schema, change_request=change_request)
+        finally:
+            await self.invalidate()
+
+    async def update_many_returning(
+        self, filter_schema: BaseSchemaFilter, change_request: BaseChangeRequest, ids_only: bool = False
+    ) -> list[BaseEntity] | list[str]:
+        try:
+            return await self.repository.update_many_returning(
+                filter_schema=filter_schema, change_request=change_request, ids_only=ids_only
+            )
+        finally:
+            await self.invalidate()
+
+    async def delete(self, filter_schema: BaseSchemaFilter) -> int:
+        try:
+            return await self.repository.delete(filter_schema=filter_schema)
+        finally:
+            await self.invalidate()
+
+    async def delete_returning(
+        self, filter_schema: BaseSchemaFilter, ids_only: bool = False
+    ) -> list[BaseEntity] | list[str]:
+        try:
+            return await self.repository.delete_returning(filter_schema=filter_schema, ids_only=ids_only)
+        finally:
+            await self.invalidate()
+
+
+def create_cached_source_repository(
+    data_source: DataSources,
+    cache_source_name: str = CACHE_SOURCE_NAME,
+    ttl: float | None = None,
+    **kwargs,
+) -> CachedSourceRepository:
+    repository = create_generic_source_repository(data_source=data_source, **kwargs)
+    return CachedSourceRepository(repository=repository, cache=data_source.get(cache_source_name), ttl=ttl)
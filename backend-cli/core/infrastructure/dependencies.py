@@ -0,0 +1,74 @@
+import logging
+import threading
+from typing import Any
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+
+def get_dependency_name(interface) -> str:
+    return getattr(interface, "__qualname__", None) or repr(interface)
+
+
+class LazyProvider:
+    """Build a dependency on its first injection and hand out that same instance afterwards.
+
+    `used` tells whether it was ever injected, building it ahead of time with `build` doesn't count.
+    """
+
+    def __init__(self, interface, factory: Callable[[], Any]) -> None:
+        self.interface = interface
+        self.factory = factory
+        self.instance = None
+        self.built = False
+        self.used = False
+        self.lock = threading.Lock()
+
+    def __call__(self):
+        self.used = True
+        return self.build()
+
+    def build(self):
+        if not self.built:
+            with self.lock:
+                if not self.built:
+                    self.instance = self.factory()
+                    self.built = True
+        return self.instance
+
+
+class DependencyProviders:
+    """Providers of the `DEPENDENCIES` settings, bound in the injector so their usage can be reported."""
+
+    def __init__(self) -> None:
+        self.providers: dict[Any, LazyProvider] = {}
+
+    def add(self, provider: LazyProvider) -> None:
+        self.providers[provider.interface] = provider
+
+    def warm_up(self) -> None:
+        """Build the dependencies not injected yet, failures are logged and left for the first injection."""
+        for provider in list(self.providers.values()):
+            try:
+                provider.build()
+            except Exception as error:  # noqa
+                logger.exception(f"Failed warming up {get_dependency_name(provider.interface)}: {error}")
+
+    def start_warm_up(self) -> threading.Thread:
+        thread = threading.Thread(target=self.warm_up, name="dependencies-warm-up", daemon=True)
+        thread.start()
+        return thread
+
+    def unused(self) -> list[str]:
+        return [get_dependency_name(interface) for interface, provider in self.providers.items() if not provider.used]
+
+    def stats(self) -> dict:
+        return {
+            get_dependency_name(interface): {"built": provider.built, "used": provider.used}
+            for interface, provider in self.providers.items()
+        }
+
+    def report_unused(self) -> None:
+        unused = self.unused()
+        if unused:
+            logger.warning(f"Dependencies never injected: {', '.join(unused)}")
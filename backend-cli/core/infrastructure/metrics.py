@@ -0,0 +1,137 @@
+import time
+from bisect import bisect_left
+from collections import defaultdict
+
+from core.use_cases.instrumentation import IServiceMetrics
+from core.use_cases.instrumentation import IServiceTimer
+
+DEFAULT_LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+
+    def cumulative_counts(self) -> list[tuple[str, int]]:
+        result, total = [], 0
+        for bound, count in zip([*map(str, self.buckets), "+Inf"], self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def as_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "max": self.max,
+            "buckets": dict(self.cumulative_counts()),
+        }
+
+
+class ServiceTimer(IServiceTimer):
+    __slots__ = ("metrics", "service", "last")
+
+    def __init__(self, metrics: "ServiceMetrics", service: str) -> None:
+        self.metrics = metrics
+        self.service = service
+        self.last = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.metrics.get_histogram(self.service, phase).observe(now - self.last)
+        self.last = now
+
+    def fail(self, kind: str) -> None:
+        self.metrics.errors[(self.service, kind)] += 1
+
+    def stop(self) -> None:
+        self.metrics.in_flight[self.service] -= 1
+
+
+class ServiceMetrics(IServiceMetrics):
+    """In process `BaseService.run` metrics, rendered in the Prometheus text format."""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_LATENCY_BUCKETS, prefix: str = "avang") -> None:
+        self.buckets = buckets
+        self.prefix = prefix
+        self.phases: dict[tuple[str, str], Histogram] = {}
+        self.errors: defaultdict[tuple[str, str], int] = defaultdict(int)
+        self.in_flight: defaultdict[str, int] = defaultdict(int)
+
+    def start(self, service: str) -> ServiceTimer:
+        self.in_flight[service] += 1
+        return ServiceTimer(self, service)
+
+    def get_histogram(self, service: str, phase: str) -> Histogram:
+        histogram = self.phases.get((service, phase))
+        if histogram is None:
+            histogram = self.phases[(service, phase)] = Histogram(self.buckets)
+        return histogram
+
+    def render(self, pools: dict | None = None) -> str:
+        """Prometheus text exposition, `pools` are the `pool_stats()` of the database sources by name."""
+        lines = []
+        name = f"{self.prefix}_service_phase_seconds"
+        lines += [f"# HELP {name} Latency of each BaseService.run phase.", f"# TYPE {name} histogram"]
+        for (service, phase), histogram in sorted(self.phases.items()):
+            lines += render_histogram(name, histogram, f'service="{service}",phase="{phase}"')
+
+        name = f"{self.prefix}_service_errors_total"
+        lines += [f"# HELP {name} Failed BaseService.run calls by kind.", f"# TYPE {name} counter"]
+        for (service, kind), count in sorted(self.errors.items()):
+            lines.append(f'{name}{{service="{service}",kind="{kind}"}} {count}')
+
+        name = f"{self.prefix}_service_in_flight"
+        lines += [f"# HELP {name} BaseService.run calls in progress.", f"# TYPE {name} gauge"]
+        for service, count in sorted(self.in_flight.items()):
+            lines.append(f'{name}{{service="{service}"}} {count}')
+
+        for source, stats in sorted((pools or {}).items()):
+            lines += render_pool(self.prefix, source, stats)
+        return "\n".join(lines) + "\n"
+
+
+def render_histogram(name: str, histogram: Histogram, labels: str) -> list[str]:
+    lines = [f'{name}_bucket{{{labels},le="{bound}"}} {count}' for bound, count in histogram.cumulative_counts()]
+    lines.append(f"{name}_sum{{{labels}}} {histogram.sum}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+def render_pool(prefix: str, source: str, stats: dict) -> list[str]:
+    lines = []
+    for key in ("checked_out", "overflow"):
+        if stats.get(key) is not None:
+            lines.append(f'{prefix}_pool_{key}{{source="{source}"}} {stats[key]}')
+    wait = stats.get("wait_seconds")
+    if wait:
+        labels = f'source="{source}"'
+        lines += [
+            f'{prefix}_pool_wait_seconds_bucket{{{labels},le="{bound}"}} {count}'
+            for bound, count in wait["buckets"].items()
+        ]
+        lines.append(f"{prefix}_pool_wait_seconds_sum{{{labels}}} {wait['sum']}")
+        lines.append(f"{prefix}_pool_wait_seconds_count{{{labels}}} {wait['count']}")
+    admission = stats.get("admission")
+    if admission:
+        labels = f'source="{source}"'
+        for key in ("in_flight", "waiting", "admitted", "rejected"):
+            lines.append(f"{prefix}_admission_{key}{{{labels}}} {admission[key]}")
+        queue_wait = admission["queue_wait_seconds"]
+        lines += [
+            f'{prefix}_admission_queue_wait_seconds_bucket{{{labels},le="{bound}"}} {count}'
+            for bound, count in queue_wait["buckets"].items()
+        ]
+        lines.append(f"{prefix}_admission_queue_wait_seconds_sum{{{labels}}} {queue_wait['sum']}")
+        lines.append(f"{prefix}_admission_queue_wait_seconds_count{{{labels}}} {queue_wait['count']}")
+    return lines
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+
+from core.domain.exceptions import OverloadedException
+from core.infrastructure.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+HOLD_SECONDS_WEIGHT = 0.1  # Weight of the last session in the moving average of the time a slot is held.
+
+
+class AdmissionController:
+    """Bound the sessions open at once on a data source, instead of letting the pool queue hide the overload.
+
+    Up to `max_concurrency` sessions run at once and up to `max_queue` callers wait for a slot. A caller is rejected
+    with `OverloadedException` right away when the queue is full or when its expected wait, estimated from the average
+    time a slot is held, goes over `deadline_seconds`, and otherwise once it has waited `deadline_seconds` in vain.
+    Set it from `SOURCES`, e.g. `"kwargs": {"admission": {"max_concurrency": 20, "deadline_seconds": 0.5}}`.
+    """
+
+    def __init__(self, max_concurrency: int, max_queue: int | None = None, deadline_seconds: float | None = None):
+        if max_concurrency < 1:
+            raise ValueError("max_concurrency must be at least 1.")
+
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.deadline_seconds = deadline_seconds
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.rejected = 0
+        self.hold_seconds = 0.0
+        self.queue_wait = Histogram()
+
+    def expected_wait(self) -> float:
+        return (self.waiting + 1) / self.max_concurrency * self.hold_seconds
+
+    def reject(self, reason: str) -> OverloadedException:
+        self.rejected += 1
+        logger.warning(f"Rejected database session: {reason}.")
+        return OverloadedException(f"The service is overloaded: {reason}.", retry_after=self.expected_wait())
+
+    async def acquire(self) -> None:
+        if not self.semaphore.locked():
+            await self.semaphore.acquire()
+            return
+
+        if self.max_queue is not None and self.waiting >= self.max_queue:
+            raise self.reject(f"{self.waiting} sessions already waiting")
+        if self.deadline_seconds is not None and self.expected_wait() > self.deadline_seconds:
+            raise self.reject(f"expected wait of {self.expected_wait():.3f}s")
+
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self.semaphore.acquire(), self.deadline_seconds)
+        except asyncio.TimeoutError:
+            raise self.reject(f"no free session after {self.deadline_seconds}s")
+        finally:
+            self.waiting -= 1
+
+    @asynccontextmanager
+    async def admit(self):
+        started_at = time.perf_counter()
+        await self.acquire()
+        admitted_at = time.perf_counter()
+        self.queue_wait.observe(admitted_at - started_at)
+        self.admitted += 1
+        self.in_flight += 1
+        try:
+            yield
+        finally:
+            self.in_flight -= 1
+            self.semaphore.release()
+            held = time.perf_counter() - admitted_at
+            self.hold_seconds += (held - self.hold_seconds) * HOLD_SECONDS_WEIGHT
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "rejected": self.rejected,
+            "hold_seconds": self.hold_seconds,
+            "queue_wait_seconds": self.queue_wait.as_dict(),
+        }
+
+
+@asynccontextmanager
+async def admission_scope(connection):
+    """Admit a new session on `connection`, a no-op unless the connection has an admission controller."""
+    admission = getattr(connection, "admission", None)
+    if admission is None:
+        yield
+        return
+
+    async with admission.admit():
+        yield
@@ -1,35 +1,85 @@
 import logging
+import os
+import weakref
+from contextlib import asynccontextmanager
 from contextlib import contextmanager
 
-from psycopg2 import errors as psycopg2_errors
 from sqlalchemy import create_engine
 from sqlalchemy import exc as orm_exceptions
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
 
 from core.domain.exceptions import DuplicateException
+from core.infrastructure.orm.admission import AdmissionController
+from core.infrastructure.orm.pool import PoolMonitor
+from core.infrastructure.orm.pool import get_engine_options
 
 logger = logging.getLogger(__name__)
 
+UNIQUE_VIOLATION_CODE = "23505"
+DEFAULT_PREPARED_STATEMENT_CACHE_SIZE = 500
+
+
+# Connections built in this process, a forked child gives each one a pool of its own before using it.
+connections = weakref.WeakSet()
+
+
+def check_connections_after_fork() -> None:
+    for connection in list(connections):
+        connection.check_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=check_connections_after_fork)
+
+
+def is_unique_violation(error: orm_exceptions.IntegrityError) -> bool:
+    # psycopg2 and the asyncpg adapter both expose the SQLSTATE as ``pgcode``.
+    return getattr(error.orig, "pgcode", None) == UNIQUE_VIOLATION_CODE
+
 
 class DbConnection:
-    def __init__(self, con_str) -> None:
+    def __init__(self, con_str, admission: dict | None = None, **engine_kwargs) -> None:
+        """Engine kwargs (`pool_size`, `max_overflow`, `pool_recycle`, `pool_pre_ping`...) come from `SOURCES`.
+
+        `admission` holds the `AdmissionController` kwargs to bound the sessions open at once.
+        """
         self.con_str = con_str
+        self.admission = AdmissionController(**admission) if admission else None
         if not con_str:
             logger.error("Missing database connection string.")
 
-        self.engine = create_engine(con_str)
+        self.engine = create_engine(con_str, **get_engine_options(con_str, engine_kwargs))
+        self.pool_monitor = PoolMonitor(self.engine)
         self.Session = sessionmaker(self.engine)
+        self.pid = os.getpid()
+        connections.add(self)
         logger.info("Create database session maker.")
 
+    def pool_stats(self) -> dict:
+        stats = self.pool_monitor.stats()
+        if self.admission is not None:
+            stats["admission"] = self.admission.stats()
+        return stats
+
+    def check_fork(self) -> None:
+        """Replace the pool inherited from the parent process, leaving its connections open for the parent."""
+        if self.pid != os.getpid():
+            self.engine.dispose(close=False)
+            self.pid = os.getpid()
+
     @contextmanager
     def new_session(self):
+        self.check_fork()
         db_session = self.Session()
         try:
             yield db_session
         except orm_exceptions.IntegrityError as error:
-            if isinstance(error.orig, psycopg2_errors.UniqueViolation):
-                raise DuplicateException(str(error.orig))
             db_session.rollback()
+            if is_unique_violation(error):
+                raise DuplicateException(str(error.orig))
         except Exception as error:
             logger.exception("Database exception.")
             db_session.rollback()
@@ -38,4 +88,59 @@ class DbConnection:
             db_session.commit()
             logger.debug("Database session executed correctly.")
         finally:
-            db_session.close()
\ No newline at end of file
+            db_session.close()
+
+
+class AsyncDbConnection:
+    def __init__(
+        self,
+        con_str,
+        prepared_statement_cache_size: int = DEFAULT_PREPARED_STATEMENT_CACHE_SIZE,
+        admission: dict | None = None,
+        **engine_kwargs,
+    ) -> None:
+        self.con_str = con_str
+        self.admission = AdmissionController(**admission) if admission else None
+        if not con_str:
+            logger.error("Missing database connection string.")
+
+        engine_options = get_engine_options(con_str, engine_kwargs)
+        connect_args = dict(engine_options.pop("connect_args", {}))
+        connect_args.setdefault("prepared_statement_cache_size", prepared_statement_cache_size)
+        self.engine = create_async_engine(con_str, connect_args=connect_args, **engine_options)
+        self.pool_monitor = PoolMonitor(self.engine.sync_engine)
+        self.Session = async_sessionmaker(self.engine, class_=AsyncSession, expire_on_commit=False)
+        self.pid = os.getpid()
+        connections.add(self)
+        logger.info("Create async database session maker.")
+
+    def pool_stats(self) -> dict:
+        stats = self.pool_monitor.stats()
+        if self.admission is not None:
+            stats["admission"] = self.admission.stats()
+        return stats
+
+    def check_fork(self) -> None:
+        if self.pid != os.getpid():
+            self.engine.sync_engine.dispose(close=False)
+            self.pid = os.getpid()
+
+    @asynccontextmanager
+    async def new_session(self):
+        self.check_fork()
+        db_session = self.Session()
+        try:
+            yield db_session
+        except orm_exceptions.IntegrityError as error:
+            await db_session.rollback()
+            if is_unique_violation(error):
+                raise DuplicateException(str(error.orig))
+        except Exception as error:
+            logger.exception("Database exception.")
+            await db_session.rollback()
+            raise error
+        else:
+            await db_session.commit()
+            logger.debug("Database session executed correctly.")
+        finally:
+            await db_session.close()
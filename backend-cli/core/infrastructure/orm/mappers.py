@@ -1,3 +1,9 @@
+from functools import cached_property
+from typing import Any
+from typing import Mapping
+
+from pydantic import TypeAdapter
+
 from core.domain.models import BaseEntity
 from core.infrastructure.orm.tables import BaseTable
 
@@ -6,15 +12,73 @@ class BaseSourceMapper:
     domain_class: BaseEntity
     table_class: BaseTable
 
+    def select_columns(self) -> list | None:
+        """Columns to select instead of full ORM instances, None keeps the ORM path."""
+        return None
+
     async def to_entity(self, entity_table: BaseTable) -> BaseEntity:
         return self.domain_class.model_validate(entity_table)
 
+    async def to_entities(self, items: list[Any]) -> list[BaseEntity]:
+        return [await self.to_entity(entity_table=item) for item in items]
+
     async def to_table(self, entity: BaseEntity) -> BaseTable:
         return self.table_class(**entity.model_dump())
 
+    async def to_row(self, entity: BaseEntity) -> dict:
+        columns = self.table_class.__table__.columns.keys()
+        return {key: value for key, value in entity.model_dump().items() if key in columns}
+
+
+class ProjectedSourceMapper(BaseSourceMapper):
+    """Read only the columns the domain class declares and validate whole results at once.
+
+    Set `trusted` to build entities with `model_construct`, skipping validation for rows read from our own database.
+    """
+
+    trusted: bool = False
+
+    def select_columns(self) -> list:
+        return self.columns
+
+    @cached_property
+    def columns(self) -> list:
+        fields = self.domain_class.model_fields
+        return [column for key, column in self.table_class.__table__.columns.items() if key in fields]
+
+    @cached_property
+    def list_adapter(self) -> TypeAdapter:
+        return TypeAdapter(list[self.domain_class])
+
+    async def to_entities(self, items: list[Mapping]) -> list[BaseEntity]:
+        if self.trusted:
+            return [self.construct_entity(item) for item in items]
+        return self.list_adapter.validate_python(items)
+
+    def construct_entity(self, item: Mapping) -> BaseEntity:
+        values = dict(item)
+        if values.get("entity_id") is not None:
+            values["entity_id"] = str(values["entity_id"])
+        return self.domain_class.model_construct(**values)
+
+
+def is_projectable(table_class: BaseTable, domain_class: BaseEntity) -> bool:
+    """Whether every domain field is read from a column, relationships and properties need the ORM instances."""
+    columns = table_class.__table__.columns.keys()
+    return all(field in columns for field in domain_class.model_fields)
+
+
+def create_generic_source_mapper(
+    table_class: BaseTable, domain_class: BaseEntity, trusted: bool = False
+) -> BaseSourceMapper:
+    if not is_projectable(table_class=table_class, domain_class=domain_class):
+        mapper_instance = BaseSourceMapper()
+        mapper_instance.domain_class = domain_class
+        mapper_instance.table_class = table_class
+        return mapper_instance
 
-def create_generic_source_mapper(table_class: BaseTable, domain_class: BaseEntity) -> BaseSourceMapper:
-    mapper_instance = BaseSourceMapper()
+    mapper_instance = ProjectedSourceMapper()
     mapper_instance.domain_class = domain_class
     mapper_instance.table_class = table_class
+    mapper_instance.trusted = trusted
     return mapper_instance
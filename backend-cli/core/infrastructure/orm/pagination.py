@@ -0,0 +1,211 @@
+import base64
+import binascii
+import json
+import uuid
+from datetime import date
+from datetime import datetime
+from decimal import Decimal
+from typing import Any
+from typing import Mapping
+from typing import NamedTuple
+
+from sqlalchemy import and_
+from sqlalchemy import bindparam
+from sqlalchemy import false
+from sqlalchemy import inspect
+from sqlalchemy import or_
+from sqlalchemy import tuple_
+from sqlalchemy.sql import Select
+from sqlalchemy_filterset import FilterSet
+from sqlalchemy_filterset import NullsPosition
+from sqlalchemy_filterset import OrderingFilter
+
+from core.domain.exceptions import ValidationException
+from core.infrastructure.orm import tables
+
+DEFAULT_BATCH_SIZE = 10
+ORDERING_FILTER_NAME = "ordering"
+TIEBREAKER_FIELD = "entity_id"
+LIMIT_PARAM = "keyset_limit"
+
+
+class KeysetField(NamedTuple):
+    name: str
+    column: Any
+    reverse: bool
+    nullable: bool
+    nulls_first: bool
+
+
+class KeysetPagination:
+    """Keyset pagination over the ``ordering`` fields plus ``entity_id`` as tiebreaker.
+
+    Only the fields of the filterset ``OrderingFilter`` or the mapped columns of the table can be used. ``NULL`` values
+    sort where their ``OrderingField`` puts them, by default last going up and first going down like PostgreSQL.
+    """
+
+    def __init__(self, table_class: tables.BaseTable, filterset_class: FilterSet, ordering: list[str] | None) -> None:
+        self.table_class = table_class
+        self.ordering, self.tiebreaker_reverse = self.split_tiebreaker(ordering or [])
+        self.fields = self.get_fields(filterset_class)
+
+    @staticmethod
+    def split_tiebreaker(ordering: list[str]) -> tuple[list[str], bool | None]:
+        """Fields before an explicit ``entity_id``, the ones after it can't change the order, and its direction."""
+        for index, item in enumerate(ordering):
+            if item.lstrip("-") == TIEBREAKER_FIELD:
+                return ordering[:index], item.startswith("-")
+        return ordering, None
+
+    def get_fields(self, filterset_class: FilterSet) -> list[KeysetField]:
+        ordering_filter = filterset_class.declared_filters.get(ORDERING_FILTER_NAME)
+        available = ordering_filter.fields if isinstance(ordering_filter, OrderingFilter) else {}
+        mapped_columns = inspect(self.table_class).columns
+
+        fields = []
+        for param in self.ordering:
+            reverse, name = param.startswith("-"), param.lstrip("-")
+            if name in available:
+                column, nulls = available[name].field, available[name].nulls
+            elif name in mapped_columns:
+                column, nulls = getattr(self.table_class, name), None
+            else:
+                continue
+            nulls_first = nulls == NullsPosition.first if nulls is not None else reverse
+            fields.append(KeysetField(name, column, reverse, self.is_nullable(column), nulls_first))
+
+        # The primary key keeps the order total, so equal ordering values never repeat or skip rows. Unless the
+        # ordering asks for a direction, it follows the last field.
+        tiebreaker_reverse = self.tiebreaker_reverse
+        if tiebreaker_reverse is None:
+            tiebreaker_reverse = fields[-1].reverse if fields else False
+        tiebreaker = getattr(self.table_class, TIEBREAKER_FIELD)
+        fields.append(KeysetField(TIEBREAKER_FIELD, tiebreaker, tiebreaker_reverse, False, tiebreaker_reverse))
+        return fields
+
+    @staticmethod
+    def is_nullable(column) -> bool:
+        return getattr(getattr(column, "expression", column), "nullable", True)
+
+    @property
+    def columns(self) -> list:
+        return [field.column for field in self.fields]
+
+    @property
+    def signature(self) -> list[str]:
+        return [f"-{field.name}" if field.reverse else field.name for field in self.fields]
+
+    def apply(self, query: Select, seek_values: list | None) -> Select:
+        """Add the seek predicate and the order to `query` with bound values, see `bind_values`.
+
+        Only which `seek_values` are NULL shapes the statement, see `shape`, so it can be cached per shape.
+        """
+        if seek_values is not None:
+            placeholders = [
+                None if value is None else bindparam(f"keyset_{index}", type_=field.column.type)
+                for index, (field, value) in enumerate(zip(self.fields, seek_values))
+            ]
+            query = query.where(self.seek_predicate(placeholders))
+        query = query.order_by(*[self.order_by(field) for field in self.fields])
+        return query.limit(bindparam(LIMIT_PARAM))
+
+    def bind_values(self, seek_values: list | None, limit: int) -> dict:
+        # One extra row tells whether there is a next batch without counting.
+        values = {LIMIT_PARAM: limit + 1}
+        for index, value in enumerate(seek_values or []):
+            if value is not None:
+                values[f"keyset_{index}"] = value
+        return values
+
+    def shape(self, seek_values: list | None) -> tuple:
+        null_values = None if seek_values is None else tuple(value is None for value in seek_values)
+        return tuple(self.signature), null_values
+
+    @staticmethod
+    def order_by(field: KeysetField):
+        ordered = field.column.desc() if field.reverse else field.column.asc()
+        if not field.nullable:
+            return ordered
+        # Explicit, so the seek predicate and the order agree on any database.
+        return ordered.nullsfirst() if field.nulls_first else ordered.nullslast()
+
+    def seek_predicate(self, values: list):
+        directions = {field.reverse for field in self.fields}
+
+        if len(directions) == 1 and not any(field.nullable for field in self.fields):
+            # Row value comparison maps straight to a composite index range scan.
+            if directions.pop():
+                return tuple_(*self.columns) < tuple_(*values)
+            return tuple_(*self.columns) > tuple_(*values)
+
+        conditions = []
+        for position, (field, value) in enumerate(zip(self.fields, values)):
+            after = self.after(field, value)
+            if after is not None:
+                previous = [self.equal(self.fields[index], values[index]) for index in range(position)]
+                conditions.append(and_(*previous, after))
+        return or_(*conditions) if conditions else false()
+
+    @staticmethod
+    def equal(field: KeysetField, value: Any):
+        return field.column.is_(None) if value is None else field.column == value
+
+    @staticmethod
+    def after(field: KeysetField, value: Any):
+        """Rows sorted after `value` on `field` alone, None when there is none."""
+        if value is None:
+            return field.column.is_not(None) if field.nulls_first else None
+
+        comparison = field.column < value if field.reverse else field.column > value
+        if field.nullable and not field.nulls_first:
+            return or_(comparison, field.column.is_(None))
+        return comparison
+
+    def encode(self, item: Any) -> str:
+        values = [self.dump_value(self.get_value(item, field.column)) for field in self.fields]
+        payload = json.dumps({"o": self.signature, "v": values}, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode()).decode()
+
+    def decode(self, batch_token: str) -> list:
+        try:
+            payload = json.loads(base64.urlsafe_b64decode(batch_token.encode()))
+            signature, values = payload["o"], payload["v"]
+        except (binascii.Error, ValueError, TypeError, KeyError):
+            raise ValidationException(message="Invalid batch token.")
+
+        if signature != self.signature or len(values) != len(self.fields):
+            raise ValidationException(message="The batch token does not match the requested ordering.")
+
+        return [self.load_value(field.column, value) for field, value in zip(self.fields, values)]
+
+    @staticmethod
+    def get_value(item: Any, column) -> Any:
+        if isinstance(item, Mapping):
+            return item[column.key]
+        return getattr(item, column.key)
+
+    @staticmethod
+    def dump_value(value: Any) -> Any:
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+        if isinstance(value, (uuid.UUID, Decimal)):
+            return str(value)
+        return value
+
+    @staticmethod
+    def load_value(column, value: Any) -> Any:
+        if value is None:
+            return value
+
+        try:
+            python_type = column.type.python_type
+        except NotImplementedError:
+            return value
+
+        if python_type is datetime:
+            return datetime.fromisoformat(value)
+        if python_type is date:
+            return date.fromisoformat(value)
+        if python_type in (uuid.UUID, Decimal):
+            return python_type(value)
+        return value
@@ -0,0 +1,110 @@
+import logging
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.pool import QueuePool
+
+from core.infrastructure.metrics import Histogram
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedPoolMixin:
+    """Times how long each checkout waits for a connection, events only fire once it is obtained."""
+
+    monitor: "PoolMonitor | None" = None
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            if self.monitor is not None:
+                self.monitor.wait.observe(time.perf_counter() - started_at)
+
+    def recreate(self):
+        pool = super().recreate()
+        pool.monitor = self.monitor
+        return pool
+
+
+class InstrumentedQueuePool(InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncAdaptedQueuePool(InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+INSTRUMENTED_POOL_CLASSES = {
+    QueuePool: InstrumentedQueuePool,
+    AsyncAdaptedQueuePool: InstrumentedAsyncAdaptedQueuePool,
+}
+
+
+def get_engine_options(con_str: str, engine_kwargs: dict) -> dict:
+    """Engine options from the `SOURCES` kwargs, using the instrumented version of the default queue pool."""
+    options = dict(engine_kwargs)
+    if "poolclass" not in options and con_str:
+        url = make_url(con_str)
+        pool_class = url.get_dialect().get_pool_class(url)
+        if pool_class in INSTRUMENTED_POOL_CLASSES:
+            options["poolclass"] = INSTRUMENTED_POOL_CLASSES[pool_class]
+    return options
+
+
+class PoolMonitor:
+    def __init__(self, engine: Engine) -> None:
+        self.engine = engine
+        self.wait = Histogram()
+        self.hold = Histogram()
+        self.connects = 0
+        self.checkouts = 0
+        self.invalidations = 0
+
+        pool = engine.pool
+        if isinstance(pool, InstrumentedPoolMixin):
+            pool.monitor = self
+        # Listeners are kept by the pool dispatcher, so they survive `engine.dispose()`.
+        event.listen(pool, "connect", self.on_connect)
+        event.listen(pool, "checkout", self.on_checkout)
+        event.listen(pool, "checkin", self.on_checkin)
+        event.listen(pool, "invalidate", self.on_invalidate)
+
+    def on_connect(self, dbapi_connection, connection_record) -> None:
+        self.connects += 1
+
+    def on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        self.checkouts += 1
+        connection_record.info["checkout_at"] = time.perf_counter()
+
+    def on_checkin(self, dbapi_connection, connection_record) -> None:
+        checkout_at = connection_record.info.pop("checkout_at", None)
+        if checkout_at is not None:
+            self.hold.observe(time.perf_counter() - checkout_at)
+
+    def on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        self.invalidations += 1
+
+    def stats(self) -> dict:
+        pool = self.engine.pool
+        return {
+            "pool_class": type(pool).__name__,
+            "size": self.pool_value(pool, "size"),
+            "checked_out": self.pool_value(pool, "checkedout"),
+            "checked_in": self.pool_value(pool, "checkedin"),
+            "overflow": self.pool_value(pool, "overflow"),
+            "connects": self.connects,
+            "checkouts": self.checkouts,
+            "invalidations": self.invalidations,
+            "wait_seconds": self.wait.as_dict(),
+            "hold_seconds": self.hold.as_dict(),
+        }
+
+    @staticmethod
+    def pool_value(pool, name: str) -> int | None:
+        method = getattr(pool, name, None)
+        return method() if callable(method) else None
@@ -0,0 +1,162 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import NamedTuple
+from weakref import WeakKeyDictionary
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SLOW_QUERY_SECONDS = 0.5
+PROFILER_EXPLAINING_KEY = "query_profiler_explaining"
+EXPLAINABLE_STATEMENTS = {"SELECT", "INSERT", "UPDATE", "DELETE", "WITH"}
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+class QueryRecord(NamedTuple):
+    statement: str
+    duration: float
+    rowcount: int
+
+
+class QueryProfile:
+    def __init__(self, budget: int | None = None, fail_on_budget: bool = False) -> None:
+        self.budget = budget
+        self.fail_on_budget = fail_on_budget
+        self.queries: list[QueryRecord] = []
+        self.checked = False
+        self.response_started = False
+
+    @property
+    def total_seconds(self) -> float:
+        return sum(query.duration for query in self.queries)
+
+    @property
+    def is_over_budget(self) -> bool:
+        return self.budget is not None and len(self.queries) > self.budget
+
+    def summary(self) -> str:
+        return f"{len(self.queries)} queries in {self.total_seconds:.4f}s (budget {self.budget})"
+
+    def check(self) -> None:
+        """Report the profile once it went over budget.
+
+        With `fail_on_budget` it raises `QueryBudgetExceeded`, until the response started: a response already on its
+        way can't be replaced, so the overrun is only logged.
+        """
+        if self.checked or not self.is_over_budget:
+            return
+
+        self.checked = True
+        if self.fail_on_budget and not self.response_started:
+            raise QueryBudgetExceeded(self.summary())
+        logger.warning(f"Query budget exceeded: {self.summary()}")
+
+    def start_response(self) -> None:
+        self.check()
+        self.response_started = True
+
+
+current_query_profile: ContextVar[QueryProfile | None] = ContextVar("current_query_profile", default=None)
+
+
+def get_engines(source) -> list[Engine]:
+    """Sync engines behind a data source, a connection or a replica set."""
+    if hasattr(source, "replicas"):
+        return [engine for replica in source.replicas for engine in get_engines(replica)]
+    engine = getattr(source, "engine", None)
+    if engine is None:
+        return []
+    return [getattr(engine, "sync_engine", engine)]
+
+
+class QueryProfiler:
+    """Opt-in SQL profiler on top of the engine cursor events.
+
+    Every statement is recorded in the `QueryProfile` of the current context, if any, and statements slower than
+    `slow_query_seconds` are logged with their plan. Only SELECT plans use `EXPLAIN ANALYZE`, which runs the
+    statement again, inside a savepoint so a failing EXPLAIN can't abort the transaction.
+    """
+
+    def __init__(
+        self,
+        slow_query_seconds: float | None = DEFAULT_SLOW_QUERY_SECONDS,
+        explain: bool = True,
+        budget: int | None = None,
+        fail_on_budget: bool = False,
+    ) -> None:
+        self.slow_query_seconds = slow_query_seconds
+        self.explain = explain
+        self.budget = budget
+        self.fail_on_budget = fail_on_budget
+        # Keyed by execution context, the start of a statement that failed goes away with its context.
+        self.started_at: WeakKeyDictionary = WeakKeyDictionary()
+
+    def attach(self, engine: Engine) -> None:
+        if not event.contains(engine, "before_cursor_execute", self.before_cursor_execute):
+            event.listen(engine, "before_cursor_execute", self.before_cursor_execute)
+            event.listen(engine, "after_cursor_execute", self.after_cursor_execute)
+            event.listen(engine, "handle_error", self.handle_error)
+
+    def before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        # Statements run without an execution context, e.g. sequence prefetches, are timed on their connection.
+        self.started_at[context if context is not None else conn] = time.perf_counter()
+
+    def handle_error(self, exception_context) -> None:
+        key = exception_context.execution_context or exception_context.connection
+        if key is not None:
+            self.started_at.pop(key, None)
+
+    def after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        started_at = self.started_at.pop(context if context is not None else conn, None)
+        if started_at is None or conn.info.get(PROFILER_EXPLAINING_KEY):
+            return
+
+        duration = time.perf_counter() - started_at
+        profile = current_query_profile.get()
+        if profile is not None:
+            profile.queries.append(QueryRecord(statement=statement, duration=duration, rowcount=cursor.rowcount))
+
+        if self.slow_query_seconds is not None and duration >= self.slow_query_seconds:
+            plan = self.get_plan(conn, statement, parameters) if self.explain and not executemany else None
+            logger.warning(f"Slow query ({duration:.4f}s): {statement}" + (f"\n{plan}" if plan else ""))
+
+    def get_plan(self, conn, statement: str, parameters) -> str | None:
+        keyword = statement.lstrip()[:6].upper()
+        if keyword not in EXPLAINABLE_STATEMENTS and keyword[:4] not in EXPLAINABLE_STATEMENTS:
+            return None
+
+        explain = "EXPLAIN (ANALYZE, BUFFERS) " if keyword == "SELECT" else "EXPLAIN "
+        conn.info[PROFILER_EXPLAINING_KEY] = True
+        try:
+            with conn.begin_nested():
+                rows = conn.exec_driver_sql(explain + statement, parameters).all()
+            return "\n".join(row[0] for row in rows)
+        except Exception as error:
+            logger.debug(f"Could not explain slow query: {error}")
+            return None
+        finally:
+            conn.info[PROFILER_EXPLAINING_KEY] = False
+
+    @contextmanager
+    def profile(self, budget: int | None = None, fail_on_budget: bool | None = None):
+        """Collect the queries run in the block, checking them against the query budget at the end.
+
+        Call `check` on the profile to enforce the budget earlier, e.g. before a response starts.
+        """
+        budget = budget if budget is not None else self.budget
+        fail_on_budget = fail_on_budget if fail_on_budget is not None else self.fail_on_budget
+        query_profile = QueryProfile(budget=budget, fail_on_budget=fail_on_budget)
+        token = current_query_profile.set(query_profile)
+        try:
+            yield query_profile
+        finally:
+            current_query_profile.reset(token)
+
+        query_profile.check()
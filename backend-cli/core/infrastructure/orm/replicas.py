@@ -0,0 +1,114 @@
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from sqlalchemy import exc as orm_exceptions
+
+from core.infrastructure.orm.database import DbConnection
+from core.infrastructure.orm.pool import PoolMonitor
+
+logger = logging.getLogger(__name__)
+
+ROUND_ROBIN = "round_robin"
+LEAST_CONNECTIONS = "least_connections"
+DEFAULT_EJECTION_SECONDS = 30.0
+# asyncpg raises plain OS errors when the server can't be reached.
+CONNECTION_ERRORS = (orm_exceptions.OperationalError, orm_exceptions.InterfaceError, OSError)
+
+class PinState:
+    """Primary pin of one request, shared by reference with the tasks it starts so their writes pin it too."""
+
+    def __init__(self, pinned: bool = False) -> None:
+        self.pinned = pinned
+
+
+# Pinned once the current request wrote to the primary, its following reads skip the replicas to see their own writes.
+# `primary_pin_scope` gives every request its own state, so a pin never outlives the request that set it.
+primary_pin: ContextVar[PinState | None] = ContextVar("primary_pin", default=None)
+
+
+def pin_primary() -> None:
+    state = primary_pin.get()
+    if state is None:
+        # Outside a scope, e.g. a script, the pin holds for the rest of the current context.
+        primary_pin.set(PinState(pinned=True))
+    else:
+        state.pinned = True
+
+
+def is_primary_pinned() -> bool:
+    state = primary_pin.get()
+    return state is not None and state.pinned
+
+
+@contextmanager
+def primary_pin_scope():
+    """Scope of a request or a job, the reads inside it only follow the writes made inside it."""
+    token = primary_pin.set(PinState())
+    try:
+        yield
+    finally:
+        primary_pin.reset(token)
+
+
+class DbReplicaSet:
+    """Read replicas of the primary database, declared in `SOURCES` next to it.
+
+    Every replica gets its own connection of `connection_class`, built with the same engine kwargs. A replica that
+    fails to connect is ejected for `ejection_seconds` and then tried again.
+    """
+
+    def __init__(
+        self,
+        con_strs: list[str],
+        connection_class: type = DbConnection,
+        strategy: str = ROUND_ROBIN,
+        ejection_seconds: float = DEFAULT_EJECTION_SECONDS,
+        **engine_kwargs,
+    ) -> None:
+        if strategy not in (ROUND_ROBIN, LEAST_CONNECTIONS):
+            raise ValueError(f"Unknown replica strategy: {strategy}")
+
+        self.replicas = [connection_class(con_str, **engine_kwargs) for con_str in con_strs]
+        self.strategy = strategy
+        self.ejection_seconds = ejection_seconds
+        self.ejected_until: dict[int, float] = {}
+        self.counter = itertools.count()
+
+    def healthy(self) -> list[int]:
+        now = time.monotonic()
+        return [index for index in range(len(self.replicas)) if self.ejected_until.get(index, 0) <= now]
+
+    def choose(self):
+        """Replica connection for the next read, None when every replica is ejected."""
+        healthy = self.healthy()
+        if not healthy:
+            return None
+
+        if self.strategy == LEAST_CONNECTIONS:
+            index = min(healthy, key=lambda index: self.checked_out(self.replicas[index]))
+        else:
+            index = healthy[next(self.counter) % len(healthy)]
+        return self.replicas[index]
+
+    def eject(self, replica) -> None:
+        index = self.replicas.index(replica)
+        self.ejected_until[index] = time.monotonic() + self.ejection_seconds
+        logger.warning(f"Ejected read replica {index} for {self.ejection_seconds} seconds.")
+
+    def check_fork(self) -> None:
+        for replica in self.replicas:
+            replica.check_fork()
+
+    @staticmethod
+    def checked_out(replica) -> int:
+        return PoolMonitor.pool_value(replica.pool_monitor.engine.pool, "checkedout") or 0
+
+    def pool_stats(self) -> dict:
+        healthy = self.healthy()
+        return {
+            str(index): {**replica.pool_stats(), "healthy": index in healthy}
+            for index, replica in enumerate(self.replicas)
+        }
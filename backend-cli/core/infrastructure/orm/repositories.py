@@ -1,6 +1,17 @@
 import logging
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any
+from typing import Callable
 
+from sqlalchemy import exc as orm_exceptions
+from sqlalchemy import Text
+from sqlalchemy import cast
+from sqlalchemy import func
+from sqlalchemy import literal_column
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from sqlalchemy.sql import Delete
 from sqlalchemy.sql import Select
@@ -11,15 +22,31 @@ from sqlalchemy import delete
 
 from core.infrastructure.orm import tables
 from core.domain.filters import BaseSchemaFilter
-from core.domain.models import BaseEntity, BaseChangeRequest
-from core.domain.repositories import ISourceRepository, DataSources
+from core.domain.models import BaseEntity, BaseChangeRequest, BulkConflict, BulkResult, DataVersion, PageResult
+from core.domain.repositories import ISourceRepository, DataSources, current_unit_of_work, record_error
 from core.infrastructure.orm import tables
+from core.infrastructure.orm.admission import admission_scope
+from core.infrastructure.orm.database import AsyncDbConnection
 from core.infrastructure.orm.database import DbConnection
+from core.infrastructure.orm.database import is_unique_violation
 from core.infrastructure.orm.mappers import BaseSourceMapper, create_generic_source_mapper
+from core.infrastructure.orm.pagination import DEFAULT_BATCH_SIZE
+from core.infrastructure.orm.pagination import KeysetPagination
+from core.infrastructure.orm.replicas import CONNECTION_ERRORS
+from core.infrastructure.orm.replicas import DbReplicaSet
+from core.infrastructure.orm.replicas import is_primary_pinned
+from core.infrastructure.orm.replicas import pin_primary
+from core.infrastructure.orm.statements import StatementCache
+from core.infrastructure.orm.statements import statement_cache
+from core.infrastructure.orm.unit_of_work import UnitOfWork
 
 logger = logging.getLogger(__name__)
 
 DB_CONNECTION_NAME = "pg_con"
+DB_REPLICAS_NAME = "pg_replicas"
+BULK_CHUNK_SIZE = 500
+STREAM_CHUNK_SIZE = 1000
+ROW_VERSION_LABEL = "row_version"
 
 
 class BaseFilterSet(FilterSet):
@@ -28,6 +55,10 @@ class BaseFilterSet(FilterSet):
 
 
 class BaseSourceRepository(ISourceRepository):
+    bulk_chunk_size = BULK_CHUNK_SIZE
+    stream_chunk_size = STREAM_CHUNK_SIZE
+    statement_cache: StatementCache = statement_cache
+
     def __init__(
         self,
         data_source: dict | None,
@@ -50,79 +81,560 @@ class BaseSourceRepository(ISourceRepository):
     def db_con(self) -> DbConnection:
         return self.data_source.get(DB_CONNECTION_NAME)
 
+    @property
+    def db_replicas(self) -> DbReplicaSet | None:
+        return self.data_source.get(DB_REPLICAS_NAME) if DB_REPLICAS_NAME in self.data_source else None
+
+    @asynccontextmanager
+    async def session_scope(self, connection: DbConnection | None = None, shared: bool = True):
+        if connection is None:
+            pin_primary()
+        unit_of_work = current_unit_of_work.get()
+        if shared and isinstance(unit_of_work, UnitOfWork) and unit_of_work.active:
+            async with unit_of_work.session(connection or self.db_con) as session:
+                yield session
+            return
+
+        connection = connection or self.db_con
+        async with admission_scope(connection):
+            async with self.new_session(connection) as session:
+                yield session
+
+    @asynccontextmanager
+    async def new_session(self, connection: DbConnection):
+        with connection.new_session() as session:
+            yield session
+
+    async def connect(self, session: Session) -> None:
+        session.connection()
+
+    @asynccontextmanager
+    async def read_session_scope(self, shared: bool = True):
+        """Session on a read replica when there are any, falling back to the primary."""
+        replicas = self.db_replicas
+        replica = replicas.choose() if replicas is not None and not is_primary_pinned() else None
+        if replica is not None:
+            # Replica reads never join the unit of work, it only holds primary transactions.
+            async with self.session_scope(connection=replica, shared=False) as session:
+                try:
+                    await self.connect(session)
+                except CONNECTION_ERRORS as error:
+                    logger.warning(f"Read replica unavailable: {error}")
+                    replicas.eject(replica)
+                else:
+                    yield session
+                    return
+
+        # An explicit connection keeps plain reads from pinning the request to the primary.
+        async with self.session_scope(connection=self.db_con, shared=shared) as session:
+            yield session
+
+    async def execute_query(self, session: Session, query, params: dict | None = None):
+        return session.execute(query, params or None)
+
+    async def execute_write(self, session: Session, query, params: dict | None = None):
+        """Run a cached UPDATE or DELETE, then expire the table rows loaded in `session` so they're read again."""
+        result = await self.execute_query(session, query, params)
+        sync_session = getattr(session, "sync_session", session)
+        for instance in list(sync_session.identity_map.values()):
+            if isinstance(instance, self.table_class):
+                sync_session.expire(instance)
+        return result
+
+    async def flush(self, session: Session) -> None:
+        session.flush()
+
+    @asynccontextmanager
+    async def savepoint(self, session: Session):
+        with session.begin_nested():
+            yield
+
+    async def stream_partitions(self, session: Session, query, chunk_size: int, params: dict | None = None):
+        result = session.execute(query, params or None, execution_options={"yield_per": chunk_size})
+        for partition in self.shape_result(result).partitions():
+            yield partition
+
+    @property
+    def is_projected(self) -> bool:
+        return bool(self.mapper.select_columns())
+
+    def get_select(self, extra_columns: list | None = None) -> Select:
+        if not self.is_projected:
+            return select(self.table_class)
+
+        columns = list(self.mapper.select_columns())
+        keys = {column.key for column in columns}
+        columns.extend(column for column in extra_columns or [] if column.key not in keys)
+        return select(*columns)
+
+    def shape_result(self, result):
+        return result.mappings() if self.is_projected else result.scalars()
+
+    def build_filter_query(
+        self,
+        operation: str | tuple,
+        params: dict,
+        get_base_query=None,
+        build_query=None,
+        changes: dict | None = None,
+    ) -> tuple:
+        return self.statement_cache.get_query(
+            filterset_class=self.filterset_class,
+            operation=(self.table_class, operation, self.is_projected),
+            build_query=build_query or (lambda filter_set, values: filter_set.filter_query(values)),
+            get_base_query=get_base_query or self.get_select,
+            params=params,
+            changes=changes,
+        )
+
+    def get_items(self, result) -> list:
+        if self.is_projected:
+            return result.mappings().all()
+        return result.unique().scalars().all()
+
     async def find(self, filter_schema: BaseSchemaFilter) -> list[BaseEntity]:
         mapper = self.mapper
-        with self.db_con.new_session() as session:
+        async with self.read_session_scope() as session:
             try:
-                filter_set = self.filterset_class(session, select(self.table_class))
-                filtered_items = filter_set.filter(filter_schema.filters_as_dict)
-                return [await mapper.to_entity(entity_table=item_table) for item_table in filtered_items]
+                query, bind_values = self.build_filter_query("find", filter_schema.filters_as_dict)
+                result = await self.execute_query(session, query, bind_values)
+                return await mapper.to_entities(self.get_items(result))
             except Exception as error:
                 logger.exception(f"Failed find process: {error}")
+                record_error(error)
+
+            return []
+
+    async def stream(self, filter_schema: BaseSchemaFilter, chunk_size: int | None = None):
+        mapper = self.mapper
+        # The cursor outlives the call, so it gets its own session instead of blocking the unit of work.
+        async with self.read_session_scope(shared=False) as session:
+            query, bind_values = self.build_filter_query("stream", filter_schema.filters_as_dict)
+            chunk_size = chunk_size or self.stream_chunk_size
+            # yield_per uses a server side cursor, only one partition of rows is held in memory at a time.
+            async for partition in self.stream_partitions(session, query, chunk_size, bind_values):
+                for entity in await mapper.to_entities(partition):
+                    yield entity
 
+    async def find_by_ids(self, entity_ids: list[str]) -> list[BaseEntity]:
+        if not entity_ids:
             return []
 
+        mapper = self.mapper
+        async with self.read_session_scope() as session:
+            try:
+                query = self.get_select().where(self.table_class.entity_id.in_(entity_ids))
+                result = await self.execute_query(session, query)
+                return await mapper.to_entities(self.get_items(result))
+            except Exception as error:
+                logger.exception(f"Failed find by ids process: {error}")
+                record_error(error)
+
+            return []
+
+    async def existing_values(self, field: str, values: list[Any]) -> dict[str, list[str]]:
+        if not values:
+            return {}
+
+        column = self.table_class.__table__.columns[field]
+        # Uniqueness is checked on the primary, a lagging replica could miss a fresh row.
+        async with self.session_scope(connection=self.db_con) as session:
+            try:
+                query = select(column, self.table_class.entity_id).where(column.in_(values))
+                existing = {}
+                for value, entity_id in (await self.execute_query(session, query)).all():
+                    existing.setdefault(str(value), []).append(str(entity_id))
+                return existing
+            except Exception as error:
+                logger.exception(f"Failed existing values process: {error}")
+                record_error(error)
+
+            return {}
+
+    async def find_batch(self, filter_schema: BaseSchemaFilter) -> PageResult[BaseEntity]:
+        mapper = self.mapper
+        params = filter_schema.filters_as_dict
+        ordering = params.pop("ordering", None)
+        limit, _ = params.pop("pagination", None) or (DEFAULT_BATCH_SIZE, 0)
+        params.pop("batch_token", None)
+
+        keyset = KeysetPagination(table_class=self.table_class, filterset_class=self.filterset_class, ordering=ordering)
+        seek_values = keyset.decode(filter_schema.batch_token) if filter_schema.batch_token else None
+        async with self.read_session_scope() as session:
+            try:
+                query, bind_values = self.build_filter_query(
+                    ("find_batch", keyset.shape(seek_values)),
+                    params,
+                    get_base_query=lambda: self.get_select(extra_columns=keyset.columns),
+                    build_query=lambda filter_set, values: keyset.apply(filter_set.filter_query(values), seek_values),
+                )
+                bind_values.update(keyset.bind_values(seek_values, limit))
+                filtered_items = self.get_items(await self.execute_query(session, query, bind_values))
+
+                next_token = keyset.encode(filtered_items[limit - 1]) if len(filtered_items) > limit else None
+                items = await mapper.to_entities(filtered_items[:limit])
+                return PageResult(items=items, has_next=next_token is not None, next_token=next_token)
+            except Exception as error:
+                logger.exception(f"Failed find batch process: {error}")
+                record_error(error)
+
+            return PageResult()
+
+    async def find_page(self, filter_schema: BaseSchemaFilter, with_total: bool = True) -> PageResult[BaseEntity]:
+        mapper = self.mapper
+        params = filter_schema.filters_as_dict
+        limit, offset = params.get("pagination") or (None, 0)
+
+        async with self.read_session_scope() as session:
+            if not with_total:
+                # Fetch one extra row to know whether there is a next page without counting.
+                if limit is not None:
+                    params["pagination"] = (limit + 1, offset)
+                query, bind_values = self.build_filter_query("find", params)
+                filtered_items = self.get_items(await self.execute_query(session, query, bind_values))
+                has_next = limit is not None and len(filtered_items) > limit
+                items = await mapper.to_entities(filtered_items[:limit])
+                return PageResult(items=items, has_next=has_next)
+
+            query, bind_values = self.build_filter_query("find_page", params, build_query=self.build_page_query)
+            result = await self.execute_query(session, query, bind_values)
+            rows = result.mappings().all() if self.is_projected else result.unique().all()
+
+            total = None
+            if rows and not query._distinct:
+                total = rows[0]["total_count"] if self.is_projected else rows[0].total_count
+            elif rows or offset:
+                # DISTINCT pages have no window column and empty pages past the end carry no window value.
+                count_query, count_values = self.build_filter_query("count", params, build_query=self.build_count_query)
+                total = (await self.execute_query(session, count_query, count_values)).scalar()
+
+            items = await mapper.to_entities(rows if self.is_projected else [row[0] for row in rows])
+            total = total or 0
+            return PageResult(items=items, total=total, has_next=offset + len(items) < total)
+
+    @staticmethod
+    def build_count_query(filter_set: FilterSet, params: dict):
+        return filter_set.count_query(params)
+
+    @staticmethod
+    def build_page_query(filter_set: FilterSet, params: dict):
+        query = filter_set.filter_query(params)
+        if query._distinct:
+            # The window would count rows before DISTINCT is applied.
+            return query
+        return query.add_columns(func.count().over().label("total_count"))
+
     async def create(self, entity: BaseEntity) -> BaseEntity:
         mapper = self.mapper
-        with self.db_con.new_session() as session:
+        async with self.session_scope() as session:
             try:
                 item_table = await self.mapper.to_table(entity)
                 session.add(item_table)
-                session.flush()
+                await self.flush(session)
                 return await mapper.to_entity(entity_table=item_table)
+            except orm_exceptions.IntegrityError:
+                raise
             except Exception as error:
                 logger.exception(f"Failed create process: {error}")
+                record_error(error)
+
 
+    async def create_many(self, entities: list[BaseEntity], chunk_size: int | None = None) -> BulkResult[BaseEntity]:
+        table = self.table_class.__table__
+
+        def build_query(rows: list[dict]):
+            return insert(table).values(rows).on_conflict_do_nothing().returning(*table.columns)
+
+        return await self.write_many(
+            entities=entities, build_query=build_query, key_fields=["entity_id"], chunk_size=chunk_size
+        )
+
+    async def upsert_many(
+        self,
+        entities: list[BaseEntity],
+        conflict_fields: list[str] | None = None,
+        update_fields: list[str] | None = None,
+        chunk_size: int | None = None,
+    ) -> BulkResult[BaseEntity]:
+        table = self.table_class.__table__
+        conflict_fields = conflict_fields or ["entity_id"]
+        excluded_fields = {*conflict_fields, "entity_id", "created_at", "updated_at"}
+
+        def build_query(rows: list[dict]):
+            query = insert(table).values(rows)
+            fields = update_fields or [key for key in rows[0] if key not in excluded_fields]
+            changes = {field: query.excluded[field] for field in fields}
+            changes["updated_at"] = tables.UtcNow()
+            query = query.on_conflict_do_update(index_elements=conflict_fields, set_=changes)
+            return query.returning(*table.columns)
+
+        return await self.write_many(
+            entities=entities, build_query=build_query, key_fields=conflict_fields, chunk_size=chunk_size
+        )
+
+    async def write_many(
+        self,
+        entities: list[BaseEntity],
+        build_query: Callable[[list[dict]], object],
+        key_fields: list[str],
+        chunk_size: int | None = None,
+    ) -> BulkResult[BaseEntity]:
+        chunk_size = chunk_size or self.bulk_chunk_size
+        bulk_result = BulkResult()
+
+        async with self.session_scope() as session:
+            for start in range(0, len(entities), chunk_size):
+                chunk = {}
+                for index, entity in enumerate(entities[start:start + chunk_size], start=start):
+                    row = await self.mapper.to_row(entity)
+                    if row.get("entity_id") is None:
+                        row["entity_id"] = uuid.uuid4()
+                    key = self.get_row_key(row, key_fields)
+                    if key in chunk:
+                        # A statement can't touch the same row twice, the last occurrence wins.
+                        message = "Superseded by a later row of the same batch."
+                        bulk_result.conflicts.append(BulkConflict(index=chunk[key][0], message=message))
+                    chunk[key] = (index, row)
+
+                await self.write_chunk(session, chunk, build_query, key_fields, bulk_result)
+
+        bulk_result.conflicts.sort(key=lambda conflict: conflict.index)
+        return bulk_result
+
+    async def write_chunk(
+        self,
+        session: Session,
+        chunk: dict,
+        build_query: Callable[[list[dict]], object],
+        key_fields: list[str],
+        bulk_result: BulkResult,
+    ) -> None:
+        failed = set()
+        try:
+            async with self.savepoint(session):
+                result = await self.execute_query(session, build_query([row for _, row in chunk.values()]))
+                returned = result.all()
+        except orm_exceptions.IntegrityError:
+            # Retry row by row, so only the offending rows are reported instead of the whole chunk.
+            returned = []
+            for key, (index, row) in chunk.items():
+                try:
+                    async with self.savepoint(session):
+                        returned.extend((await self.execute_query(session, build_query([row]))).all())
+                except orm_exceptions.IntegrityError as error:
+                    message = "Duplicate entity." if is_unique_violation(error) else str(error.orig)
+                    bulk_result.conflicts.append(BulkConflict(index=index, message=message))
+                    failed.add(key)
+
+        returned_rows = {self.get_row_key(row._mapping, key_fields): row for row in returned}
+        written_rows = []
+        for key, (index, _) in chunk.items():
+            if key in returned_rows:
+                row = returned_rows[key]
+                written_rows.append(row._mapping if self.is_projected else row)
+            elif key not in failed:
+                bulk_result.conflicts.append(BulkConflict(index=index, message="Duplicate entity."))
+        bulk_result.items.extend(await self.mapper.to_entities(written_rows))
+
+    @staticmethod
+    def get_row_key(row, key_fields: list[str]) -> tuple:
+        return tuple(str(row[field]) for field in key_fields)
 
     async def count(self, filter_schema: BaseSchemaFilter) -> int:
-        with self.db_con.new_session() as session:
+        async with self.read_session_scope() as session:
             try:
-                filter_set = self.filterset_class(session, select(self.table_class))
-                query = filter_set.count_query(filter_schema.filters_as_dict)
-                return session.execute(query).scalar()
+                query, bind_values = self.build_filter_query(
+                    "count",
+                    filter_schema.filters_as_dict,
+                    build_query=self.build_count_query,
+                )
+                result = await self.execute_query(session, query, bind_values)
+                return result.scalar()
             except Exception as error:
                 logger.exception(f"Count process failed: {error}")
+                record_error(error)
 
             return 0
 
+    async def get_version(self, filter_schema: BaseSchemaFilter) -> DataVersion | None:
+        params = filter_schema.filters_as_dict
+        for key in ("pagination", "ordering", "batch_token"):
+            params.pop(key, None)
+
+        async with self.read_session_scope() as session:
+            try:
+                query, bind_values = self.build_filter_query(
+                    "version",
+                    params,
+                    get_base_query=lambda: select(
+                        self.table_class.entity_id, self.table_class.updated_at, self.get_row_version()
+                    ),
+                    build_query=self.build_version_query,
+                )
+                return DataVersion(**(await self.execute_query(session, query, bind_values)).one()._mapping)
+            except Exception as error:
+                logger.exception(f"Failed version process: {error}")
+                record_error(error)
+
+            return None
+
+    async def get_version_by_ids(self, entity_ids: list[str]) -> DataVersion | None:
+        async with self.read_session_scope() as session:
+            try:
+                rows = select(self.table_class.entity_id, self.table_class.updated_at, self.get_row_version()).where(
+                    self.table_class.entity_id.in_(entity_ids)
+                )
+                query = self.aggregate_version(rows.subquery())
+                return DataVersion(**(await self.execute_query(session, query)).one()._mapping)
+            except Exception as error:
+                logger.exception(f"Failed version by ids process: {error}")
+                record_error(error)
+
+            return None
+
+    def get_row_version(self):
+        # PostgreSQL gives every written row version a new xmin. `updated_at` is the start of the writing transaction,
+        # so a transaction committing late can write an older value than the one already seen.
+        return literal_column(f"{self.table_class.__table__.fullname}.xmin::text").label(ROW_VERSION_LABEL)
+
+    @classmethod
+    def build_version_query(cls, filter_set: FilterSet, params: dict):
+        return cls.aggregate_version(filter_set.filter_query(params).subquery())
+
+    @staticmethod
+    def aggregate_version(rows):
+        row_key = cast(rows.c.entity_id, Text) + ":" + rows.c[ROW_VERSION_LABEL]
+        # Summing the row hashes doesn't depend on the order, so the digest is one more aggregate of the same pass as
+        # the count, without sorting the rows or building a string of all of them.
+        return select(
+            func.max(rows.c.updated_at).label("last_modified"),
+            func.count().label("count"),
+            cast(func.sum(func.hashtextextended(row_key, 0)), Text).label("digest"),
+        )
+
+    def get_returning(self, ids_only: bool = False) -> list:
+        if ids_only:
+            return [self.table_class.entity_id]
+        return list(self.mapper.select_columns() or [self.table_class])
+
+    async def map_returning(self, result, ids_only: bool = False) -> list:
+        if ids_only:
+            return [str(entity_id) for entity_id in result.scalars().all()]
+        return await self.mapper.to_entities(self.get_items(result))
+
     async def update_one(self, entity: BaseEntity, change_request: BaseChangeRequest) -> BaseEntity:
-        with self.db_con.new_session() as session:
+        async with self.session_scope() as session:
             try:
                 query = update(self.table_class).where(self.table_class.entity_id == entity.entity_id)
-                query = query.values(**change_request.changes_as_dict)
-                session.execute(query)
+                query = query.values(**change_request.changes_as_dict).returning(*self.get_returning())
+                result = await self.execute_query(session, query)
+                updated = await self.map_returning(result)
+                if updated:
+                    return updated[0]
             except Exception as error:
                 logger.exception(f"Update one process failed: {error}")
+                record_error(error)
+        # Nothing was returned, the row is gone or the update failed.
         entity = entity.model_copy(update=change_request.changes_as_dict)
         return entity
 
     async def update_many(self, filter_schema: BaseSchemaFilter, change_request: BaseChangeRequest) -> int:
-        with self.db_con.new_session() as session:
+        async with self.session_scope() as session:
             try:
-                filter_set = self.filterset_class(session, update(self.table_class))
-                query = filter_set.filter_query(filter_schema.filters_as_dict)
-                query = query.values(**change_request.changes_as_dict)
-                result = session.execute(query)
+                query, bind_values = self.build_filter_query(
+                    "update_many",
+                    filter_schema.filters_as_dict,
+                    get_base_query=lambda: update(self.table_class),
+                    changes=change_request.changes_as_dict,
+                )
+                result = await self.execute_write(session, query, bind_values)
                 return result.rowcount
             except Exception as error:
                 logger.exception(f"Update many process failed: {error}")
+                record_error(error)
 
             return 0
 
+    async def update_many_returning(
+        self, filter_schema: BaseSchemaFilter, change_request: BaseChangeRequest, ids_only: bool = False
+    ) -> list[BaseEntity] | list[str]:
+        async with self.session_scope() as session:
+            try:
+                query, bind_values = self.build_filter_query(
+                    "update_many_ids" if ids_only else "update_many_returning",
+                    filter_schema.filters_as_dict,
+                    get_base_query=lambda: update(self.table_class).returning(*self.get_returning(ids_only)),
+                    changes=change_request.changes_as_dict,
+                )
+                result = await self.execute_write(session, query, bind_values)
+                return await self.map_returning(result, ids_only=ids_only)
+            except Exception as error:
+                logger.exception(f"Update many process failed: {error}")
+                record_error(error)
+
+            return []
+
     async def delete(self, filter_schema: BaseSchemaFilter) -> int:
-        with self.db_con.new_session() as session:
+        async with self.session_scope() as session:
             try:
-                filter_set = self.filterset_class(session, delete(self.table_class))
-                query = filter_set.filter_query(filter_schema.filters_as_dict)
-                result = session.execute(query)
-                session.commit()
+                query, bind_values = self.build_filter_query(
+                    "delete", filter_schema.filters_as_dict, get_base_query=lambda: delete(self.table_class)
+                )
+                result = await self.execute_write(session, query, bind_values)
 
                 return result.rowcount
             except Exception as error:
                 logger.exception(f"Failed delete process: {error}")
+                record_error(error)
 
             return 0
 
+    async def delete_returning(
+        self, filter_schema: BaseSchemaFilter, ids_only: bool = False
+    ) -> list[BaseEntity] | list[str]:
+        async with self.session_scope() as session:
+            try:
+                query, bind_values = self.build_filter_query(
+                    "delete_ids" if ids_only else "delete_returning",
+                    filter_schema.filters_as_dict,
+                    get_base_query=lambda: delete(self.table_class).returning(*self.get_returning(ids_only)),
+                )
+                result = await self.execute_write(session, query, bind_values)
+                return await self.map_returning(result, ids_only=ids_only)
+            except Exception as error:
+                logger.exception(f"Failed delete process: {error}")
+                record_error(error)
+
+            return []
+
+
+class BaseAsyncSourceRepository(BaseSourceRepository):
+    @property
+    def db_con(self) -> AsyncDbConnection:
+        return self.data_source.get(DB_CONNECTION_NAME)
+
+    def new_session(self, connection: AsyncDbConnection):
+        return connection.new_session()
+
+    async def connect(self, session: AsyncSession) -> None:
+        await session.connection()
+
+    async def execute_query(self, session: AsyncSession, query, params: dict | None = None):
+        return await session.execute(query, params or None)
+
+    async def flush(self, session: AsyncSession) -> None:
+        await session.flush()
+
+    @asynccontextmanager
+    async def savepoint(self, session: AsyncSession):
+        async with session.begin_nested():
+            yield
+
+    async def stream_partitions(self, session: AsyncSession, query, chunk_size: int, params: dict | None = None):
+        result = await session.stream(query, params or None, execution_options={"yield_per": chunk_size})
+        async for partition in self.shape_result(result).partitions():
+            yield partition
+
 
 def create_generic_source_repository(
     data_source: DataSources,
@@ -131,7 +643,10 @@ def create_generic_source_repository(
     filterset_class: FilterSet,
     mapper_class: BaseSourceMapper | None = None,
 ):
-    repo_instance = BaseSourceRepository(
+    # The declared class of a lazy connection is enough, building it can wait for the first query.
+    is_async = issubclass(data_source.get_class(DB_CONNECTION_NAME), AsyncDbConnection)
+    repository_class = BaseAsyncSourceRepository if is_async else BaseSourceRepository
+    repo_instance = repository_class(
         data_source=data_source,
         domain_class=domain_class,
         table_class=table_class,
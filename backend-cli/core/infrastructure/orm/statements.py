@@ -0,0 +1,150 @@
+import operator
+from collections import OrderedDict
+from typing import Any
+from typing import Callable
+
+from sqlalchemy import bindparam
+from sqlalchemy.sql import operators as sa_operators
+from sqlalchemy_filterset import Filter
+from sqlalchemy_filterset import FilterSet
+from sqlalchemy_filterset import LimitOffsetFilter
+from sqlalchemy_filterset import OrderingFilter
+from sqlalchemy_filterset.strategies import BaseStrategy
+
+DEFAULT_STATEMENT_CACHE_SIZE = 500
+
+# Lookups that receive the raw value, so it can be swapped by a bound parameter in the cached statement.
+BIND_OPERATORS = {
+    operator.eq,
+    operator.ne,
+    operator.lt,
+    operator.le,
+    operator.gt,
+    operator.ge,
+    sa_operators.eq,
+    sa_operators.ne,
+    sa_operators.lt,
+    sa_operators.le,
+    sa_operators.gt,
+    sa_operators.ge,
+}
+EXPANDING_OPERATORS = {sa_operators.in_op, sa_operators.not_in_op}
+
+
+class UncacheableQuery(Exception):
+    pass
+
+
+class StatementCache:
+    """LRU cache of filter statements built with bound parameters instead of literal values.
+
+    Statements are keyed by filterset, operation and the set of active filter keys, so requests that only differ in
+    values reuse the same statement object. A reused statement also keeps its memoized cache key, which lets
+    SQLAlchemy's compiled cache skip the compilation step. Filters whose value changes the shape of the query
+    (ordering, null checks) add their value to the key, unknown filter types are built on every call.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_STATEMENT_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self.statements: OrderedDict = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.bypasses = 0
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.statements),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "bypasses": self.bypasses,
+        }
+
+    def clear(self) -> None:
+        self.statements.clear()
+        self.hits = self.misses = self.bypasses = 0
+
+    def get_query(
+        self,
+        filterset_class: FilterSet,
+        operation: tuple,
+        build_query: Callable[[FilterSet, dict], Any],
+        get_base_query: Callable[[], Any],
+        params: dict,
+        changes: dict | None = None,
+    ) -> tuple[Any, dict]:
+        """Return the statement for `operation` over `params` and the values to bind on execution.
+
+        `operation` must identify everything that shapes the base query besides the filters, e.g. table and columns.
+        """
+        try:
+            key, template_params, bind_values = self.parametrize(filterset_class, params)
+        except UncacheableQuery:
+            self.bypasses += 1
+            query = build_query(filterset_class(None, get_base_query()), params)
+            return (query.values(**changes) if changes is not None else query), {}
+
+        change_keys = tuple(sorted(changes)) if changes is not None else None
+        cache_key = (filterset_class, operation, key, change_keys)
+
+        query = self.statements.get(cache_key)
+        if query is not None:
+            self.hits += 1
+            self.statements.move_to_end(cache_key)
+        else:
+            self.misses += 1
+            query = build_query(filterset_class(None, get_base_query()), template_params)
+            if changes is not None:
+                query = query.values(**{name: bindparam(f"value_{name}") for name in change_keys})
+            if query.is_dml:
+                # The ORM would evaluate the placeholders, whose values only come on execution, against the objects
+                # of the session. Callers expire those objects instead, see `BaseSourceRepository.execute_write`.
+                query = query.execution_options(synchronize_session=False)
+            self.statements[cache_key] = query
+            if len(self.statements) > self.max_size:
+                self.statements.popitem(last=False)
+
+        if changes is not None:
+            bind_values.update({f"value_{name}": value for name, value in changes.items()})
+        return query, bind_values
+
+    def parametrize(self, filterset_class: FilterSet, params: dict) -> tuple[tuple, dict, dict]:
+        filters = filterset_class.declared_filters
+        key, template_params, bind_values = [], {}, {}
+
+        for name in sorted(params):
+            value, filter_ = params[name], filters.get(name)
+            if filter_ is None:
+                continue
+
+            if isinstance(filter_, LimitOffsetFilter):
+                if not value or not all(isinstance(item, int) for item in value):
+                    raise UncacheableQuery(name)
+                template_params[name] = (bindparam(f"filter_{name}_limit"), bindparam(f"filter_{name}_offset"))
+                bind_values.update({f"filter_{name}_limit": value[0], f"filter_{name}_offset": value[1]})
+                key.append((name, "bind"))
+            elif isinstance(filter_, OrderingFilter):
+                template_params[name] = value
+                key.append((name, tuple(value)))
+            elif isinstance(filter_, Filter) and type(filter_.strategy) is BaseStrategy:
+                lookup_expr = filter_.lookup_expr
+                if lookup_expr in EXPANDING_OPERATORS:
+                    template_params[name] = bindparam(f"filter_{name}", expanding=True)
+                elif lookup_expr in BIND_OPERATORS:
+                    template_params[name] = bindparam(f"filter_{name}")
+                elif isinstance(value, bool):
+                    # Boolean and null checks render a different clause per value.
+                    template_params[name] = value
+                    key.append((name, value))
+                    continue
+                else:
+                    raise UncacheableQuery(name)
+                bind_values[f"filter_{name}"] = list(value) if lookup_expr in EXPANDING_OPERATORS else value
+                key.append((name, "bind"))
+            else:
+                raise UncacheableQuery(name)
+
+        return tuple(key), template_params, bind_values
+
+
+statement_cache = StatementCache()
@@ -0,0 +1,251 @@
+import asyncio
+import inspect
+import logging
+from contextlib import AsyncExitStack
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Awaitable
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy import exc as orm_exceptions
+from sqlalchemy.engine import Connection
+from sqlalchemy.engine import Engine
+
+from core.domain.exceptions import DuplicateException
+from core.domain.repositories import IUnitOfWork
+from core.domain.repositories import current_unit_of_work
+from core.infrastructure.orm.admission import admission_scope
+from core.infrastructure.orm.database import is_unique_violation
+
+logger = logging.getLogger(__name__)
+
+
+class TransactionFailed(Exception):
+    pass
+
+
+async def resolve(value):
+    return await value if inspect.isawaitable(value) else value
+
+
+def get_sync_engine(connection) -> Engine:
+    return getattr(connection.engine, "sync_engine", connection.engine)
+
+
+def on_error(exception_context) -> None:
+    # Statements on other connections of the engine, e.g. unshared sessions, don't affect the unit of work.
+    unit_of_work = current_unit_of_work.get()
+    if isinstance(unit_of_work, UnitOfWork) and exception_context.connection in unit_of_work.connections:
+        unit_of_work.failed.add(exception_context.connection)
+
+
+def on_rollback(conn, *args) -> None:
+    # Rolling back, even to a savepoint, leaves the transaction usable again.
+    unit_of_work = current_unit_of_work.get()
+    if isinstance(unit_of_work, UnitOfWork):
+        unit_of_work.failed.discard(conn)
+
+
+def watch_engine(engine: Engine) -> None:
+    if not event.contains(engine, "handle_error", on_error):
+        event.listen(engine, "handle_error", on_error)
+        event.listen(engine, "rollback", on_rollback)
+        event.listen(engine, "rollback_savepoint", on_rollback)
+
+
+class NestedScope:
+    __slots__ = ("unit_of_work",)
+
+    def __init__(self, unit_of_work: "UnitOfWork") -> None:
+        self.unit_of_work = unit_of_work
+
+
+# Nested service scopes the current task runs in, tasks started inside a scope inherit it.
+current_scopes: ContextVar[tuple] = ContextVar("unit_of_work_scopes", default=())
+
+
+class UnitOfWork(IUnitOfWork):
+    """One session and transaction per database connection, shared by every repository call in the scope.
+
+    Sessions are opened on first use and committed together when the scope ends, or rolled back if it fails.
+    A failed statement aborts the whole transaction on the server, so the unit of work fails with `TransactionFailed`
+    even if the repository swallowed the error, unless a savepoint rolled it back. Calls on the same session are
+    serialized, and while a nested service holds a savepoint only the tasks running inside it can use the sessions,
+    so concurrent services never write into, or get rolled back with, a savepoint that isn't theirs.
+    """
+
+    def __init__(self) -> None:
+        self.stack = AsyncExitStack()
+        self.sessions: dict[int, tuple] = {}
+        self.connections: set[Connection] = set()  # Connections of the sessions, the ones it can fail on.
+        self.failed: set[Connection] = set()
+        self.lock = asyncio.Lock()
+        self.savepoint_scopes: list[NestedScope] = []  # Scopes holding a savepoint, innermost last.
+        self.gate = asyncio.Condition()
+        self.commit_callbacks: list[Callable[[], Awaitable]] = []
+        self.active = False
+        self.token = None
+
+    async def __aenter__(self) -> "UnitOfWork":
+        self.active = True
+        self.token = current_unit_of_work.set(self)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> bool:
+        try:
+            await self.close(error=exc)
+        finally:
+            # Not in `close`, which may run in another context, e.g. the task sending a streamed response.
+            current_unit_of_work.reset(self.token)
+        return False
+
+    @property
+    def depth(self) -> int:
+        """Nested services the current task runs in."""
+        return sum(1 for scope in current_scopes.get() if scope.unit_of_work is self)
+
+    def is_failed(self) -> bool:
+        return bool(self.failed)
+
+    def on_begin(self, session, transaction, connection: Connection) -> None:
+        self.connections.add(connection)
+
+    def may_enter(self) -> bool:
+        return not self.savepoint_scopes or self.savepoint_scopes[-1] in current_scopes.get()
+
+    async def wait_gate(self) -> None:
+        if not self.may_enter():
+            async with self.gate:
+                await self.gate.wait_for(self.may_enter)
+
+    async def acquire(self, lock: asyncio.Lock) -> None:
+        """Take a session lock once no savepoint of another task is open."""
+        while True:
+            await self.wait_gate()
+            await lock.acquire()
+            if self.may_enter():
+                return
+            # A savepoint was opened while waiting for the lock.
+            lock.release()
+
+    async def close(self, commit: bool = True, error: BaseException | None = None) -> None:
+        """Commit or roll back every session, the error, if any, is raised again after rolling back."""
+        if not self.active:
+            return
+
+        self.active = False
+        if error is not None:
+            await self.stack.__aexit__(type(error), error, error.__traceback__)
+            return
+
+        failed = self.is_failed()
+        if failed or not commit:
+            for _, session, _ in self.sessions.values():
+                await resolve(session.rollback())
+        await self.stack.aclose()
+        if failed and commit:
+            raise TransactionFailed("A statement failed inside the unit of work, its transaction was rolled back.")
+        if commit:
+            await self.run_commit_callbacks()
+
+    def on_commit(self, callback: Callable[[], Awaitable]) -> None:
+        if callback not in self.commit_callbacks:
+            self.commit_callbacks.append(callback)
+
+    async def run_commit_callbacks(self) -> None:
+        # The transaction is already committed, a failing callback can't undo it.
+        for callback in self.commit_callbacks:
+            try:
+                await callback()
+            except Exception as error:  # noqa
+                logger.exception(f"Failed commit callback: {error}")
+
+    @asynccontextmanager
+    async def session(self, connection):
+        """Shared session of `connection`, held exclusively while the block runs."""
+        key = id(connection)
+        async with self.lock:
+            if key not in self.sessions:
+                watch_engine(get_sync_engine(connection))
+                # The admission slot is held until the session closes with the unit of work.
+                await self.stack.enter_async_context(admission_scope(connection))
+                context = connection.new_session()
+                if hasattr(context, "__aenter__"):
+                    session = await self.stack.enter_async_context(context)
+                else:
+                    session = self.stack.enter_context(context)
+                event.listen(getattr(session, "sync_session", session), "after_begin", self.on_begin)
+                self.sessions[key] = (connection, session, asyncio.Lock())
+
+        _, session, lock = self.sessions[key]
+        await self.acquire(lock)
+        try:
+            yield session
+        except orm_exceptions.IntegrityError as error:
+            if is_unique_violation(error):
+                raise DuplicateException(str(error.orig))
+            raise
+        finally:
+            lock.release()
+
+    async def lock_sessions(self) -> list[asyncio.Lock]:
+        locks = [lock for _, _, lock in self.sessions.values()]
+        for lock in locks:
+            await lock.acquire()
+        return locks
+
+    @asynccontextmanager
+    async def nested(self):
+        scope = NestedScope(self)
+        if self.depth == 0:
+            # The outermost service already owns the whole transaction.
+            token = current_scopes.set(current_scopes.get() + (scope,))
+            try:
+                yield
+            finally:
+                current_scopes.reset(token)
+            return
+
+        # Closing the gate first lets the calls already running finish, and keeps the other tasks out until the
+        # savepoint is released.
+        await self.wait_gate()
+        self.savepoint_scopes.append(scope)
+        token = current_scopes.set(current_scopes.get() + (scope,))
+        try:
+            locks = await self.lock_sessions()
+            try:
+                savepoints = {
+                    key: await resolve(session.begin_nested()) for key, (_, session, _) in self.sessions.items()
+                }
+            finally:
+                for lock in locks:
+                    lock.release()
+
+            try:
+                yield
+                if self.is_failed():
+                    raise TransactionFailed("A statement failed inside a nested service, its savepoint is rolled back.")
+            except BaseException:
+                locks = await self.lock_sessions()
+                try:
+                    for key, (_, session, _) in list(self.sessions.items()):
+                        # Sessions opened inside the nested service have nothing worth keeping.
+                        await resolve(savepoints[key].rollback() if key in savepoints else session.rollback())
+                finally:
+                    for lock in locks:
+                        lock.release()
+                raise
+            else:
+                locks = await self.lock_sessions()
+                try:
+                    for savepoint in savepoints.values():
+                        await resolve(savepoint.commit())
+                finally:
+                    for lock in locks:
+                        lock.release()
+        finally:
+            current_scopes.reset(token)
+            self.savepoint_scopes.remove(scope)
+            async with self.gate:
+                self.gate.notify_all()
@@ -1,7 +1,12 @@
+import atexit
+import functools
 import importlib
 import logging
+import math
 import os
 import sys
+import time
+from contextlib import contextmanager
 
 import inject
 
@@ -9,15 +14,31 @@ import inject
 from fastapi import APIRouter
 from fastapi import FastAPI
 from fastapi import Request
-from fastapi.responses import JSONResponse
+from fastapi import Response
 from fastapi import status
 from fastapi.exceptions import RequestValidationError
 from fastapi import HTTPException
 from pydantic import ValidationError
 
+from core.api.debug import debug_router
+from core.api.metrics import metrics_router
+from core.api.middlewares import ConditionalGetMiddleware
+from core.api.middlewares import LoaderMiddleware
+from core.api.middlewares import PrimaryPinMiddleware
+from core.api.middlewares import QueryProfilerMiddleware
+from core.api.middlewares import UnitOfWorkMiddleware
+from core.api.responses import ApiJSONResponse
+from core.api.serializers import ValidationMapper
+from core.domain.exceptions import NotModifiedException
+from core.domain.exceptions import OverloadedException
 from core.domain.exceptions import ValidationException
 from core.domain.repositories import DataSources
-from core.presentation.serializers import ValidationMapper
+from core.infrastructure.dependencies import DependencyProviders
+from core.infrastructure.dependencies import LazyProvider
+from core.infrastructure.metrics import ServiceMetrics
+from core.infrastructure.orm.profiler import QueryProfiler
+from core.infrastructure.orm.profiler import get_engines
+from core.use_cases.instrumentation import set_service_metrics
 
 logger = logging.getLogger(__name__)
 logger.addHandler(logging.StreamHandler(sys.stdout))
@@ -27,6 +48,18 @@ LIB_SETTINGS_KEY_ENV_NAME = "SIMPLE_SETTINGS"
 SETTINGS_LIB_SETTINGS_KEY = "LIB_SETTINGS"
 SETTINGS_SOURCES_KEY = "SOURCES"
 SETTINGS_DEPENDENCIES_KEY = "DEPENDENCIES"
+SETTINGS_DEBUG_ENDPOINTS_KEY = "DEBUG_ENDPOINTS"
+SETTINGS_UNIT_OF_WORK_KEY = "REQUEST_UNIT_OF_WORK"
+SETTINGS_METRICS_KEY = "METRICS_ENABLED"
+SETTINGS_QUERY_PROFILER_KEY = "QUERY_PROFILER"
+SETTINGS_CONDITIONAL_GET_KEY = "CONDITIONAL_GET"
+SETTINGS_LAZY_SOURCES_KEY = "LAZY_SOURCES"
+SETTINGS_BOOT_TIMINGS_KEY = "BOOT_TIMINGS"
+SETTINGS_LAZY_DEPENDENCIES_KEY = "LAZY_DEPENDENCIES"
+SETTINGS_WARM_UP_DEPENDENCIES_KEY = "WARM_UP_DEPENDENCIES"
+SETTINGS_REPORT_UNUSED_DEPENDENCIES_KEY = "REPORT_UNUSED_DEPENDENCIES"
+SETTINGS_BOOT_SOURCES_AFTER_FORK_KEY = "BOOT_SOURCES_AFTER_FORK"
+SOURCE_STEP_PREFIX = "source:"
 
 DOCS_PATH = "/docs"
 DOCS_URL = "/openapi.json"
@@ -35,27 +68,27 @@ DOCS_URL = "/openapi.json"
 async def exception_validation_handler(request: Request, error: ValidationException):
     mapper = ValidationMapper()
     output = await mapper.to_api(exception=error)
-    return JSONResponse(
+    return ApiJSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
-        content=output.model_dump(),
+        content=output,
     )
 
 
 async def exception_request_validation_error_handler(request: Request, error: RequestValidationError):
     mapper = ValidationMapper()
     output = await mapper.to_api_from_request_validation_error(exception=error)
-    return JSONResponse(
+    return ApiJSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
-        content=output.model_dump(),
+        content=output,
     )
 
 
 async def exception_generic_handler(request: Request, error: Exception):
     mapper = ValidationMapper()
     output = await mapper.to_api_from_generic_error(exception=error)
-    return JSONResponse(
+    return ApiJSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
-        content=output.model_dump(),
+        content=output,
     )
 
 
@@ -63,72 +96,132 @@ async def exception_http_handler(request: Request, error: HTTPException):
     logger.info(f"Http exception. Code: {error.status_code}. {error.detail}")
     mapper = ValidationMapper()
     output = await mapper.to_api_from_http_error(error=error)
-    return JSONResponse(
+    return ApiJSONResponse(
         status_code=error.status_code,
-        content=output.model_dump(),
+        content=output,
     )
 
 
+async def exception_overloaded_handler(request: Request, error: OverloadedException):
+    mapper = ValidationMapper()
+    output = await mapper.to_api_from_overloaded_error(exception=error)
+    return ApiJSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=output,
+        headers={"Retry-After": str(max(1, math.ceil(error.retry_after or 0)))},
+    )
+
+
+async def exception_not_modified_handler(request: Request, error: NotModifiedException):
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED)
+
+
 async def exception_pydantic_validation_error(request: Request, validation_error: ValidationError):
     mapper = ValidationMapper()
     output = await mapper.to_api_from_pydantic_validation_error(validation_error=validation_error)
-    return JSONResponse(
+    return ApiJSONResponse(
         status_code=status.HTTP_400_BAD_REQUEST,
-        content=output.model_dump(),
+        content=output,
     )
 
+
+@functools.lru_cache(maxsize=None)
+def resolve_settings_modules(settings_module: str) -> tuple:
+    """Settings modules reachable from `settings_module` through `LIB_SETTINGS`, each one after its dependencies."""
+    modules, visited = [], set()
+
+    def visit(name: str) -> None:
+        if name in visited:
+            logger.debug(f"Module already registered: {name}")
+            return
+        visited.add(name)
+        module = importlib.import_module(name)
+        for depend in getattr(module, SETTINGS_LIB_SETTINGS_KEY, []):
+            visit(depend)
+        modules.append(module)
+
+    visit(settings_module)
+    return tuple(modules)
+
+
 class BaseBootApp:
     SETTINGS_MODULE = "app.settings"
 
     def __init__(self) -> None:
         os.environ["APP_NAME"] = os.environ.get("APP_NAME", self.SETTINGS_MODULE.split(".")[0])
         self.lib_settings = []
-        self.setup_lib_settings()
-        self.setup_injection()
-
-    def setup_lib_settings(self) -> tuple:
+        self.settings_values = {}
+        self.boot_timings: list[tuple[str, float]] = []  # Seconds taken by each boot step, sources included.
+        with self.timed("settings"):
+            self.setup_lib_settings()
+        with self.timed("injection"):
+            self.setup_injection()
+
+    @contextmanager
+    def timed(self, step: str):
+        started_at = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.boot_timings.append((step, time.perf_counter() - started_at))
+
+    def report_boot_timings(self) -> None:
+        if not self.get_setting(SETTINGS_BOOT_TIMINGS_KEY, False):
+            return
+
+        total = sum(elapsed for step, elapsed in self.boot_timings if not step.startswith(SOURCE_STEP_PREFIX))
+        steps = "".join(f"\n  {step:<32} {elapsed * 1000:8.1f}ms" for step, elapsed in self.boot_timings)
+        logger.info(f"Boot finished in {total * 1000:.1f}ms{steps}")
+
+    def setup_lib_settings(self) -> None:
         self.lib_settings = self.get_all_settings_files(current_settings_str=self.SETTINGS_MODULE)
+        # Later modules override earlier ones, as in `get_setting`.
+        for settings_module in self.lib_settings:
+            self.settings_values.update(vars(settings_module))
 
         lib_settings_str = [item.__name__ for item in self.lib_settings]
         lib_settings_str.reverse()
 
         os.environ["SIMPLE_SETTINGS"] = ",".join(lib_settings_str)
 
-    def get_all_settings_files(self, current_settings_str: str, settings_files=[]):
-        current_settings = importlib.import_module(current_settings_str)
-        settings_list = list(getattr(current_settings, SETTINGS_LIB_SETTINGS_KEY, []))
-
-        for settings_str in settings_list:
-            depends = self.get_all_settings_files(current_settings_str=settings_str, settings_files=settings_files)
-            for depend in depends:
-                if depend not in settings_files:
-                    settings_files.extend(depend)
-                    continue
-                print(f"Module already registered: {current_settings_str} >> {depend.__name__}")
+    def get_all_settings_files(self, current_settings_str: str) -> list:
+        return list(resolve_settings_modules(current_settings_str))
 
-        if current_settings not in settings_files:
-            settings_files.append(current_settings)
-        else:
-            print(f"Module already registered: {current_settings_str}")
-
-        return settings_files
+    def get_setting(self, key: str, default=None):
+        return self.settings_values.get(key, default)
 
     def get_data_source(self) -> DataSources:
         logger.debug("Creating datasource.")
         data_source = DataSources()
 
+        sources = {}
         for settings_module in self.lib_settings:
-            for key, item in getattr(settings_module, SETTINGS_SOURCES_KEY, {}).items():
+            sources.update(getattr(settings_module, SETTINGS_SOURCES_KEY, {}))
+
+        for key, item in sources.items():
+            # A function building the source, instead of its class, declares no class.
+            source_class = item["class"] if isinstance(item["class"], type) else None
+            data_source.add_factory(
+                name=key, factory=self.get_source_factory(key=key, item=item), source_class=source_class
+            )
+
+        if not self.get_setting(SETTINGS_LAZY_SOURCES_KEY, True):
+            data_source.build_all()
+
+        return data_source
+
+    def get_source_factory(self, key: str, item: dict):
+        def factory():
+            with self.timed(f"{SOURCE_STEP_PREFIX}{key}"):
                 try:
                     class_ = item["class"]
                     args, kwargs = item.get("args", []), item.get("kwargs", {})
-                    source_instance = class_(*args, **kwargs)
-                    data_source.add(name=key, source_instance=source_instance)
+                    return class_(*args, **kwargs)
                 except:  # noqa
                     logger.exception(f"Error loading source: {key}")
                     raise
 
-        return data_source
+        return factory
 
     def get_dependencies(self):
         dependencies = {}
@@ -143,40 +236,107 @@ class BaseBootApp:
 
     def config_inject(self, binder):
         data_source = self.get_data_source()
+        binder.bind(DataSources, data_source)
+        providers = DependencyProviders()
+        binder.bind(DependencyProviders, providers)
         for interface, implementation in self.get_dependencies():
+            provider = LazyProvider(
+                interface=interface,
+                factory=self.get_dependency_factory(interface, implementation, data_source=data_source),
+            )
+            providers.add(provider)
             try:
-                if isinstance(implementation, dict):
-                    factory = implementation["factory"]
-                    args = implementation.get("args", [])
-                    kwargs = implementation.get("kwargs", {})
-                    kwargs["data_source"] = data_source
-                    instance = factory(*args, **kwargs)
-                else:
-                    instance = implementation(data_source=data_source)
+                binder.bind_to_provider(interface, provider)
             except:  # noqa
-                logger.exception(f"Injecting instance of: {interface}")
+                logger.exception("Binding inject")
                 raise
+
+        if not self.get_setting(SETTINGS_LAZY_DEPENDENCIES_KEY, True):
+            for provider in providers.providers.values():
+                provider.build()
+
+    def get_dependency_factory(self, interface, implementation, data_source: DataSources):
+        def factory():
             try:
-                binder.bind(interface, instance)
+                if isinstance(implementation, dict):
+                    args = implementation.get("args", [])
+                    kwargs = {**implementation.get("kwargs", {}), "data_source": data_source}
+                    return implementation["factory"](*args, **kwargs)
+                return implementation(data_source=data_source)
             except:  # noqa
-                logger.exception("Binding inject")
+                logger.exception(f"Injecting instance of: {interface}")
                 raise
 
+        return factory
+
+    def after_fork(self) -> None:
+        """Boot the data sources of a worker process, call it in the child right after forking.
+
+        Connections inherited from the parent get a pool of their own and the sources not built yet are built now,
+        instead of on the first request. Override it to boot anything else a worker needs.
+        """
+        data_source = inject.instance(DataSources)
+        for source in list(data_source.sources.values()):
+            if callable(getattr(source, "check_fork", None)):
+                source.check_fork()
+        data_source.build_all()
+
     def setup_injection(self):
         logger.debug("Start Injection.")
         inject.configure_once(self.config_inject)
 
+        providers = inject.instance(DependencyProviders)
+        if self.get_setting(SETTINGS_WARM_UP_DEPENDENCIES_KEY, False):
+            providers.start_warm_up()
+        if self.get_setting(SETTINGS_REPORT_UNUSED_DEPENDENCIES_KEY, False):
+            atexit.register(providers.report_unused)
+        if self.get_setting(SETTINGS_BOOT_SOURCES_AFTER_FORK_KEY, False) and hasattr(os, "register_at_fork"):
+            os.register_at_fork(after_in_child=self.after_fork)
+
 
 class BootApp(BaseBootApp):
     def __init__(self, app: FastAPI, router: APIRouter) -> None:
         super().__init__()
-        self.add_exception_handlers(app=app)
-        self.setup_middlewares(app=app)
-        self.get_data_source()
-        self.register_routers(app=app, router=router)
+        with self.timed("metrics"):
+            self.setup_metrics()
+        with self.timed("exception_handlers"):
+            self.add_exception_handlers(app=app)
+        with self.timed("middlewares"):
+            self.setup_middlewares(app=app)
+        with self.timed("routers"):
+            self.register_routers(app=app, router=router)
+        self.report_boot_timings()
+
+    def setup_metrics(self) -> None:
+        # Services run with a no-op backend unless metrics are enabled.
+        if self.get_setting(SETTINGS_METRICS_KEY, False):
+            set_service_metrics(ServiceMetrics())
 
     def setup_middlewares(self, app: FastAPI) -> FastAPI:
-        pass
+        # Innermost, so a request over its query budget fails before the unit of work commits.
+        self.setup_query_profiler(app=app)
+        if self.get_setting(SETTINGS_UNIT_OF_WORK_KEY, False):
+            app.add_middleware(UnitOfWorkMiddleware)
+        app.add_middleware(LoaderMiddleware)
+        app.add_middleware(PrimaryPinMiddleware)
+        if self.get_setting(SETTINGS_CONDITIONAL_GET_KEY, False):
+            app.add_middleware(ConditionalGetMiddleware)
+        return app
+
+    def setup_query_profiler(self, app: FastAPI) -> None:
+        profiler_kwargs = self.get_setting(SETTINGS_QUERY_PROFILER_KEY, None)
+        if profiler_kwargs is None:
+            return
+
+        profiler = QueryProfiler(**profiler_kwargs)
+
+        def attach(name: str, source) -> None:
+            for engine in get_engines(source):
+                profiler.attach(engine)
+
+        # Sources are built on first use, the profiler attaches to each one as it comes up.
+        inject.instance(DataSources).watch(attach)
+        app.add_middleware(QueryProfilerMiddleware, profiler=profiler)
 
     def add_exception_handlers(self, app: FastAPI):
         app.add_exception_handler(ValidationException, exception_validation_handler)
@@ -184,13 +344,25 @@ class BootApp(BaseBootApp):
         app.add_exception_handler(Exception, exception_generic_handler)
         app.add_exception_handler(HTTPException, exception_http_handler)
         app.add_exception_handler(ValidationError, exception_pydantic_validation_error)
+        app.add_exception_handler(OverloadedException, exception_overloaded_handler)
+        app.add_exception_handler(NotModifiedException, exception_not_modified_handler)
 
     def register_routers(self, app: FastAPI, router: APIRouter) -> None:
         app.include_router(router, prefix="/api/v1")
+        if self.get_setting(SETTINGS_DEBUG_ENDPOINTS_KEY, False):
+            app.include_router(debug_router)
+        if self.get_setting(SETTINGS_METRICS_KEY, False):
+            app.include_router(metrics_router)
 
 
 def create_app(router: APIRouter, boot_app_class: BootApp = None, root_path: str = None):
-    app = FastAPI(docs_url=DOCS_PATH, openapi_url=DOCS_URL, root_path=root_path or "/")
+    app = FastAPI(
+        docs_url=DOCS_PATH,
+        openapi_url=DOCS_URL,
+        root_path=root_path or "/",
+        default_response_class=ApiJSONResponse,
+    )
     boot_class = boot_app_class or BootApp
-    boot_class(app, router)
+    # Kept for the server hooks, e.g. `app.state.boot_app.after_fork()` from a pre-forking server `post_fork`.
+    app.state.boot_app = boot_class(app, router)
     return app
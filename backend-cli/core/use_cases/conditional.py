@@ -0,0 +1,92 @@
+import hashlib
+from contextvars import ContextVar
+from datetime import datetime
+from datetime import timezone
+from email.utils import format_datetime
+from email.utils import parsedate_to_datetime
+
+from core.domain.exceptions import NotModifiedException
+from core.domain.models import DataVersion
+from core.domain.repositories import ISourceRepository
+
+
+class ConditionalRequest:
+    """Validators sent by the client in a GET request and the ones computed for its response."""
+
+    def __init__(self, if_none_match: str | None = None, if_modified_since: str | None = None) -> None:
+        self.if_none_match = [tag.strip() for tag in if_none_match.split(",")] if if_none_match else []
+        self.if_modified_since = parse_http_date(if_modified_since)
+        self.etag: str | None = None
+        self.last_modified: datetime | None = None
+
+    def headers(self) -> list[tuple[bytes, bytes]]:
+        headers = []
+        if self.etag is not None:
+            headers.append((b"etag", self.etag.encode()))
+        if self.last_modified is not None:
+            headers.append((b"last-modified", format_datetime(self.last_modified, usegmt=True).encode()))
+        return headers
+
+    def matches(self, etag: str) -> bool:
+        # GET uses the weak comparison, only the opaque part of the tags is compared.
+        opaque = etag.removeprefix("W/")
+        return any(tag == "*" or tag.removeprefix("W/") == opaque for tag in self.if_none_match)
+
+    def is_not_modified(self) -> bool:
+        if self.if_none_match:
+            return self.etag is not None and self.matches(self.etag)
+        if self.if_modified_since is not None and self.last_modified is not None:
+            # HTTP dates drop the microseconds, a change later in the same second must not look older.
+            return self.last_modified <= self.if_modified_since
+        return False
+
+
+# Set up for GET requests by `ConditionalGetMiddleware`.
+current_conditional_request: ContextVar[ConditionalRequest | None] = ContextVar(
+    "current_conditional_request", default=None
+)
+
+
+def parse_http_date(value: str | None) -> datetime | None:
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def build_etag(version: DataVersion, scope: str) -> str:
+    digest = hashlib.sha1(f"{scope}|{version.count}|{version.digest or ''}".encode()).hexdigest()
+    return f'W/"{digest}"'
+
+
+async def check_not_modified(
+    repository: ISourceRepository,
+    scope: str,
+    filter_schema=None,
+    entity_id: str | None = None,
+) -> None:
+    """Raise `NotModifiedException` when the client already has the current rows, before loading any of them.
+
+    The ETag hashes the ids and row versions of every filtered row. Lists are only validated with it: a deleted row
+    doesn't move `max(updated_at)`, so `Last-Modified` is only given for single entities.
+    """
+    conditional = current_conditional_request.get()
+    if conditional is None:
+        return
+
+    if entity_id is not None:
+        version = await repository.get_version_by_ids(entity_ids=[entity_id])
+    else:
+        version = await repository.get_version(filter_schema=filter_schema)
+    if version is None:
+        return
+
+    conditional.etag = build_etag(version, scope=scope)
+    if entity_id is not None and version.last_modified is not None:
+        conditional.last_modified = version.last_modified.replace(tzinfo=version.last_modified.tzinfo or timezone.utc)
+
+    if version.count and conditional.is_not_modified():
+        raise NotModifiedException()
@@ -1,34 +1,77 @@
 import asyncio
 import logging
+import time
 from abc import ABC
 from abc import abstractmethod
 from typing import Any
+from typing import AsyncIterator
+from uuid import UUID
 
+from core.domain.exceptions import NotModifiedException
+from core.domain.exceptions import OverloadedException
 from core.domain.exceptions import ValidationException
 from core.domain.filters import BaseSchemaFilter
 from core.domain.models import PageResult, BaseEntity, BaseChangeRequest
 from core.domain.repositories import ISourceRepository
+from core.domain.repositories import current_unit_of_work
+from core.domain.rules import BaseBatchRule
 from core.domain.rules import BaseRule
+from core.domain.rules import RowFail
+from core.use_cases import instrumentation
+from core.use_cases.conditional import check_not_modified
+from core.use_cases.loaders import get_loader
 
 logger = logging.getLogger(__name__)
 
 
 class BaseService(ABC):
     async def run(self, *args, **kwargs) -> Any:
-        await self.pre_execute(*args, **kwargs)
+        unit_of_work = current_unit_of_work.get()
+        if unit_of_work is None or not unit_of_work.active:
+            return await self.run_steps(*args, **kwargs)
 
+        async with unit_of_work.nested():
+            return await self.run_steps(*args, **kwargs)
+
+    async def run_steps(self, *args, **kwargs) -> Any:
+        timer = instrumentation.service_metrics.start(type(self).__name__)
         try:
-            result = await self.execute(*args, **kwargs)
+            await self.pre_execute(*args, **kwargs)
+            timer.lap("pre_execute")
+
+            try:
+                result = await self.execute(*args, **kwargs)
+            except (ValidationException, NotModifiedException):
+                timer.lap("execute")
+                raise
+            except OverloadedException as error:
+                timer.lap("execute")
+                # Expected under load, a traceback per rejected request would flood the logs.
+                logger.warning(f"Service overloaded: {error}")
+                raise
+            except Exception as error:  # noqa
+                timer.lap("execute")
+                logger.exception(f"Service exception: {error}")
+                raise
+            else:
+                timer.lap("execute")
+                kwargs["result"] = result
+                await self.post_execute(*args, **kwargs)
+                timer.lap("post_execute")
+            finally:
+                await self.finally_execute(*args, **kwargs)
+                timer.lap("finally_execute")
+        except NotModifiedException:
+            # Answering with 304 is a successful run.
+            raise
         except ValidationException:
+            timer.fail(instrumentation.VALIDATION_ERROR)
             raise
-        except Exception as error:  # noqa
-            logger.exception(f"Service exception: {error}")
+        except Exception:  # noqa
+            timer.fail(instrumentation.SERVICE_ERROR)
             raise
-        else:
-            kwargs["result"] = result
-            await self.post_execute(*args, **kwargs)
         finally:
-            await self.finally_execute(*args, **kwargs)
+            timer.stop()
 
         return result
 
@@ -51,6 +94,8 @@ class BaseValidationService(BaseService):
     main_message = "Validation Fails"
     raise_exception = True  # Set True to raise exception is its any fail, otherwise return a bool.
     raise_first = False  # Set true to raise exception at first fail.
+    max_concurrency = 10  # Rules running at the same time, set 1 to run them one after another.
+    rule_timings: list[tuple[BaseRule, float]]  # Seconds taken by each finished rule in the last run.
 
     @abstractmethod
     async def get_rules(self, *args, **kwargs) -> list[BaseRule]:
@@ -61,13 +106,7 @@ class BaseValidationService(BaseService):
         return self.main_message
 
     async def execute(self, *args, **kwargs) -> bool:
-        fail_rules = []
-
-        for rule in await self.get_rules(*args, **kwargs):
-            valid = await rule.execute()
-            if valid:
-                continue
-            fail_rules.append(rule)
+        fail_rules = await self.execute_rules(await self.get_rules(*args, **kwargs))
 
         if not fail_rules:
             return True
@@ -77,6 +116,76 @@ class BaseValidationService(BaseService):
 
         raise ValidationException(message=self.message, fail_rules=fail_rules)
 
+    async def execute_rules(self, rules: list[BaseRule]) -> list[BaseRule]:
+        """Run the rules concurrently and return the failed ones in their original order.
+
+        With `raise_first` the rules still running are cancelled as soon as one fails.
+        """
+        self.rule_timings = []
+        await self.prefetch_rules(rules)
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+
+        async def execute_rule(rule: BaseRule) -> bool:
+            async with semaphore:
+                started_at = time.perf_counter()
+                valid = await rule.execute()
+                self.rule_timings.append((rule, time.perf_counter() - started_at))
+                return valid
+
+        tasks = {asyncio.ensure_future(execute_rule(rule)): index for index, rule in enumerate(rules)}
+        pending, fail_rules = set(tasks), {}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if not task.result():
+                        fail_rules[tasks[task]] = rules[tasks[task]]
+                if fail_rules and self.raise_first:
+                    break
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.wait(pending)
+
+        for rule, elapsed in self.rule_timings:
+            logger.debug(f"Rule {type(rule).__name__} ({rule.key}) took {elapsed:.6f}s.")
+        return [fail_rules[index] for index in sorted(fail_rules)]
+
+    @staticmethod
+    async def prefetch_rules(rules: list[BaseRule]) -> None:
+        groups = {}
+        for rule in rules:
+            prefetch = type(rule).prefetch.__func__
+            if prefetch is not BaseRule.prefetch.__func__:
+                groups.setdefault(prefetch, []).append(rule)
+
+        for group in groups.values():
+            await type(group[0]).prefetch(group)
+
+
+class BaseBatchValidationService(BaseService):
+    main_message = "Validation Fails"
+    raise_exception = True  # Set True to raise exception is its any fail, otherwise return the fails.
+
+    @abstractmethod
+    async def get_rules(self, *args, **kwargs) -> list[BaseBatchRule]:
+        return []
+
+    @property
+    def message(self) -> str:
+        return self.main_message
+
+    async def execute(self, *args, **kwargs) -> list[RowFail]:
+        fails = []
+        for rule in await self.get_rules(*args, **kwargs):
+            fails.extend(rule.to_fails(await rule.execute()))
+        fails.sort(key=lambda fail: fail.row)
+
+        if fails and self.raise_exception:
+            raise ValidationException(message=self.message, fail_rules=fails)
+        return fails
+
 
 class BaseValidateMixinService(BaseService):
     validation_class: BaseValidationService | None = None
@@ -94,23 +203,60 @@ class BaseValidateMixinService(BaseService):
 
 class BaseListMixinService(BaseValidateMixinService, BaseService):
     repo_instance: ISourceRepository
+    batch_by_id = False  # Set True to batch concurrent lookups filtered only by `entity_id` into one query.
+    conditional = False  # Set True to answer conditional GETs with 304 when the filtered rows didn't change.
 
     async def execute(self, filter_schema: BaseSchemaFilter, *args, **kwargs) -> list[BaseEntity]:
+        if self.conditional:
+            scope = f"{type(self).__name__}:{filter_schema.model_dump_json()}"
+            await check_not_modified(self.repo_instance, scope=scope, filter_schema=filter_schema)
+
+        filters = filter_schema.filters_as_dict
+        if self.batch_by_id and filters.keys() == {"entity_id"} and isinstance(filters["entity_id"], (str, UUID)):
+            entity = await get_loader(self.repo_instance).load(filters["entity_id"])
+            return [entity] if entity is not None else []
+
         return await self.repo_instance.find(filter_schema=filter_schema)
 
 
+class BaseRetrieveMixinService(BaseValidateMixinService, BaseService):
+    repo_instance: ISourceRepository
+    conditional = False  # Set True to answer conditional GETs with 304 when the entity didn't change.
+
+    async def execute(self, entity_id: str, *args, **kwargs) -> BaseEntity | None:
+        if self.conditional:
+            scope = f"{type(self).__name__}:{entity_id}"
+            await check_not_modified(self.repo_instance, scope=scope, entity_id=entity_id)
+
+        return await get_loader(self.repo_instance).load(entity_id)
+
+
 class BaseListPaginationMixinService(BaseValidateMixinService, BaseService):
     repo_instance: ISourceRepository
+    keyset_pagination = False  # Set True to paginate with `batch_token` instead of page offsets.
+    with_total = True  # Set False to skip counting and only report `has_next`.
+    conditional = False  # Set True to answer conditional GETs with 304 when the filtered rows didn't change.
 
     async def execute(
         self,
         filter_schema: BaseSchemaFilter,
     ) -> PageResult[BaseEntity]:
-        result_count, result_items = await asyncio.gather(
-            self.repo_instance.count(filter_schema=filter_schema), self.repo_instance.find(filter_schema=filter_schema)
-        )
+        if self.conditional:
+            scope = f"{type(self).__name__}:{filter_schema.model_dump_json()}"
+            await check_not_modified(self.repo_instance, scope=scope, filter_schema=filter_schema)
+
+        if self.keyset_pagination:
+            return await self.repo_instance.find_batch(filter_schema=filter_schema)
+
+        return await self.repo_instance.find_page(filter_schema=filter_schema, with_total=self.with_total)
 
-        return PageResult(items=result_items, total=result_count)
+
+class BaseStreamMixinService(BaseValidateMixinService, BaseService):
+    repo_instance: ISourceRepository
+    chunk_size: int | None = None  # Rows fetched per round trip, defaults to the repository value.
+
+    async def execute(self, filter_schema: BaseSchemaFilter, *args, **kwargs) -> AsyncIterator[BaseEntity]:
+        return self.repo_instance.stream(filter_schema=filter_schema, chunk_size=self.chunk_size)
 
 
 class BaseCreateMixinService(BaseValidateMixinService, BaseService):
@@ -122,7 +268,10 @@ class BaseCreateMixinService(BaseValidateMixinService, BaseService):
         *args,
         **kwargs,
     ) -> BaseEntity:
-        return await self.repo_instance.create(entity=entity)
+        created = await self.repo_instance.create(entity=entity)
+        if created is not None:
+            get_loader(self.repo_instance).prime(created)
+        return created
 
 
 class BaseUpdateMixinService(BaseValidateMixinService, BaseService):
@@ -135,4 +284,7 @@ class BaseUpdateMixinService(BaseValidateMixinService, BaseService):
         *args,
         **kwargs,
     ) -> BaseEntity:
-        return await self.repo_instance.update_one(entity=entity, change_request=change_request)
\ No newline at end of file
+        try:
+            return await self.repo_instance.update_one(entity=entity, change_request=change_request)
+        finally:
+            get_loader(self.repo_instance).clear(entity.entity_id)
\ No newline at end of file
@@ -0,0 +1,60 @@
+from abc import ABC
+from abc import abstractmethod
+
+VALIDATION_ERROR = "validation"
+SERVICE_ERROR = "error"
+
+
+class IServiceTimer(ABC):
+    @abstractmethod
+    def lap(self, phase: str) -> None:
+        """Record the time since the previous lap, or since the start, as the duration of `phase`."""
+        raise NotImplementedError()
+
+    @abstractmethod
+    def fail(self, kind: str) -> None:
+        raise NotImplementedError()
+
+    @abstractmethod
+    def stop(self) -> None:
+        raise NotImplementedError()
+
+
+class IServiceMetrics(ABC):
+    enabled = True
+
+    @abstractmethod
+    def start(self, service: str) -> IServiceTimer:
+        """Timer of one `BaseService.run` call, the service counts as in flight until `stop`."""
+        raise NotImplementedError()
+
+
+class NoopServiceTimer(IServiceTimer):
+    def lap(self, phase: str) -> None:
+        pass
+
+    def fail(self, kind: str) -> None:
+        pass
+
+    def stop(self) -> None:
+        pass
+
+
+class NoopServiceMetrics(IServiceMetrics):
+    enabled = False
+    timer = NoopServiceTimer()
+
+    def start(self, service: str) -> IServiceTimer:
+        return self.timer
+
+
+service_metrics: IServiceMetrics = NoopServiceMetrics()
+
+
+def get_service_metrics() -> IServiceMetrics:
+    return service_metrics
+
+
+def set_service_metrics(metrics: IServiceMetrics) -> None:
+    global service_metrics
+    service_metrics = metrics
@@ -0,0 +1,96 @@
+import asyncio
+import logging
+from contextvars import ContextVar
+from typing import Iterable
+
+from core.domain.models import BaseEntity
+from core.domain.repositories import ISourceRepository
+from core.domain.repositories import track_errors
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH_SIZE = 500
+
+# Loaders of the current request by repository, set up by `LoaderMiddleware`.
+request_loaders: ContextVar[dict | None] = ContextVar("request_loaders", default=None)
+
+
+class EntityLoader:
+    """Batch `load(entity_id)` calls made in the same event loop iteration into one `find_by_ids` query.
+
+    Results, including misses, are cached for the life of the loader, failed lookups aren't. The create and update
+    services keep the loader of their repository up to date, use `prime` or `clear` after other writes.
+    """
+
+    def __init__(self, repository: ISourceRepository, max_batch_size: int = DEFAULT_MAX_BATCH_SIZE) -> None:
+        self.repository = repository
+        self.max_batch_size = max_batch_size
+        self.futures: dict[str, asyncio.Future] = {}
+        self.pending: list[str] = []
+        self.tasks: set[asyncio.Task] = set()
+
+    def load(self, entity_id: str) -> "asyncio.Future[BaseEntity | None]":
+        key = str(entity_id)
+        future = self.futures.get(key)
+        if future is None:
+            loop = asyncio.get_running_loop()
+            future = self.futures[key] = loop.create_future()
+            if not self.pending:
+                # Runs after every coroutine already scheduled in this iteration had the chance to call `load`.
+                loop.call_soon(self.dispatch)
+            self.pending.append(key)
+        return future
+
+    async def load_many(self, entity_ids: Iterable[str]) -> list[BaseEntity | None]:
+        return list(await asyncio.gather(*[self.load(entity_id) for entity_id in entity_ids]))
+
+    def prime(self, entity: BaseEntity) -> None:
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(entity)
+        self.futures[str(entity.entity_id)] = future
+
+    def clear(self, entity_id: str | None = None) -> None:
+        if entity_id is None:
+            self.futures = {key: future for key, future in self.futures.items() if not future.done()}
+        elif self.futures.get(str(entity_id)) is not None and self.futures[str(entity_id)].done():
+            del self.futures[str(entity_id)]
+
+    def dispatch(self) -> None:
+        keys, self.pending = self.pending, []
+        for start in range(0, len(keys), self.max_batch_size):
+            task = asyncio.ensure_future(self.fetch(keys[start:start + self.max_batch_size]))
+            self.tasks.add(task)
+            task.add_done_callback(self.tasks.discard)
+
+    async def fetch(self, keys: list[str]) -> None:
+        try:
+            with track_errors() as errors:
+                entities = await self.repository.find_by_ids(entity_ids=keys)
+            if errors:
+                # The repository swallowed the error, its empty result would be cached as misses.
+                raise errors[0]
+        except Exception as error:
+            logger.exception(f"Failed loading entities: {error}")
+            for key in keys:
+                future = self.futures.pop(key, None)
+                if future is not None and not future.done():
+                    future.set_exception(error)
+            return
+
+        found = {str(entity.entity_id): entity for entity in entities}
+        for key in keys:
+            future = self.futures.get(key)
+            if future is not None and not future.done():
+                future.set_result(found.get(key))
+
+
+def get_loader(repository: ISourceRepository) -> EntityLoader:
+    """Loader of `repository` for the current request, a new one on every call outside of a request."""
+    loaders = request_loaders.get()
+    if loaders is None:
+        return EntityLoader(repository=repository)
+
+    loader = loaders.get(id(repository))
+    if loader is None:
+        loader = loaders[id(repository)] = EntityLoader(repository=repository)
+    return loader
@@ -0,0 +1,92 @@
+import os
+
+import pytest
+from sqlalchemy.engine import make_url
+from sqlalchemy_filterset import Filter
+from sqlalchemy_filterset import LimitOffsetFilter
+from sqlalchemy_filterset import OrderingField
+from sqlalchemy_filterset import OrderingFilter
+
+from core.domain.filters import BaseSchemaFilter
+from core.domain.models import BaseChangeRequest
+from core.domain.models import BaseEntity
+from core.domain.repositories import DataSources
+from core.infrastructure.orm.database import AsyncDbConnection
+from core.infrastructure.orm.database import DbConnection
+from core.infrastructure.orm.repositories import DB_CONNECTION_NAME
+from core.infrastructure.orm.repositories import BaseFilterSet
+from core.infrastructure.orm.repositories import create_generic_source_repository
+from db_declarative.sqalchemy.infrastructure.orm.tables import DummyTable
+
+# A PostgreSQL URL, e.g. postgresql+psycopg2://postgres@localhost/postgres, the tables of the tests are dropped.
+TEST_DATABASE_URL_ENV = "TEST_DATABASE_URL"
+ASYNC_DRIVER = "postgresql+asyncpg"
+ASYNC_DRIVERS = {"asyncpg", "aiosqlite", "psycopg_async"}
+
+
+class Dummy(BaseEntity):
+    name_object: str | None = None
+    phone: str | None = None
+    object_count: int | None = None
+
+
+class DummyChange(BaseChangeRequest):
+    name_object: str | None = None
+    object_count: int | None = None
+
+
+class DummyFilter(BaseSchemaFilter):
+    entity_id: str | None = None
+    name_object: str | None = None
+
+
+class DummyFilterSet(BaseFilterSet):
+    entity_id = Filter(DummyTable.entity_id)
+    name_object = Filter(DummyTable.name_object)
+    ordering = OrderingFilter(
+        name_object=OrderingField(DummyTable.name_object),
+        object_count=OrderingField(DummyTable.object_count),
+    )
+    pagination = LimitOffsetFilter()
+
+
+def create_connection(database_url: str, **engine_kwargs):
+    is_async = make_url(database_url).get_driver_name() in ASYNC_DRIVERS
+    connection_class = AsyncDbConnection if is_async else DbConnection
+    return connection_class(database_url, **engine_kwargs)
+
+
+def create_data_source(connection) -> DataSources:
+    return DataSources({DB_CONNECTION_NAME: connection})
+
+
+def create_repository(data_source: DataSources):
+    return create_generic_source_repository(
+        data_source=data_source,
+        domain_class=Dummy,
+        table_class=DummyTable,
+        filterset_class=DummyFilterSet,
+    )
+
+
+async def reset_table(connection) -> None:
+    if isinstance(connection, AsyncDbConnection):
+        async with connection.engine.begin() as db_connection:
+            await db_connection.run_sync(DummyTable.metadata.drop_all)
+            await db_connection.run_sync(DummyTable.metadata.create_all)
+        return
+
+    DummyTable.metadata.drop_all(connection.engine)
+    DummyTable.metadata.create_all(connection.engine)
+
+
+@pytest.fixture(params=["sync", "async"])
+def database_url(request) -> str:
+    """The test database with a sync and an async driver, tests using it are skipped without one."""
+    database_url = os.environ.get(TEST_DATABASE_URL_ENV)
+    if not database_url:
+        pytest.skip(f"{TEST_DATABASE_URL_ENV} isn't set.")
+
+    if request.param == "async":
+        return make_url(database_url).set(drivername=ASYNC_DRIVER).render_as_string(hide_password=False)
+    return database_url
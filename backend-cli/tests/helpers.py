@@ -0,0 +1,114 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.engine import IteratorResult
+from sqlalchemy.engine.result import SimpleResultMetaData
+
+from core.infrastructure.orm.database import AsyncDbConnection
+from core.infrastructure.orm.database import DbConnection
+from tests.conftest import create_connection
+from tests.conftest import create_data_source
+from tests.conftest import create_repository
+from tests.conftest import reset_table
+
+
+@asynccontextmanager
+async def open_repository(database_url: str, **engine_kwargs):
+    """A repository on an emptied dummy table, its engine is disposed on exit."""
+    connection = create_connection(database_url, **engine_kwargs)
+    await reset_table(connection)
+    try:
+        yield create_repository(create_data_source(connection))
+    finally:
+        if isinstance(connection, AsyncDbConnection):
+            await connection.engine.dispose()
+        else:
+            connection.engine.dispose()
+
+
+def offline_repository(answer=None) -> tuple:
+    """A repository answering its queries with the rows of `answer(query, params)` instead of a database.
+
+    Returns the repository and the SQL of its queries compiled for PostgreSQL. Savepoints are skipped and streamed
+    queries are answered like the others, so no connection is ever opened.
+    """
+    repository = create_repository(create_data_source(DbConnection("postgresql+psycopg2://offline/offline")))
+    statements = []
+
+    async def execute_query(session, query, params=None):
+        statements.append(str(query.compile(dialect=postgresql.dialect())))
+        rows = answer(query, params) if answer else []
+        keys = list(rows[0]) if rows else []
+        return IteratorResult(SimpleResultMetaData(keys), iter([tuple(row.values()) for row in rows]))
+
+    async def stream_partitions(session, query, chunk_size, params=None):
+        result = await execute_query(session, query, params)
+        for partition in repository.shape_result(result).partitions(chunk_size):
+            yield partition
+
+    @asynccontextmanager
+    async def savepoint(session):
+        yield
+
+    repository.execute_query = execute_query
+    repository.stream_partitions = stream_partitions
+    repository.savepoint = savepoint
+    return repository, statements
+
+
+def count_queries(repository, fail: bool = False) -> list:
+    """Record the queries run by `repository`, failing them all with `fail`."""
+    queries = []
+    execute_query = repository.execute_query
+
+    async def recording_execute_query(session, query, params=None):
+        queries.append(query)
+        if fail:
+            raise RuntimeError("Database is gone.")
+        return await execute_query(session, query, params)
+
+    repository.execute_query = recording_execute_query
+    return queries
+
+
+async def call_app(app, method: str, path: str, headers: dict | None = None) -> tuple[int, dict, bytes]:
+    """Run one request through an ASGI app, returning its status, headers and body."""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(key.lower().encode(), value.encode()) for key, value in (headers or {}).items()],
+        "client": ("127.0.0.1", 0),
+        "server": ("test", 80),
+    }
+    response = {"status": None, "headers": {}, "body": b""}
+    requested = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        # Streaming responses listen for the client going away, it only does once the response is over.
+        await finished.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = {key.decode(): value.decode() for key, value in message.get("headers", [])}
+        elif message["type"] == "http.response.body":
+            response["body"] += message.get("body", b"")
+            if not message.get("more_body", False):
+                finished.set()
+
+    await app(scope, receive, send)
+    return response["status"], response["headers"], response["body"]
@@ -0,0 +1,89 @@
+import asyncio
+import logging
+
+import pytest
+from fastapi import FastAPI
+
+from core.domain.exceptions import OverloadedException
+from core.infrastructure.orm.admission import AdmissionController
+from core.infrastructure.setup_app import exception_overloaded_handler
+from core.use_cases.core_use_cases import BaseService
+from tests.helpers import call_app
+
+
+async def hold(admission: AdmissionController, release: asyncio.Event) -> None:
+    async with admission.admit():
+        await release.wait()
+
+
+def test_full_queue_is_rejected_right_away():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=1, max_queue=1)
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(admission, release))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(hold(admission, release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(OverloadedException):
+            await admission.acquire()
+
+        release.set()
+        await asyncio.gather(holder, waiter)
+        assert (admission.admitted, admission.rejected, admission.in_flight) == (2, 1, 0)
+
+    asyncio.run(scenario())
+
+
+def test_waiters_past_the_deadline_are_rejected():
+    async def scenario():
+        admission = AdmissionController(max_concurrency=1, deadline_seconds=0.01)
+        release = asyncio.Event()
+        holder = asyncio.create_task(hold(admission, release))
+        await asyncio.sleep(0)
+
+        with pytest.raises(OverloadedException):
+            await admission.acquire()
+        assert admission.waiting == 0
+
+        release.set()
+        await holder
+        # Slots held well past the deadline make the expected wait alone reject the next waiter.
+        admission.hold_seconds = 1.0
+        holder = asyncio.create_task(hold(admission, asyncio.Event()))
+        await asyncio.sleep(0)
+        with pytest.raises(OverloadedException) as error:
+            await admission.acquire()
+        assert error.value.retry_after == 1.0
+        holder.cancel()
+        await asyncio.gather(holder, return_exceptions=True)
+
+    asyncio.run(scenario())
+
+
+def test_overload_is_answered_with_503_and_retry_after():
+    async def scenario():
+        app = FastAPI()
+        app.add_exception_handler(OverloadedException, exception_overloaded_handler)
+
+        @app.get("/dummies")
+        async def list_dummies():
+            raise OverloadedException("The service is overloaded.", retry_after=2.2)
+
+        status, headers, _ = await call_app(app, "GET", "/dummies")
+        assert status == 503
+        assert headers["retry-after"] == "3"
+
+    asyncio.run(scenario())
+
+
+def test_services_log_rejections_without_a_traceback(caplog):
+    class RejectedService(BaseService):
+        async def execute(self):
+            raise AdmissionController(max_concurrency=1).reject("no free session")
+
+    with pytest.raises(OverloadedException):
+        asyncio.run(RejectedService().run())
+
+    service_records = [record for record in caplog.records if record.name == "core.use_cases.core_use_cases"]
+    assert [(record.levelno, record.exc_info) for record in service_records] == [(logging.WARNING, None)]
@@ -0,0 +1,138 @@
+import logging
+import os
+from types import SimpleNamespace
+
+import inject
+import pytest
+
+from core.domain.repositories import DataSources
+from core.infrastructure.dependencies import DependencyProviders
+from core.infrastructure.orm.database import AsyncDbConnection
+from core.infrastructure.orm.database import DbConnection
+from core.infrastructure.orm.database import check_connections_after_fork
+from core.infrastructure.setup_app import SETTINGS_BOOT_TIMINGS_KEY
+from core.infrastructure.setup_app import SETTINGS_DEPENDENCIES_KEY
+from core.infrastructure.setup_app import BaseBootApp
+
+
+class IClock:
+    pass
+
+
+class IMailer:
+    pass
+
+
+class Clock(IClock):
+    built = 0
+
+    def __init__(self, data_source) -> None:
+        type(self).built += 1
+
+
+class BrokenMailer(IMailer):
+    def __init__(self, data_source) -> None:
+        raise RuntimeError("No mail server.")
+
+
+def build_boot_app(settings: dict) -> BaseBootApp:
+    boot_app = BaseBootApp.__new__(BaseBootApp)
+    boot_app.settings_values = dict(settings)
+    boot_app.lib_settings = [SimpleNamespace(**settings)]
+    boot_app.boot_timings = []
+    return boot_app
+
+
+def test_boot_timings_are_logged(caplog, capsys):
+    boot_app = BaseBootApp.__new__(BaseBootApp)
+    boot_app.settings_values = {SETTINGS_BOOT_TIMINGS_KEY: True}
+    boot_app.boot_timings = [("settings", 0.002), ("routers", 0.001)]
+
+    with caplog.at_level(logging.INFO, logger="core.infrastructure.setup_app"):
+        boot_app.report_boot_timings()
+
+    assert "Boot finished in 3.0ms" in caplog.text
+    assert "routers" in caplog.text
+    assert capsys.readouterr().out == ""
+
+
+def test_dependencies_are_built_on_their_first_injection(caplog):
+    Clock.built = 0
+    boot_app = build_boot_app({SETTINGS_DEPENDENCIES_KEY: {IClock: Clock, IMailer: BrokenMailer}})
+    inject.clear_and_configure(boot_app.config_inject)
+    try:
+        assert Clock.built == 0
+        clock = inject.instance(IClock)
+        assert inject.instance(IClock) is clock
+        assert Clock.built == 1
+
+        providers = inject.instance(DependencyProviders)
+        with caplog.at_level(logging.WARNING, logger="core.infrastructure.dependencies"):
+            providers.report_unused()
+    finally:
+        inject.clear()
+
+    assert providers.unused() == ["IMailer"]
+    assert "Dependencies never injected: IMailer" in caplog.text
+
+
+def test_warm_up_builds_ahead_without_counting_as_used(caplog):
+    Clock.built = 0
+    boot_app = build_boot_app({SETTINGS_DEPENDENCIES_KEY: {IClock: Clock, IMailer: BrokenMailer}})
+    inject.clear_and_configure(boot_app.config_inject)
+    try:
+        providers = inject.instance(DependencyProviders)
+        with caplog.at_level(logging.ERROR, logger="core.infrastructure.dependencies"):
+            providers.start_warm_up().join()
+        clock = inject.instance(IClock)
+    finally:
+        inject.clear()
+
+    assert "Failed warming up IMailer: No mail server." in caplog.text
+    assert Clock.built == 1
+    assert isinstance(clock, Clock)
+    assert providers.stats() == {"IClock": {"built": True, "used": True}, "IMailer": {"built": False, "used": False}}
+
+
+def test_connections_inherited_from_the_parent_get_a_new_pool():
+    connection = DbConnection("postgresql+psycopg2://offline/offline")
+    async_connection = AsyncDbConnection("postgresql+asyncpg://offline/offline")
+    pools = connection.engine.pool, async_connection.engine.sync_engine.pool
+    # As seen from a forked child, the connections were built by another process.
+    connection.pid = async_connection.pid = -1
+
+    check_connections_after_fork()
+
+    assert (connection.pid, async_connection.pid) == (os.getpid(), os.getpid())
+    assert connection.engine.pool is not pools[0]
+    assert async_connection.engine.sync_engine.pool is not pools[1]
+
+
+def test_after_fork_checks_the_built_sources_and_builds_the_others():
+    connection = DbConnection("postgresql+psycopg2://offline/offline")
+    pool = connection.engine.pool
+    connection.pid = -1
+    data_source = DataSources({"primary": connection})
+    data_source.add_factory("settings", lambda: {"built": True})
+    inject.clear_and_configure(lambda binder: binder.bind(DataSources, data_source))
+    try:
+        build_boot_app({}).after_fork()
+    finally:
+        inject.clear()
+
+    assert connection.engine.pool is not pool
+    assert data_source.sources["settings"] == {"built": True}
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="Needs os.fork.")
+def test_forked_child_replaces_the_pool_before_using_it():
+    connection = DbConnection("postgresql+psycopg2://offline/offline")
+
+    child = os.fork()
+    if child == 0:
+        # The hook registered at fork already ran, a connection checks its own pid before every session.
+        os._exit(0 if connection.pid == os.getpid() else 1)
+
+    _, status = os.waitpid(child, 0)
+    assert os.waitstatus_to_exitcode(status) == 0
+    assert connection.pid == os.getpid()
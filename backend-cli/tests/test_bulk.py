@@ -0,0 +1,87 @@
+import asyncio
+import uuid
+from datetime import datetime
+
+from sqlalchemy import exc as orm_exceptions
+
+from core.infrastructure.orm.database import UNIQUE_VIOLATION_CODE
+from tests.conftest import Dummy
+from tests.helpers import offline_repository
+
+
+class UniqueViolation(Exception):
+    pgcode = UNIQUE_VIOLATION_CODE
+
+
+def build_dummies(*phones: str) -> list[Dummy]:
+    return [Dummy(entity_id=str(uuid.uuid4()), name_object="bulk", phone=phone) for phone in phones]
+
+
+def as_row(entity: Dummy) -> dict:
+    return {**entity.model_dump(), "entity_id": uuid.UUID(entity.entity_id), "updated_at": datetime(2024, 1, 1)}
+
+
+def test_create_many_writes_each_chunk_with_one_statement():
+    entities = build_dummies("a", "taken", "b", "c")
+
+    def answer(query, params):
+        # The database skips the conflicting row and only returns the inserted ones.
+        return [as_row(entity) for entity in entities if entity.phone != "taken"]
+
+    async def scenario():
+        repository, statements = offline_repository(answer)
+        return await repository.create_many(entities, chunk_size=10), statements
+
+    result, statements = asyncio.run(scenario())
+
+    assert len(statements) == 1
+    assert statements[0].startswith("INSERT INTO")
+    assert "ON CONFLICT DO NOTHING RETURNING" in statements[0]
+    assert [entity.phone for entity in result.items] == ["a", "b", "c"]
+    assert [(conflict.index, conflict.message) for conflict in result.conflicts] == [(1, "Duplicate entity.")]
+
+
+def test_upsert_many_updates_the_conflicting_rows_and_supersedes_repeated_keys():
+    entities = build_dummies("a", "b", "a")
+
+    def answer(query, params):
+        return [as_row(entity) for entity in entities[1:]]
+
+    async def scenario():
+        repository, statements = offline_repository(answer)
+        result = await repository.upsert_many(entities, conflict_fields=["phone"], update_fields=["name_object"])
+        return result, statements
+
+    result, statements = asyncio.run(scenario())
+
+    assert len(statements) == 1
+    assert "ON CONFLICT (phone) DO UPDATE SET name_object = excluded.name_object, updated_at = " in statements[0]
+    assert "RETURNING" in statements[0]
+    # A statement can't write the same row twice, the first "a" is reported instead of sent.
+    assert statements[0].count("%(phone_m") == 2
+    assert {entity.entity_id for entity in result.items} == {entities[1].entity_id, entities[2].entity_id}
+    assert [(conflict.index, conflict.message) for conflict in result.conflicts] == [
+        (0, "Superseded by a later row of the same batch.")
+    ]
+
+
+def test_failed_chunk_is_retried_row_by_row():
+    entities = build_dummies("a", "broken", "b")
+    calls = []
+
+    def answer(query, params):
+        phones = [value for key, value in query.compile().params.items() if key.startswith("phone")]
+        calls.append(phones)
+        if "broken" in phones:
+            raise orm_exceptions.IntegrityError("INSERT", {}, UniqueViolation())
+        return [as_row(entity) for entity in entities if entity.phone in phones]
+
+    async def scenario():
+        repository, _ = offline_repository(answer)
+        return await repository.create_many(entities, chunk_size=10)
+
+    result = asyncio.run(scenario())
+
+    assert calls == [["a", "broken", "b"], ["a"], ["broken"], ["b"]]
+    assert [entity.phone for entity in result.items] == ["a", "b"]
+    assert [(conflict.index, conflict.message) for conflict in result.conflicts] == [(1, "Duplicate entity.")]
@@ -0,0 +1,137 @@
+import asyncio
+import contextvars
+import json
+
+from core.infrastructure.cache import CachedSourceRepository
+from core.infrastructure.cache import InMemoryCacheBackend
+from core.infrastructure.cache import LocalCacheClient
+from core.infrastructure.cache import SharedCacheBackend
+from core.infrastructure.orm.unit_of_work import UnitOfWork
+from tests.conftest import Dummy
+from tests.conftest import DummyFilter
+from tests.helpers import count_queries
+from tests.helpers import open_repository
+
+
+class CountingRepository:
+    """Just what `CachedSourceRepository` reads from the repository it wraps."""
+
+    data_source = None
+    domain_class = Dummy
+
+    def __init__(self) -> None:
+        self.entities = [Dummy(entity_id="a", name_object="first", object_count=1)]
+        self.calls = 0
+
+    async def find(self, filter_schema):
+        self.calls += 1
+        return list(self.entities)
+
+
+def test_in_memory_invalidation_only_bumps_the_namespace_version():
+    async def scenario():
+        cache = InMemoryCacheBackend()
+        await cache.set("dummy", "key", b"value")
+        await cache.set("other", "key", b"value")
+
+        await cache.invalidate("dummy")
+        assert await cache.get("dummy", "key") is None
+        assert await cache.get("other", "key") == b"value"
+
+        await cache.set("dummy", "key", b"fresh")
+        assert await cache.get("dummy", "key") == b"fresh"
+
+    asyncio.run(scenario())
+
+
+def test_results_are_stored_as_json_of_the_domain_class():
+    async def scenario():
+        client = LocalCacheClient()
+        repository = CountingRepository()
+        cached = CachedSourceRepository(repository=repository, cache=SharedCacheBackend(client), namespace="dummy")
+
+        assert await cached.find(DummyFilter()) == repository.entities
+        (stored,) = [value for key, (_, value) in client.values.items() if not key.endswith(":version")]
+        assert json.loads(stored)[0]["name_object"] == "first"
+
+        entities = await cached.find(DummyFilter())
+        assert entities == repository.entities and isinstance(entities[0], Dummy)
+        assert repository.calls == 1
+
+        # An entry written by another shape of the entity is loaded again.
+        await cached.cache.set("dummy", cached.build_key("find", DummyFilter()), b'[{"object_count": "x"}]')
+        assert await cached.find(DummyFilter()) == repository.entities
+        assert repository.calls == 2
+
+    asyncio.run(scenario())
+
+
+def test_reads_are_cached_until_a_write(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            cached = CachedSourceRepository(repository=repository, cache=InMemoryCacheBackend())
+            await cached.create(Dummy(name_object="first"))
+            queries = count_queries(repository)
+
+            assert len(await cached.find(DummyFilter())) == 1
+            assert len(await cached.find(DummyFilter())) == 1
+            assert await cached.count(DummyFilter()) == 1
+            assert await cached.count(DummyFilter()) == 1
+            assert len(queries) == 2
+
+            await cached.create(Dummy(name_object="second"))
+            assert len(await cached.find(DummyFilter())) == 2
+
+    asyncio.run(scenario())
+
+
+def test_failed_reads_are_not_cached(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            cached = CachedSourceRepository(repository=repository, cache=InMemoryCacheBackend())
+            await cached.create(Dummy(name_object="first"))
+
+            execute_query = repository.execute_query
+            count_queries(repository, fail=True)
+            assert await cached.find(DummyFilter()) == []
+            assert await cached.count(DummyFilter()) == 0
+
+            repository.execute_query = execute_query
+            assert len(await cached.find(DummyFilter())) == 1
+            assert await cached.count(DummyFilter()) == 1
+
+    asyncio.run(scenario())
+
+
+def test_reads_inside_a_unit_of_work_are_not_cached(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            cached = CachedSourceRepository(repository=repository, cache=InMemoryCacheBackend())
+            queries = count_queries(repository)
+
+            async with UnitOfWork():
+                assert await cached.count(DummyFilter()) == 0
+            assert await cached.count(DummyFilter()) == 0
+            assert len(queries) == 2
+
+    asyncio.run(scenario())
+
+
+def test_write_invalidates_again_after_commit(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            cached = CachedSourceRepository(repository=repository, cache=InMemoryCacheBackend())
+
+            async def count_outside():
+                # Another request, it doesn't see the uncommitted row and caches the old count.
+                task = asyncio.create_task(cached.count(DummyFilter()), context=contextvars.Context())
+                return await task
+
+            async with UnitOfWork():
+                await cached.create(Dummy(name_object="first"))
+                assert await cached.count(DummyFilter()) == 1
+                assert await count_outside() == 0
+
+            assert await cached.count(DummyFilter()) == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,118 @@
+import asyncio
+
+from fastapi import FastAPI
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy.dialects import postgresql
+
+from core.api.middlewares import ConditionalGetMiddleware
+from core.domain.exceptions import NotModifiedException
+from core.infrastructure.orm.repositories import BaseSourceRepository
+from core.infrastructure.orm.unit_of_work import resolve
+from core.infrastructure.setup_app import exception_not_modified_handler
+from core.use_cases.core_use_cases import BaseListMixinService
+from core.use_cases.core_use_cases import BaseRetrieveMixinService
+from db_declarative.sqalchemy.infrastructure.orm.tables import DummyTable
+from tests.conftest import Dummy
+from tests.conftest import DummyChange
+from tests.conftest import DummyFilter
+from tests.conftest import DummyFilterSet
+from tests.helpers import call_app
+from tests.helpers import open_repository
+
+
+def create_conditional_app(repository) -> FastAPI:
+    class ListService(BaseListMixinService):
+        repo_instance = repository
+        conditional = True
+
+    class RetrieveService(BaseRetrieveMixinService):
+        repo_instance = repository
+        conditional = True
+
+    app = FastAPI()
+    app.add_exception_handler(NotModifiedException, exception_not_modified_handler)
+    app.add_middleware(ConditionalGetMiddleware)
+
+    @app.get("/dummies")
+    async def list_dummies():
+        return [entity.name_object for entity in await ListService().run(DummyFilter())]
+
+    @app.get("/dummies/{entity_id}")
+    async def retrieve_dummy(entity_id: str):
+        return (await RetrieveService().run(entity_id)).name_object
+
+    return app
+
+
+def test_not_modified_until_a_row_changes(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            created = await repository.create(Dummy(name_object="first"))
+            app = create_conditional_app(repository)
+
+            for path in ["/dummies", f"/dummies/{created.entity_id}"]:
+                status_code, headers, _ = await call_app(app, "GET", path)
+                assert status_code == 200
+
+                status_code, _, body = await call_app(app, "GET", path, headers={"If-None-Match": headers["etag"]})
+                assert (status_code, body) == (304, b"")
+
+            await repository.update_one(created, DummyChange(name_object="changed"))
+            status_code, _, body = await call_app(app, "GET", "/dummies", headers={"If-None-Match": headers["etag"]})
+            assert (status_code, body) == (200, b'["changed"]')
+
+    asyncio.run(scenario())
+
+
+def test_version_sees_a_late_commit(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            await repository.create_many([Dummy(name_object="first"), Dummy(name_object="second")])
+
+            async with repository.session_scope(shared=False) as late:
+                # The transaction starts, and with it the CURRENT_TIMESTAMP of its writes, before the next update.
+                await resolve(late.execute(text("SELECT 1")))
+                await repository.update_many(DummyFilter(name_object="second"), DummyChange(object_count=1))
+                seen = await repository.get_version(DummyFilter())
+
+                await resolve(
+                    late.execute(
+                        text(
+                            "UPDATE table_dummy SET object_count = 2, updated_at = TIMEZONE('utc', CURRENT_TIMESTAMP) "
+                            "WHERE name_object = 'first'"
+                        )
+                    )
+                )
+
+            committed = await repository.get_version(DummyFilter())
+            # The latest updated_at and the count miss the row written by the late transaction.
+            assert (committed.last_modified, committed.count) == (seen.last_modified, seen.count)
+            assert committed.digest != seen.digest
+
+    asyncio.run(scenario())
+
+
+def test_version_is_aggregated_without_sorting_the_rows():
+    rows = select(DummyTable.entity_id, DummyTable.updated_at, DummyTable.name_object.label("row_version"))
+    query = BaseSourceRepository.build_version_query(DummyFilterSet(None, rows), {"name_object": "first"})
+    sql = str(query.compile(dialect=postgresql.dialect())).lower()
+
+    assert "order by" not in sql and "string_agg" not in sql
+    assert "sum(hashtextextended(" in sql and "count(*)" in sql
+
+
+def test_version_changes_when_a_row_is_deleted(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            await repository.create_many([Dummy(name_object="first"), Dummy(name_object="second")])
+            before = await repository.get_version(DummyFilter())
+
+            await repository.delete(DummyFilter(name_object="first"))
+            await repository.create(Dummy(name_object="third"))
+            after = await repository.get_version(DummyFilter())
+
+            assert before.count == after.count and before.digest != after.digest
+            assert (await repository.get_version(DummyFilter(name_object="missing"))).count == 0
+
+    asyncio.run(scenario())
@@ -0,0 +1,34 @@
+from core.domain.repositories import DataSources
+from core.infrastructure.orm.database import AsyncDbConnection
+from core.infrastructure.orm.database import DbConnection
+from core.infrastructure.orm.repositories import BaseAsyncSourceRepository
+from core.infrastructure.orm.repositories import BaseSourceRepository
+from core.infrastructure.orm.repositories import DB_CONNECTION_NAME
+from core.infrastructure.orm.repositories import create_generic_source_repository
+from db_declarative.sqalchemy.infrastructure.orm.tables import DummyTable
+from tests.conftest import Dummy
+from tests.conftest import DummyFilterSet
+
+
+def create_repository(data_source: DataSources):
+    return create_generic_source_repository(
+        data_source=data_source, domain_class=Dummy, table_class=DummyTable, filterset_class=DummyFilterSet
+    )
+
+
+def test_repository_creation_keeps_a_declared_source_lazy():
+    built = []
+    data_source = DataSources()
+    data_source.add_factory(DB_CONNECTION_NAME, lambda: built.append(True), source_class=AsyncDbConnection)
+
+    assert isinstance(create_repository(data_source), BaseAsyncSourceRepository)
+    assert built == []
+
+
+def test_undeclared_source_is_built_to_know_its_class():
+    data_source = DataSources()
+    data_source.add_factory(DB_CONNECTION_NAME, lambda: DbConnection("postgresql+psycopg2://localhost/test"))
+
+    repository = create_repository(data_source)
+    assert type(repository) is BaseSourceRepository
+    assert DB_CONNECTION_NAME in data_source.sources
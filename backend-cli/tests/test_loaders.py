@@ -0,0 +1,114 @@
+import asyncio
+import uuid
+
+import pytest
+
+from core.domain.filters import BaseSchemaFilter
+from core.use_cases.core_use_cases import BaseCreateMixinService
+from core.use_cases.core_use_cases import BaseListMixinService
+from core.use_cases.core_use_cases import BaseUpdateMixinService
+from core.use_cases.loaders import EntityLoader
+from core.use_cases.loaders import get_loader
+from core.use_cases.loaders import request_loaders
+from tests.conftest import Dummy
+from tests.conftest import DummyChange
+from tests.conftest import DummyFilter
+from tests.helpers import count_queries
+from tests.helpers import open_repository
+
+
+class CreateService(BaseCreateMixinService):
+    def __init__(self, repository) -> None:
+        self.repo_instance = repository
+
+
+class UpdateService(BaseUpdateMixinService):
+    def __init__(self, repository) -> None:
+        self.repo_instance = repository
+
+
+class ListService(BaseListMixinService):
+    batch_by_id = True
+
+    def __init__(self, repository) -> None:
+        self.repo_instance = repository
+
+
+class EntityIdsFilter(BaseSchemaFilter):
+    entity_id: list[str] | None = None
+
+
+def test_concurrent_loads_share_one_query(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            created = (await repository.create_many([Dummy(name_object=f"name-{index}") for index in range(5)])).items
+            queries = count_queries(repository)
+            loader = EntityLoader(repository=repository)
+
+            entities = await loader.load_many([entity.entity_id for entity in created] + [str(uuid.uuid4())])
+            assert [entity.name_object for entity in entities[:5]] == [f"name-{index}" for index in range(5)]
+            assert entities[5] is None
+
+            assert await loader.load(created[0].entity_id) is entities[0]
+            assert len(queries) == 1
+
+    asyncio.run(scenario())
+
+
+def test_failed_lookups_raise_and_are_retried(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            created = await repository.create(Dummy(name_object="first"))
+            execute_query = repository.execute_query
+            count_queries(repository, fail=True)
+            loader = EntityLoader(repository=repository)
+
+            with pytest.raises(RuntimeError):
+                await loader.load(created.entity_id)
+
+            repository.execute_query = execute_query
+            assert (await loader.load(created.entity_id)).name_object == "first"
+
+    asyncio.run(scenario())
+
+
+def test_write_services_keep_the_request_loader_current(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            token = request_loaders.set({})
+            try:
+                created = await CreateService(repository).run(Dummy(name_object="first"))
+                queries = count_queries(repository)
+                loader = get_loader(repository)
+                assert await loader.load(created.entity_id) is created
+                assert queries == []
+
+                await UpdateService(repository).run(created, DummyChange(name_object="second"))
+                assert (await loader.load(created.entity_id)).name_object == "second"
+            finally:
+                request_loaders.reset(token)
+
+    asyncio.run(scenario())
+
+
+def test_list_batches_only_a_single_entity_id(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            created = await repository.create(Dummy(name_object="first"))
+            service = ListService(repository)
+
+            assert [entity.name_object for entity in await service.run(DummyFilter(entity_id=created.entity_id))] == [
+                "first"
+            ]
+
+            found = []
+
+            async def find(filter_schema):
+                found.append(filter_schema)
+                return []
+
+            repository.find = find
+            await service.run(EntityIdsFilter(entity_id=[created.entity_id]))
+            assert len(found) == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,39 @@
+import asyncio
+
+from core.infrastructure.orm.mappers import ProjectedSourceMapper
+from core.infrastructure.orm.mappers import create_generic_source_mapper
+from core.infrastructure.orm.repositories import create_generic_source_repository
+from db_declarative.sqalchemy.infrastructure.orm.tables import DummyTable
+from tests.conftest import Dummy
+from tests.conftest import DummyFilter
+from tests.conftest import DummyFilterSet
+from tests.helpers import open_repository
+
+
+class DummyWithExtra(Dummy):
+    # Not a column of the table, only the ORM mapper can fill it.
+    extra: str | None = None
+
+
+def test_projects_only_when_every_field_is_a_column():
+    assert isinstance(create_generic_source_mapper(table_class=DummyTable, domain_class=Dummy), ProjectedSourceMapper)
+    assert not isinstance(
+        create_generic_source_mapper(table_class=DummyTable, domain_class=DummyWithExtra), ProjectedSourceMapper
+    )
+
+
+def test_repository_reads_through_the_orm_mapper(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            await repository.create(Dummy(name_object="first"))
+            extra_repository = create_generic_source_repository(
+                data_source=repository.data_source,
+                domain_class=DummyWithExtra,
+                table_class=DummyTable,
+                filterset_class=DummyFilterSet,
+            )
+
+            entities = await extra_repository.find(DummyFilter())
+            assert [(entity.name_object, entity.extra) for entity in entities] == [("first", None)]
+
+    asyncio.run(scenario())
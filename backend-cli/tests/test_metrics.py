@@ -0,0 +1,75 @@
+import asyncio
+
+import inject
+import pytest
+from fastapi import FastAPI
+
+from core.api.metrics import PROMETHEUS_MEDIA_TYPE
+from core.api.metrics import metrics_router
+from core.domain.exceptions import ValidationException
+from core.domain.repositories import DataSources
+from core.infrastructure.metrics import Histogram
+from core.infrastructure.metrics import ServiceMetrics
+from core.infrastructure.orm.database import DbConnection
+from core.use_cases import instrumentation
+from core.use_cases.core_use_cases import BaseService
+from tests.helpers import call_app
+
+
+class FailingService(BaseService):
+    async def execute(self, *args, **kwargs):
+        raise ValidationException(message="Invalid.", fail_rules=[])
+
+
+@pytest.fixture
+def service_metrics():
+    metrics = ServiceMetrics(buckets=(0.1, 1.0))
+    previous = instrumentation.get_service_metrics()
+    instrumentation.set_service_metrics(metrics)
+    yield metrics
+    instrumentation.set_service_metrics(previous)
+
+
+def test_histogram_counts_are_cumulative():
+    histogram = Histogram(buckets=(1.0, 0.1))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value)
+
+    assert histogram.cumulative_counts() == [("0.1", 2), ("1.0", 3), ("+Inf", 4)]
+    assert histogram.as_dict()["count"] == 4
+    assert histogram.as_dict()["max"] == 3.0
+
+
+def test_service_runs_are_timed_by_phase_and_failures_counted(service_metrics):
+    with pytest.raises(ValidationException):
+        asyncio.run(FailingService().run())
+
+    assert sorted(phase for _, phase in service_metrics.phases) == ["execute", "finally_execute", "pre_execute"]
+    assert service_metrics.get_histogram("FailingService", "execute").count == 1
+    assert service_metrics.errors[("FailingService", instrumentation.VALIDATION_ERROR)] == 1
+    assert service_metrics.in_flight["FailingService"] == 0
+
+
+def test_metrics_endpoint_renders_services_and_pools(service_metrics):
+    connection = DbConnection("postgresql+psycopg2://offline/offline")
+    inject.clear_and_configure(
+        lambda binder: binder.bind(DataSources, DataSources({"primary": connection, "settings": object()}))
+    )
+    app = FastAPI()
+    app.include_router(metrics_router)
+    with pytest.raises(ValidationException):
+        asyncio.run(FailingService().run())
+
+    try:
+        status, headers, body = asyncio.run(call_app(app, "GET", "/metrics"))
+    finally:
+        inject.clear()
+        connection.engine.dispose()
+
+    lines = body.decode().splitlines()
+    assert status == 200
+    assert headers["content-type"] == PROMETHEUS_MEDIA_TYPE
+    assert 'avang_service_phase_seconds_bucket{service="FailingService",phase="execute",le="+Inf"} 1' in lines
+    assert 'avang_service_errors_total{service="FailingService",kind="validation"} 1' in lines
+    assert 'avang_service_in_flight{service="FailingService"} 0' in lines
+    assert 'avang_pool_checked_out{source="primary"} 0' in lines
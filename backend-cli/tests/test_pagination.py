@@ -0,0 +1,136 @@
+import asyncio
+import uuid
+
+import pytest
+from sqlalchemy_filterset import NullsPosition
+from sqlalchemy_filterset import OrderingField
+from sqlalchemy_filterset import OrderingFilter
+
+from core.domain.exceptions import ValidationException
+from core.domain.models import PageResult
+from core.domain.repositories import track_errors
+from core.infrastructure.orm.pagination import KeysetPagination
+from core.infrastructure.orm.statements import StatementCache
+from db_declarative.sqalchemy.infrastructure.orm.tables import DummyTable
+from tests.conftest import Dummy
+from tests.conftest import DummyFilter
+from tests.conftest import DummyFilterSet
+from tests.helpers import count_queries
+from tests.helpers import open_repository
+
+
+class NullsFirstFilterSet(DummyFilterSet):
+    ordering = OrderingFilter(object_count=OrderingField(DummyTable.object_count, nulls=NullsPosition.first))
+
+
+def null_last(value) -> tuple:
+    return (value is None, 0 if value is None else value)
+
+
+def sort(entities: list[Dummy], ordering: list[str]) -> list[Dummy]:
+    """Sort like PostgreSQL, NULL values last going up, with `entity_id` after the ordering as tiebreaker."""
+    if not any(item.lstrip("-") == "entity_id" for item in ordering):
+        ordering = [*ordering, "-entity_id" if ordering[-1].startswith("-") else "entity_id"]
+    for item in reversed(ordering):
+        name, reverse = item.lstrip("-"), item.startswith("-")
+        entities = sorted(entities, key=lambda entity: null_last(getattr(entity, name)), reverse=reverse)
+    return entities
+
+
+def keyset(ordering: list[str], filterset_class=DummyFilterSet) -> KeysetPagination:
+    return KeysetPagination(table_class=DummyTable, filterset_class=filterset_class, ordering=ordering)
+
+
+def test_token_round_trip():
+    pagination = keyset(["-object_count"])
+    entity_id = uuid.uuid4()
+    token = pagination.encode({"object_count": 7, "entity_id": entity_id})
+
+    assert pagination.decode(token) == [7, entity_id]
+
+
+def test_token_of_another_ordering_is_rejected():
+    token = keyset(["object_count"]).encode({"object_count": 7, "entity_id": uuid.uuid4()})
+
+    with pytest.raises(ValidationException):
+        keyset(["-object_count"]).decode(token)
+    with pytest.raises(ValidationException):
+        keyset(["object_count"]).decode("not a token")
+
+
+def test_only_ordering_fields_and_columns_are_used():
+    pagination = keyset(["phone", "metadata", "__table__", "unknown", "-name_object"])
+
+    assert pagination.signature == ["phone", "-name_object", "-entity_id"]
+
+
+def test_explicit_entity_id_keeps_its_direction():
+    assert keyset(["-entity_id"]).signature == ["-entity_id"]
+    assert keyset(["name_object", "-entity_id", "object_count"]).signature == ["name_object", "-entity_id"]
+    assert keyset(["-name_object", "entity_id"]).signature == ["-name_object", "entity_id"]
+    assert keyset(["-name_object"]).signature == ["-name_object", "-entity_id"]
+
+
+def test_nulls_position_follows_the_ordering_field():
+    default, nulls_first = keyset(["object_count"]), keyset(["object_count"], filterset_class=NullsFirstFilterSet)
+
+    assert default.fields[0].nullable and not default.fields[0].nulls_first
+    assert nulls_first.fields[0].nulls_first
+    assert not default.fields[-1].nullable
+
+
+@pytest.mark.parametrize(
+    "ordering",
+    [
+        ["object_count"],
+        ["-object_count"],
+        ["name_object", "-object_count"],
+        ["-entity_id"],
+        ["name_object", "-entity_id"],
+    ],
+)
+def test_batches_cover_every_row_once(database_url, ordering):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            entities = [
+                Dummy(name_object=f"name-{index % 2}", object_count=None if index % 3 == 0 else index % 4)
+                for index in range(23)
+            ]
+            await repository.create_many(entities)
+
+            seen, token = [], None
+            while True:
+                page = await repository.find_batch(DummyFilter(ordering=ordering, pagination=(5, 0), batch_token=token))
+                seen.extend(entity.entity_id for entity in page.items)
+                if not page.has_next:
+                    break
+                token = page.next_token
+
+            assert len(seen) == len(set(seen)) == 23
+            assert seen == [entity.entity_id for entity in sort(await repository.find(DummyFilter()), ordering)]
+
+    asyncio.run(scenario())
+
+
+def test_batches_reuse_the_cached_statement_and_swallow_errors(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            repository.statement_cache = StatementCache()
+            await repository.create_many([Dummy(name_object=f"name-{index}", object_count=index) for index in range(9)])
+
+            first = await repository.find_batch(DummyFilter(ordering=["object_count"], pagination=(3, 0)))
+            second = await repository.find_batch(
+                DummyFilter(ordering=["object_count"], pagination=(3, 0), batch_token=first.next_token)
+            )
+            third = await repository.find_batch(
+                DummyFilter(ordering=["object_count"], pagination=(3, 0), batch_token=second.next_token)
+            )
+            assert [entity.object_count for entity in second.items + third.items] == [3, 4, 5, 6, 7, 8]
+            assert repository.statement_cache.stats()["hits"] == 1
+
+            count_queries(repository, fail=True)
+            with track_errors() as errors:
+                assert await repository.find_batch(DummyFilter(pagination=(3, 0))) == PageResult()
+            assert len(errors) == 1
+
+    asyncio.run(scenario())
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from core.api.middlewares import QueryProfilerMiddleware
+from core.infrastructure.orm.profiler import QueryBudgetExceeded
+from core.infrastructure.orm.profiler import QueryProfiler
+from core.infrastructure.orm.profiler import QueryRecord
+from core.infrastructure.orm.profiler import current_query_profile
+from core.infrastructure.orm.profiler import get_engines
+from tests.conftest import DummyFilter
+from tests.helpers import count_queries
+from tests.helpers import open_repository
+
+
+def test_failed_statements_leave_no_start_time(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            profiler = QueryProfiler(slow_query_seconds=None)
+            for engine in get_engines(repository.db_con):
+                profiler.attach(engine)
+            execute_query = repository.execute_query
+
+            with profiler.profile() as query_profile:
+                count_queries(repository, fail=True)
+                await repository.find(DummyFilter())
+                repository.execute_query = execute_query
+                await repository.count(DummyFilter(entity_id="not an uuid"))
+                await repository.count(DummyFilter())
+
+            assert len(query_profile.queries) == 1
+            assert len(profiler.started_at) == 0
+
+    asyncio.run(scenario())
+
+
+def test_budget_fails_before_the_response_starts():
+    sent = []
+
+    async def app(scope, receive, send):
+        query_profile = current_query_profile.get()
+        query_profile.queries.extend(QueryRecord(statement="SELECT 1", duration=0.0, rowcount=1) for _ in range(3))
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        sent.append(message)
+
+    middleware = QueryProfilerMiddleware(app, profiler=QueryProfiler(budget=2, fail_on_budget=True))
+    with pytest.raises(QueryBudgetExceeded):
+        asyncio.run(middleware({"type": "http", "method": "GET", "path": "/"}, None, send))
+    assert sent == []
+
+
+def test_queries_run_while_streaming_are_only_logged(caplog):
+    sent = []
+
+    async def app(scope, receive, send):
+        query_profile = current_query_profile.get()
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        query_profile.queries.extend(QueryRecord(statement="SELECT 1", duration=0.0, rowcount=1) for _ in range(3))
+        await send({"type": "http.response.body", "body": b""})
+
+    async def send(message):
+        sent.append(message["type"])
+
+    middleware = QueryProfilerMiddleware(app, profiler=QueryProfiler(budget=2, fail_on_budget=True))
+    asyncio.run(middleware({"type": "http", "method": "GET", "path": "/"}, None, send))
+    assert sent == ["http.response.start", "http.response.body"]
+    assert "Query budget exceeded" in caplog.text
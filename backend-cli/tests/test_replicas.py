@@ -0,0 +1,47 @@
+import asyncio
+
+from core.api.middlewares import PrimaryPinMiddleware
+from core.infrastructure.orm.replicas import is_primary_pinned
+from core.infrastructure.orm.replicas import pin_primary
+from core.infrastructure.orm.replicas import primary_pin_scope
+
+
+def test_pin_is_reset_with_its_scope():
+    with primary_pin_scope():
+        pin_primary()
+        assert is_primary_pinned()
+        with primary_pin_scope():
+            assert not is_primary_pinned()
+        assert is_primary_pinned()
+    assert not is_primary_pinned()
+
+
+def test_requests_served_by_one_task_are_pinned_separately():
+    pinned = []
+
+    async def app(scope, receive, send):
+        pinned.append(is_primary_pinned())
+        if scope["method"] == "POST":
+            pin_primary()
+
+    async def scenario():
+        middleware = PrimaryPinMiddleware(app)
+        for method in ["GET", "POST", "GET"]:
+            await middleware({"type": "http", "method": method}, None, None)
+        return is_primary_pinned()
+
+    assert asyncio.run(scenario()) is False
+    assert pinned == [False, False, False]
+
+
+def test_writes_of_child_tasks_pin_the_request():
+    async def write():
+        await asyncio.sleep(0)
+        pin_primary()
+
+    async def scenario():
+        with primary_pin_scope():
+            await asyncio.gather(write(), asyncio.sleep(0))
+            return is_primary_pinned()
+
+    assert asyncio.run(scenario()) is True
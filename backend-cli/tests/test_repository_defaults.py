@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from core.domain.exceptions import DuplicateException
+from core.domain.repositories import ISourceRepository
+from tests.conftest import Dummy
+from tests.conftest import DummyFilter
+
+
+class ListRepository(ISourceRepository):
+    """Repository written against the basic operations only."""
+
+    def __init__(self) -> None:
+        self.entities: list[Dummy] = []
+
+    async def find(self, filter_schema):
+        limit, offset = filter_schema.pagination or (None, 0)
+        return self.entities[offset : offset + limit if limit else None]
+
+    async def create(self, entity):
+        if any(existing.name_object == entity.name_object for existing in self.entities):
+            raise DuplicateException("Duplicate entity.")
+        self.entities.append(entity)
+        return entity
+
+    async def count(self, filter_schema):
+        return len(self.entities)
+
+    async def update_one(self, entity, change_request):
+        return entity
+
+    async def update_many(self, filter_schema, change_request):
+        return 0
+
+    async def delete(self, filter_schema):
+        return 0
+
+
+def test_defaults_are_built_on_the_basic_operations():
+    async def scenario():
+        repository = ListRepository()
+        result = await repository.create_many([Dummy(name_object=name) for name in ["first", "second", "first"]])
+        assert [entity.name_object for entity in result.items] == ["first", "second"]
+        assert [conflict.index for conflict in result.conflicts] == [2]
+
+        assert [entity.name_object async for entity in repository.stream(DummyFilter())] == ["first", "second"]
+
+        page = await repository.find_page(DummyFilter(pagination=(1, 0)))
+        assert (len(page.items), page.total, page.has_next) == (1, 2, True)
+        page = await repository.find_page(DummyFilter(pagination=(1, 1)), with_total=False)
+        assert (len(page.items), page.total, page.has_next) == (1, None, False)
+
+        assert await repository.get_version(DummyFilter()) is None
+        with pytest.raises(NotImplementedError):
+            await repository.find_by_ids(["missing"])
+
+    asyncio.run(scenario())
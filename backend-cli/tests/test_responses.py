@@ -0,0 +1,26 @@
+import json
+import uuid
+
+import pytest
+from pydantic import BaseModel
+
+from core.api.responses import ApiJSONResponse
+
+
+class Output(BaseModel):
+    entity_id: uuid.UUID
+    score: float
+
+
+@pytest.mark.parametrize(
+    "content, expected",
+    [
+        ({1: "one", uuid.UUID(int=1): "uuid"}, {"1": "one", "00000000-0000-0000-0000-000000000001": "uuid"}),
+        ({"score": float("nan"), "limit": float("inf")}, {"score": None, "limit": None}),
+        ({"big": 2**70}, {"big": 2**70}),
+        ({(1, 2): "pair"}, {"1,2": "pair"}),
+        (Output(entity_id=uuid.UUID(int=1), score=float("nan")), {"entity_id": str(uuid.UUID(int=1)), "score": None}),
+    ],
+)
+def test_renders_valid_json(content, expected):
+    assert json.loads(ApiJSONResponse(content).body) == expected
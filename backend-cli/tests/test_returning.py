@@ -0,0 +1,68 @@
+import asyncio
+import uuid
+
+from tests.conftest import Dummy
+from tests.conftest import DummyChange
+from tests.conftest import DummyFilter
+from tests.helpers import offline_repository
+
+ENTITY_ID = uuid.uuid4()
+
+
+def test_update_one_returns_the_written_row_in_the_same_statement():
+    def answer(query, params):
+        return [{"entity_id": ENTITY_ID, "name_object": "stored", "object_count": 7}]
+
+    async def scenario():
+        repository, statements = offline_repository(answer)
+        entity = Dummy(entity_id=str(ENTITY_ID), name_object="stale")
+        return await repository.update_one(entity, DummyChange(object_count=7)), statements
+
+    updated, statements = asyncio.run(scenario())
+
+    assert len(statements) == 1
+    assert statements[0].startswith("UPDATE")
+    assert " RETURNING " in statements[0]
+    # The row as written, not the stale entity with the changes applied.
+    assert (updated.name_object, updated.object_count) == ("stored", 7)
+
+
+def test_update_one_applies_the_changes_when_no_row_is_returned():
+    async def scenario():
+        repository, _ = offline_repository()
+        entity = Dummy(entity_id=str(ENTITY_ID), name_object="gone")
+        return await repository.update_one(entity, DummyChange(object_count=3))
+
+    updated = asyncio.run(scenario())
+
+    assert (updated.name_object, updated.object_count) == ("gone", 3)
+
+
+def test_update_many_returning_ids_only_reads_back_the_ids():
+    async def scenario():
+        repository, statements = offline_repository(lambda query, params: [{"entity_id": ENTITY_ID}])
+        ids = await repository.update_many_returning(
+            DummyFilter(name_object="bulk"), DummyChange(object_count=1), ids_only=True
+        )
+        return ids, statements
+
+    ids, statements = asyncio.run(scenario())
+
+    assert ids == [str(ENTITY_ID)]
+    assert statements[0].startswith("UPDATE")
+    assert statements[0].endswith("RETURNING table_dummy.entity_id")
+
+
+def test_delete_returning_maps_the_deleted_rows():
+    def answer(query, params):
+        return [{"entity_id": ENTITY_ID, "name_object": "bulk", "object_count": 2}]
+
+    async def scenario():
+        repository, statements = offline_repository(answer)
+        return await repository.delete_returning(DummyFilter(name_object="bulk")), statements
+
+    deleted, statements = asyncio.run(scenario())
+
+    assert [(entity.entity_id, entity.object_count) for entity in deleted] == [(str(ENTITY_ID), 2)]
+    assert statements[0].startswith("DELETE FROM")
+    assert " RETURNING table_dummy.name_object, " in statements[0]
@@ -0,0 +1,190 @@
+import asyncio
+from typing import Any
+
+import pytest
+
+from core.domain.exceptions import ValidationException
+from core.domain.rules import BaseRule
+from core.domain.rules import BatchEmailRule
+from core.domain.rules import BatchRegexRule
+from core.domain.rules import BatchUniqueRule
+from core.domain.rules import UniqueRule
+from core.use_cases.core_use_cases import BaseBatchValidationService
+from core.use_cases.core_use_cases import BaseValidationService
+from tests.conftest import Dummy
+from tests.helpers import open_repository
+
+
+def count_lookups(repository) -> list:
+    """Record the fields and values `repository.existing_values` is called with."""
+    lookups = []
+    existing_values = repository.existing_values
+
+    async def recording_existing_values(field, values):
+        lookups.append((field, sorted(str(value) for value in values)))
+        return await existing_values(field=field, values=values)
+
+    repository.existing_values = recording_existing_values
+    return lookups
+
+
+class Probe:
+    """Tracks the rules running at the same time and the ones cancelled."""
+
+    def __init__(self) -> None:
+        self.running = 0
+        self.most_running = 0
+        self.cancelled = []
+
+
+class SleepingRule(BaseRule):
+    probe: Any
+    delay: float = 0
+    valid: bool = True
+
+    async def execute(self) -> bool:
+        self.probe.running += 1
+        self.probe.most_running = max(self.probe.most_running, self.probe.running)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.probe.cancelled.append(self.key)
+            raise
+        finally:
+            self.probe.running -= 1
+        return self.valid
+
+
+def build_validation_service(rules: list[BaseRule], **attributes) -> BaseValidationService:
+    class ValidationService(BaseValidationService):
+        async def get_rules(self, *args, **kwargs):
+            return rules
+
+    service = ValidationService()
+    for name, value in attributes.items():
+        setattr(service, name, value)
+    return service
+
+
+def test_rules_run_concurrently_up_to_the_limit():
+    probe = Probe()
+    rules = [
+        SleepingRule(rule_key=f"rule-{index}", probe=probe, delay=0.01 * (5 - index), valid=index % 2 == 0)
+        for index in range(5)
+    ]
+
+    async def scenario():
+        service = build_validation_service(rules, max_concurrency=3, raise_exception=False)
+        return await service.execute_rules(await service.get_rules())
+
+    failed = asyncio.run(scenario())
+
+    # The slowest rule comes first, failed rules are still reported in the order they were declared.
+    assert [rule.key for rule in failed] == ["rule-1", "rule-3"]
+    assert probe.most_running == 3
+    assert probe.cancelled == []
+
+
+def test_first_failure_cancels_the_rules_still_running():
+    probe = Probe()
+    rules = [
+        SleepingRule(rule_key="slow", probe=probe, delay=10),
+        SleepingRule(rule_key="failing", probe=probe, valid=False),
+    ]
+
+    async def scenario():
+        with pytest.raises(ValidationException) as error:
+            await build_validation_service(rules, raise_first=True).run()
+        return error.value
+
+    error = asyncio.run(asyncio.wait_for(scenario(), timeout=5))
+
+    assert [rule.key for rule in error.fail_rules] == ["failing"]
+    assert probe.cancelled == ["slow"]
+    assert probe.running == 0
+
+
+def test_unique_rules_of_a_field_share_one_lookup(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            first = await repository.create(Dummy(name_object="first", object_count=1))
+            lookups = count_lookups(repository)
+
+            class ValidationService(BaseValidationService):
+                async def get_rules(self, *args, **kwargs):
+                    def unique(key, value, field="name_object", exclude_id=None):
+                        return UniqueRule(
+                            rule_key=key, value=value, field=field, repository=repository, exclude_id=exclude_id
+                        )
+
+                    return [
+                        unique("mine", "first", exclude_id=str(first.entity_id)),
+                        unique("taken", "first"),
+                        unique("free", "second"),
+                        unique("empty", None),
+                        unique("count", 1, field="object_count"),
+                    ]
+
+            with pytest.raises(ValidationException) as error:
+                await ValidationService().run()
+
+            assert [rule.key for rule in error.value.fail_rules] == ["taken", "count"]
+            assert sorted(lookups) == [("name_object", ["first", "second"]), ("object_count", ["1"])]
+
+    asyncio.run(scenario())
+
+
+def test_batch_unique_rule_checks_every_row_at_once(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            await repository.create(Dummy(name_object="first"))
+            lookups = count_lookups(repository)
+
+            class BatchValidationService(BaseBatchValidationService):
+                raise_exception = False
+
+                async def get_rules(self, *args, **kwargs):
+                    values = ["second", "first", None, "first"]
+                    return [BatchUniqueRule(values=values, field="name_object", repository=repository)]
+
+            assert [fail.row for fail in await BatchValidationService().run()] == [1, 3]
+            assert lookups == [("name_object", ["first", "second"])]
+
+    asyncio.run(scenario())
+
+
+def test_batch_unique_rule_fails_repeated_values_of_the_batch():
+    class StoredValues:
+        async def existing_values(self, field, values):
+            return {"stored": ["id"]}
+
+    async def scenario():
+        values = ["a", "b", "a", None, None, "stored", "b"]
+        return await BatchUniqueRule(values=values, field="name", repository=StoredValues()).execute()
+
+    assert asyncio.run(scenario()) == [2, 5, 6]
+
+
+def test_batch_rules_report_the_failed_rows_in_order():
+    class StoredValues:
+        async def existing_values(self, field, values):
+            return {"taken": ["id"]}
+
+    class BatchValidationService(BaseBatchValidationService):
+        async def get_rules(self, *args, **kwargs):
+            names = ["taken", "free", "free", None]
+            return [
+                BatchEmailRule(rule_key="email", values=["a@b.io", "wrong", None, "c@d.io"]),
+                BatchRegexRule(rule_key="code", pattern=r"[A-Z]{3}", values=["ABC", "ABC", "abcd", "ABCD"]),
+                BatchUniqueRule(rule_key="name", values=names, field="name_object", repository=StoredValues()),
+            ]
+
+    async def scenario():
+        with pytest.raises(ValidationException) as error:
+            await BatchValidationService().run()
+        return error.value.fail_rules
+
+    fails = asyncio.run(scenario())
+
+    assert [fail.key for fail in fails] == ["0.name", "1.email", "2.code", "2.name", "3.code"]
+    assert fails[1].message == "Invalid email"
@@ -0,0 +1,113 @@
+import asyncio
+
+from sqlalchemy import inspect
+from sqlalchemy import select
+from sqlalchemy import update
+
+from core.infrastructure.orm.statements import StatementCache
+from core.infrastructure.orm.unit_of_work import UnitOfWork
+from core.infrastructure.orm.unit_of_work import resolve
+from db_declarative.sqalchemy.infrastructure.orm.tables import DummyTable
+from tests.conftest import Dummy
+from tests.conftest import DummyChange
+from tests.conftest import DummyFilter
+from tests.conftest import DummyFilterSet
+from tests.helpers import open_repository
+
+
+def get_query(cache: StatementCache, params: dict, operation: tuple = ("find",), changes: dict | None = None):
+    base_query = select(DummyTable) if changes is None else update(DummyTable)
+    return cache.get_query(
+        filterset_class=DummyFilterSet,
+        operation=operation,
+        build_query=lambda filter_set, values: filter_set.filter_query(values),
+        get_base_query=lambda: base_query,
+        params=params,
+        changes=changes,
+    )
+
+
+def test_statements_are_shared_across_values():
+    cache = StatementCache()
+    first, first_values = get_query(cache, {"name_object": "first", "pagination": (10, 0)})
+    second, second_values = get_query(cache, {"name_object": "second", "pagination": (5, 20)})
+
+    assert first is second
+    assert first_values == {"filter_name_object": "first", "filter_pagination_limit": 10, "filter_pagination_offset": 0}
+    assert second_values["filter_name_object"] == "second"
+    assert cache.stats()["hits"] == cache.stats()["misses"] == 1
+
+
+def test_key_covers_everything_that_shapes_the_statement():
+    cache = StatementCache()
+    statements = [
+        get_query(cache, {"name_object": "first"})[0],
+        get_query(cache, {"name_object": "first", "entity_id": "id"})[0],
+        get_query(cache, {"name_object": "first"}, operation=("count",))[0],
+        get_query(cache, {"ordering": ["name_object"]})[0],
+        get_query(cache, {"ordering": ["-name_object"]})[0],
+        get_query(cache, {}, operation=("update",), changes={"name_object": "new"})[0],
+        get_query(cache, {}, operation=("update",), changes={"name_object": "new", "object_count": 1})[0],
+    ]
+
+    assert len({id(statement) for statement in statements}) == len(statements)
+    assert cache.stats()["hits"] == 0
+
+
+def test_unknown_filters_are_ignored_and_unbindable_values_bypass_the_cache():
+    cache = StatementCache()
+    get_query(cache, {"name_object": "first", "unknown": 1})
+    get_query(cache, {"pagination": None})
+
+    assert cache.stats() == {"size": 1, "max_size": cache.max_size, "hits": 0, "misses": 1, "bypasses": 1}
+
+
+def test_least_recently_used_statement_is_evicted():
+    cache = StatementCache(max_size=2)
+    get_query(cache, {"name_object": "first"})
+    get_query(cache, {"entity_id": "id"})
+    get_query(cache, {"name_object": "second"})
+    get_query(cache, {"ordering": ["name_object"]})
+
+    assert cache.stats()["size"] == 2
+    get_query(cache, {"name_object": "third"})
+    assert cache.stats()["hits"] == 2
+
+
+def test_cached_statements_bind_each_call_values(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            repository.statement_cache = StatementCache()
+            await repository.create_many([Dummy(name_object=name) for name in ["first", "second"]])
+
+            assert [entity.name_object for entity in await repository.find(DummyFilter(name_object="first"))] == [
+                "first"
+            ]
+            assert [entity.name_object for entity in await repository.find(DummyFilter(name_object="second"))] == [
+                "second"
+            ]
+            assert repository.statement_cache.stats()["hits"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_cached_writes_keep_rows_loaded_in_the_unit_of_work_current(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            repository.statement_cache = StatementCache()
+            created = await repository.create(Dummy(name_object="first", object_count=1))
+
+            async with UnitOfWork():
+                async with repository.session_scope() as session:
+                    # Held like any ORM object the request still uses, its identity map entry stays alive.
+                    row = (await resolve(session.execute(select(DummyTable)))).scalars().one()
+
+                await repository.update_many(DummyFilter(name_object="first"), DummyChange(object_count=7))
+                assert (await repository.find(DummyFilter(entity_id=created.entity_id)))[0].object_count == 7
+                # Read again on next use, async sessions need an explicit refresh.
+                assert "object_count" in inspect(row).expired_attributes
+
+                await repository.delete(DummyFilter(name_object="first"))
+                assert await repository.find(DummyFilter(entity_id=created.entity_id)) == []
+
+    asyncio.run(scenario())
@@ -0,0 +1,67 @@
+import asyncio
+import json
+import uuid
+
+from core.api.rest_api import NDJSON_MEDIA_TYPE
+from core.api.rest_api import ndjson_streaming_response
+from tests.conftest import Dummy
+from tests.conftest import DummyFilter
+from tests.helpers import call_app
+from tests.helpers import offline_repository
+
+
+def test_stream_reads_the_rows_in_chunks_of_one_query():
+    rows = [{"entity_id": uuid.uuid4(), "name_object": f"row-{index}"} for index in range(5)]
+
+    async def scenario():
+        repository, statements = offline_repository(lambda query, params: rows)
+        names = [entity.name_object async for entity in repository.stream(DummyFilter(), chunk_size=2)]
+        return names, statements
+
+    names, statements = asyncio.run(scenario())
+
+    assert names == [f"row-{index}" for index in range(5)]
+    assert len(statements) == 1
+    assert statements[0].startswith("SELECT")
+
+
+def test_ndjson_response_writes_one_line_per_entity():
+    closed = []
+
+    async def entities():
+        try:
+            for name in ["first", "second"]:
+                yield Dummy(entity_id="id", name_object=name)
+        finally:
+            closed.append(True)
+
+    async def scenario():
+        return await call_app(ndjson_streaming_response(entities()), "GET", "/")
+
+    status, headers, body = asyncio.run(scenario())
+
+    assert status == 200
+    assert headers["content-type"] == NDJSON_MEDIA_TYPE
+    lines = body.decode().splitlines()
+    assert [json.loads(line)["name_object"] for line in lines] == ["first", "second"]
+    assert closed == [True]
+
+
+def test_ndjson_response_closes_the_items_when_the_client_goes_away():
+    closed = []
+
+    async def entities():
+        try:
+            while True:
+                yield Dummy(entity_id="id", name_object="endless")
+        finally:
+            closed.append(True)
+
+    async def scenario():
+        body = ndjson_streaming_response(entities()).body_iterator
+        first = await body.__anext__()
+        await body.aclose()
+        return first
+
+    assert json.loads(asyncio.run(scenario()))["name_object"] == "endless"
+    assert closed == [True]
@@ -0,0 +1,169 @@
+import asyncio
+
+import pytest
+from sqlalchemy import exc as orm_exceptions
+from sqlalchemy import text
+
+from core.api.middlewares import UnitOfWorkMiddleware
+from core.domain.models import BaseChangeRequest
+from core.domain.repositories import current_unit_of_work
+from core.infrastructure.orm.unit_of_work import TransactionFailed
+from core.infrastructure.orm.unit_of_work import UnitOfWork
+from core.infrastructure.orm.unit_of_work import resolve
+from core.use_cases.core_use_cases import BaseCreateMixinService
+from core.use_cases.core_use_cases import BaseService
+from tests.conftest import Dummy
+from tests.conftest import DummyFilter
+from tests.helpers import open_repository
+
+
+class TooLongChange(BaseChangeRequest):
+    name_object: str | None = None
+
+
+class CreateService(BaseCreateMixinService):
+    def __init__(self, repository) -> None:
+        self.repo_instance = repository
+
+
+class FailingCreateService(CreateService):
+    async def execute(self, entity, *args, **kwargs):
+        await super().execute(entity)
+        raise ValueError("Failed after creating.")
+
+
+async def names(repository) -> list[str]:
+    return sorted(entity.name_object for entity in await repository.find(DummyFilter()))
+
+
+def test_commits_on_exit(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            async with UnitOfWork():
+                await repository.create(Dummy(name_object="first"))
+                await repository.create_many([Dummy(name_object="second"), Dummy(name_object="third")])
+                assert await repository.count(DummyFilter()) == 3
+
+            assert await names(repository) == ["first", "second", "third"]
+
+    asyncio.run(scenario())
+
+
+def test_rolls_back_on_error(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            with pytest.raises(ValueError):
+                async with UnitOfWork():
+                    await repository.create(Dummy(name_object="lost"))
+                    raise ValueError("Failed request.")
+
+            assert await names(repository) == []
+
+    asyncio.run(scenario())
+
+
+def test_swallowed_error_fails_the_unit_of_work(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            with pytest.raises(TransactionFailed):
+                async with UnitOfWork():
+                    await repository.create(Dummy(name_object="lost"))
+                    # Too long for the column, the repository logs the error and returns 0.
+                    assert await repository.update_many(DummyFilter(), TooLongChange(name_object="x" * 300)) == 0
+
+            assert await names(repository) == []
+
+    asyncio.run(scenario())
+
+
+def test_failure_on_an_unshared_session_is_ignored(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            async with UnitOfWork():
+                await repository.create(Dummy(name_object="kept"))
+                async with repository.session_scope(shared=False) as session:
+                    with pytest.raises(orm_exceptions.DBAPIError):
+                        await resolve(session.execute(text("SELECT 1 / 0")))
+
+            assert await names(repository) == ["kept"]
+
+    asyncio.run(scenario())
+
+
+def test_nested_service_rolls_back_its_savepoint(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+
+            class OuterService(BaseService):
+                async def execute(self):
+                    await repository.create(Dummy(name_object="outer"))
+                    with pytest.raises(ValueError):
+                        await FailingCreateService(repository).run(Dummy(name_object="inner"))
+
+            async with UnitOfWork():
+                await OuterService().run()
+
+            assert await names(repository) == ["outer"]
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_services_share_the_transaction(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+            async with UnitOfWork():
+                await asyncio.gather(
+                    *(CreateService(repository).run(Dummy(name_object=f"name-{index}")) for index in range(10))
+                )
+
+            assert await names(repository) == sorted(f"name-{index}" for index in range(10))
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_nested_services_keep_their_own_savepoints(database_url):
+    async def scenario():
+        async with open_repository(database_url) as repository:
+
+            class OuterService(BaseService):
+                async def execute(self):
+                    services = [
+                        (FailingCreateService if index % 2 else CreateService)(repository).run(
+                            Dummy(name_object=f"name-{index}")
+                        )
+                        for index in range(6)
+                    ]
+                    return await asyncio.gather(*services, return_exceptions=True)
+
+            async with UnitOfWork():
+                results = await OuterService().run()
+
+            assert [isinstance(result, ValueError) for result in results] == [index % 2 == 1 for index in range(6)]
+            assert await names(repository) == ["name-0", "name-2", "name-4"]
+
+    asyncio.run(scenario())
+
+
+def test_response_sent_from_another_task_closes_the_unit_of_work():
+    sent, seen = [], []
+
+    async def app(scope, receive, send):
+        seen.append(current_unit_of_work.get())
+
+        async def stream():
+            # Like a streamed response under ASGI < 2.4, started from a child task.
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"", "more_body": False})
+
+        await asyncio.create_task(stream())
+
+    async def send(message):
+        sent.append(message["type"])
+
+    async def scenario():
+        await UnitOfWorkMiddleware(app)({"type": "http"}, None, send)
+        return current_unit_of_work.get()
+
+    assert asyncio.run(scenario()) is None
+    assert not seen[0].active
+    assert sent == ["http.response.start", "http.response.body"]